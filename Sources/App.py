@@ -32,7 +32,7 @@ TODO
 Author(s)
 ---------
 - Created by M. Cerato on 06/17/2022.
-- Modified by xxx on xx/xx/xxxx.
+- Modified by agent on 18/10/2026.
 
 Copyright (c) 2020 Cerato Workshop.  All rights reserved.
 
@@ -180,9 +180,9 @@ class App:
         self.ntworksCbBx.grid(row=0, column=1, pady=10, padx=10)
 
         # Adding combobox drop down list
-        self.ntworksCbBx['values'] = (self.osmos.GetAllNetworks())
-        last = self.osmos.GetAllNetworks()[-1]
-        self.ntworksCbBx.current(self.osmos.GetAllNetworks().index(last))
+        networks = self.osmos.GetAllNetworks()
+        self.ntworksCbBx['values'] = (networks)
+        self.ntworksCbBx.current(len(networks) - 1)
 
 # *************
         self.IPEntry = ttk.Entry(configFrame, text='User IP',
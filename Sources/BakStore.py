@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""Keep the history of the ``.bak`` files, each section stored once.
+
+Description
+-----------
+BakStore python file holds a store where the ``.bak`` files extracted by
+OSMOS are kept, run after run.
+
+A ``.bak`` is split into its sections (``[SystemInfo]``,
+``[Configuration]``, ``[Data]``, ``[Program]``). Each section is stored
+once, compressed, under the SHA-256 of its content : the ControlBoxes
+running the same microcode, or a ControlBox unchanged from a run to the
+next one, share the same objects.
+
+Each run is a snapshot, listing for each ``.bak`` the hashes of its
+sections. A ``.bak`` of any snapshot can be rebuilt, byte-identical.
+
+The store is a directory :
+    - ``objects/`` : one file per section, ``objects/ab/cdef...``
+    - ``snapshots/<network>/<date>.json`` : one file per run
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- re standard library (https://docs.python.org/3/library/re.html)
+    - Split a ``.bak`` into sections.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Snapshot files.
+- time standard library (https://docs.python.org/2/library/time.html)
+    - Date of the snapshots.
+- zlib standard library (https://docs.python.org/3/library/zlib.html)
+    - Compress the sections.
+- hashlib standard library (https://docs.python.org/3/library/hashlib.html)
+    - Address of the sections.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- The sections are split at the lines starting with ``[``, with their
+  ending blank line : joined back, they give the ``.bak`` again.
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+
+
+class BakStore:
+    """Class storing the ``.bak`` files of the runs, section by section.
+
+    :param storeFolder:
+        directory of the store (created if needed)
+    :type storeFolder:
+        str
+
+    :attr sectionStart:
+        start of a section : a line beginning with ``[``
+    :type sectionStart:
+        re.Pattern
+    """
+
+    sectionStart = re.compile(rb"^(?=\[)", re.MULTILINE)
+
+    def __init__(self, storeFolder):
+        self.storeFolder = storeFolder
+        self.objectsFolder = os.path.join(storeFolder, "objects")
+        self.snapshotsFolder = os.path.join(storeFolder, "snapshots")
+
+        os.makedirs(self.objectsFolder, exist_ok=True)
+        os.makedirs(self.snapshotsFolder, exist_ok=True)
+
+    def AddBak(self, bakFullName):
+        """Store the sections of a ``.bak`` not stored yet.
+
+        :param bakFullName:
+            path of the ``.bak`` file
+        :type bakFullName:
+            str
+        :return:
+            Return the hashes of the sections, in order
+        :rtype:
+            list
+        """
+        with open(bakFullName, mode="rb") as file:
+            content = file.read()
+
+        hashes = []
+        for section in self.Split(content):
+            hashes.append(self.__AddObject(section))
+        return hashes
+
+    def AddSnapshot(self, network, bakFiles):
+        """Store the ``.bak`` files of a run.
+
+        :param network:
+            form "RCM", "TEMPO", etc... (or an IP for a single ControlBox)
+        :type network:
+            str
+        :param bakFiles:
+            paths of the ``.bak`` files of the run
+        :type bakFiles:
+            list
+        :return:
+            Return the name of the snapshot (ex : 20261018_221500)
+        :rtype:
+            str
+        """
+        files = {}
+        for bakFullName in bakFiles:
+            files[os.path.basename(bakFullName)] = self.AddBak(bakFullName)
+
+        networkFolder = os.path.join(self.snapshotsFolder, network)
+        os.makedirs(networkFolder, exist_ok=True)
+
+        snapshot = time.strftime("%Y%m%d_%H%M%S")
+        index = 1
+        while os.path.exists(os.path.join(networkFolder, snapshot + ".json")):
+            index = index + 1
+            snapshot = time.strftime("%Y%m%d_%H%M%S") + f"_{index}"
+
+        self.__WriteFile(os.path.join(networkFolder, snapshot + ".json"),
+                         json.dumps({"network": network,
+                                     "date": time.strftime("%d/%m/%Y "
+                                                           "%H:%M:%S"),
+                                     "files": files},
+                                    indent=4, sort_keys=True).encode())
+        return snapshot
+
+    def GetSnapshots(self, network):
+        """Return the snapshots of a network, oldest first.
+
+        :return:
+            Return the names of the snapshots
+        :rtype:
+            list
+        """
+        networkFolder = os.path.join(self.snapshotsFolder, network)
+        if not os.path.isdir(networkFolder):
+            return []
+
+        return sorted(name[:-len(".json")]
+                      for name in os.listdir(networkFolder)
+                      if name.endswith(".json"))
+
+    def GetSnapshot(self, network, snapshot):
+        """Return the ``.bak`` files of a snapshot.
+
+        :return:
+            Return the hashes of the sections, per ``.bak`` name
+        :rtype:
+            dict
+        """
+        with open(os.path.join(self.snapshotsFolder, network,
+                               snapshot + ".json")) as file:
+            return json.load(file)["files"]
+
+    def Rebuild(self, network, snapshot, bakName):
+        """Give the content of a ``.bak`` of a snapshot.
+
+        :param bakName:
+            name of the ``.bak`` (as in ``GetSnapshot``)
+        :type bakName:
+            str
+        :return:
+            Return the content of the ``.bak``, byte-identical
+        :rtype:
+            bytes
+        """
+        hashes = self.GetSnapshot(network, snapshot)[bakName]
+        return b"".join(self.__GetObject(digest) for digest in hashes)
+
+    def Restore(self, network, snapshot, folder):
+        """Write every ``.bak`` of a snapshot into a directory.
+
+        :param folder:
+            directory to write the ``.bak`` files in (created if needed)
+        :type folder:
+            str
+        :return:
+            Return the paths of the ``.bak`` files written
+        :rtype:
+            list
+        """
+        os.makedirs(folder, exist_ok=True)
+
+        written = []
+        for bakName in self.GetSnapshot(network, snapshot):
+            bakFullName = os.path.join(folder, bakName)
+            self.__WriteFile(bakFullName,
+                             self.Rebuild(network, snapshot, bakName))
+            written.append(bakFullName)
+        return written
+
+    @classmethod
+    def Split(cls, content):
+        """Split the content of a ``.bak`` into its sections.
+
+        :param content:
+            content of the ``.bak``
+        :type content:
+            bytes
+        :return:
+            Return the sections, joined back they give ``content``
+        :rtype:
+            list
+        """
+        return [section for section in cls.sectionStart.split(content)
+                if section]
+
+    def __AddObject(self, section):
+        """Store a section, if not stored yet.
+
+        :return:
+            Return the hash of the section
+        :rtype:
+            str
+        """
+        digest = hashlib.sha256(section).hexdigest()
+        objectName = self.__ObjectName(digest)
+        if not os.path.exists(objectName):
+            os.makedirs(os.path.dirname(objectName), exist_ok=True)
+            self.__WriteFile(objectName, zlib.compress(section))
+        return digest
+
+    def __GetObject(self, digest):
+        """Return a stored section.
+
+        :raise ValueError:
+            if the section read doesn't match its hash (corrupted store)
+        """
+        with open(self.__ObjectName(digest), mode="rb") as file:
+            section = zlib.decompress(file.read())
+
+        if hashlib.sha256(section).hexdigest() != digest:
+            raise ValueError(f"section {digest} is corrupted")
+        return section
+
+    def __ObjectName(self, digest):
+        """Give the path of the object of a section."""
+        return os.path.join(self.objectsFolder, digest[:2], digest[2:])
+
+    def __WriteFile(self, fullName, content):
+        """Write a file through a temporary one, never half written."""
+        with open(fullName + ".tmp", mode="wb") as file:
+            file.write(content)
+        os.replace(fullName + ".tmp", fullName)
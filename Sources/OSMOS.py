@@ -24,10 +24,25 @@ Libraries/Modules
     - Access to time-related functions.
 - shutil standard library (https://docs.python.org/3/library/shutil.html)
     - High-level operations on files and directories.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Write the measures of the transactions with the ControlBoxes.
 - TXTFile library (:file:../FilePages/TXTFile.html)
     - Access to writable files functions.
+- queue standard library (https://docs.python.org/3/library/queue.html)
+    - Share the ControlBoxes between the workers.
+- threading standard library (https://docs.python.org/3/library/threading.html)
+    - Protect the ``.log`` file written by several workers.
+- concurrent.futures standard library
+  (https://docs.python.org/3/library/concurrent.futures.html)
+    - Extract several ControlBoxes in parallel.
+- OSMOSExtract library (:file:OSMOSExtract.html)
+    - Extraction of one ControlBox into a ``.bak`` file.
+- BakStore library (:file:BakStore.html)
+    - History of the ``.bak`` files, each section stored once.
 - ControlBox library (:file:../CBPages/ControlBox.html)
-    - Access communications functions with a ControlBox.
+    - Check the ControlBoxes are reachable before the extraction.
+- Instrumentation library (:file:../CBPages/Instrumentation.html)
+    - Measures of the transactions with the ControlBoxes.
 
 Version
 -------
@@ -37,8 +52,7 @@ Notes
 -----
 - OSMOS python file is too big and should be splitted.
   For example, the parsing of files should be in a different python file.
-- __ParamTrt is too complex. This should be reworked. Categories are too
-  specifics. This should be re-thought and changed.
+- The extraction of a ControlBox has been moved in OSMOSExtract.
 
 TODO
 ----
@@ -47,7 +61,7 @@ TODO
 Author(s)
 ---------
 - Created by M. Cerato on 10/05/2022.
-- Modified by M. Cerato on 14/04/2023.
+- Modified by agent on 18/10/2026.
 
 Copyright (c) 2022 Cerato Workshop.  All rights reserved.
 
@@ -59,9 +73,16 @@ Members
 import os
 import time
 import shutil
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from File import TXTFile as txtf
-from Packages.Controlbox import ControlBox
 import OSMOSFiles
+import OSMOSExtract
+import BakStore
+from Packages.Controlbox import ControlBox
+from Packages.Controlbox import Instrumentation
 
 
 class OSMOS:
@@ -85,7 +106,9 @@ class OSMOS:
     Project = "OSMOS"
     ProjectDir = os.path.dirname(__file__)
 
-    while os.path.basename(ProjectDir) != Project:
+    # stops at the root if the project isn't in a directory named Project
+    while (os.path.basename(ProjectDir) != Project
+           and os.path.dirname(ProjectDir) != ProjectDir):
         ProjectDir = os.path.dirname(ProjectDir)
 
     DefaultCBFile = ProjectDir + "\\Documentation\\Reference"
@@ -98,24 +121,58 @@ class OSMOS:
 
     DefaultlogFolder = ProjectDir + "\\Sources"+"\\.log\\"
 
+    DefaultRTTFile = DefaultlogFolder + "OSMOS_RTT.json"
+
+    DefaultPlanFile = DefaultlogFolder + "OSMOS_plans.json"
+
+    DefaultWorkers = 1
+
+    DefaultPreflight = True
+
+    DefaultRetryPass = True
+
+    DefaultIncremental = False
+
+    DefaultIncrementalBak = False
+
+    PreflightWorkers = 32
+
     def __init__(self, CBFile=DefaultCBFile, CdeFile=DefaultCdeFile,
-                 bakFolder=DefaultbakFolder, logFolder=DefaultlogFolder):
+                 bakFolder=DefaultbakFolder, logFolder=DefaultlogFolder,
+                 RTTFile=DefaultRTTFile, planFile=DefaultPlanFile):
 
         self.CBFile = CBFile
         self.CdeFile = CdeFile
         self.bakFolder = bakFolder
         self.logFolder = logFolder
+        self.RTTFile = RTTFile
+        self.planFile = planFile
         self.osmosf = OSMOSFiles.OSMOSFiles(self.CBFile, self.CdeFile)
 
         self.listOfCBToGet = []
 
         # srcDirectory = os.path.dirname(__file__)
 
-        self.CB = ControlBox.ControlBox()
-
-        self.axis = ["A", "B", "C", "D", "E", "F", "G", "H"]
-        self.vectors = ["S", "T"]
-        self.vectorSpeed = ["N", "M"]
+        self.workers = self.DefaultWorkers
+        self.preflight = self.DefaultPreflight
+        self.reachability = {}
+        self.instrumented = False
+        self.instrumentation = {}
+        self.extractor = OSMOSExtract.OSMOSExtract(self.osmosf)
+        self.CB = self.extractor.CB
+
+        self.retryPass = self.DefaultRetryPass
+        self.failedCB = []
+        self.failures = {}
+        self.incremental = self.DefaultIncremental
+        self.programPaths = {}
+        self.incrementalBak = self.DefaultIncrementalBak
+        self.bakStatus = {}
+        self.bakStoreFolder = None
+        self.bakFiles = {}
+
+        self.__logLock = threading.Lock()
+        self.__resultLock = threading.Lock()
 
     def OSMOSSeq(self, network=None, userIP=None):
         """Launch the sequence of retreiving datas from CB and write in files.
@@ -125,9 +182,19 @@ class OSMOS:
               network only
             - create a directory if needed with the name of the network
             - create and name a ``.log`` file
+            - check which ControlBoxes are reachable (see ``UpdatePreflight``)
             - create and name a ``.bak`` file
             - request the CB for elements and write in ``.bak`` file
             - for each element done, write status in ``.log`` file
+            - extract again the ControlBoxes which failed (see
+              ``UpdateRetryPass``)
+
+        A ControlBox which fails doesn't stop the sequence. The failed ones
+        are kept in ``failedCB`` and listed at the end of the ``.log``.
+
+        When more than one worker is set (see ``UpdateWorkers``), several
+        ControlBoxes are extracted at the same time, each worker with its
+        own ControlBox.
 
         :param network:
             form "RCM", "TEMPO", etc...
@@ -157,30 +224,33 @@ class OSMOS:
                 self.listOfCBToGet = self.osmosf.CBFileNtwrkFilter(network)
 
                 # -------------- create network Directory------------------
-                for ntwrk in self.GetAllNetworks():
-                    if ntwrk == network:
-                        self.bakFolder = self.bakFolder + network + "\\"
-                        self.logFolder = self.logFolder + network + "\\"
-
-                        # if .bak directory doesn't exist
-                        if not os.path.isdir(self.bakFolder):
-                            os.mkdir(self.bakFolder)  # create one
-
-                        else:
-                            shutil.rmtree(self.bakFolder,
-                                          ignore_errors=True,
-                                          onerror=None)  # delete directory
-                            os.mkdir(self.bakFolder)  # create a new one
-
-                        # if .log directory doesn't exist
-                        if not os.path.isdir(self.logFolder):
-                            os.mkdir(self.logFolder)
-
-                        else:
-                            shutil.rmtree(self.logFolder,
-                                          ignore_errors=True,
-                                          onerror=None)  # delete directory
-                            os.mkdir(self.logFolder)  # create a new one
+                if network in self.osmosf.networkIPs:
+                    self.bakFolder = self.bakFolder + network + "\\"
+                    self.logFolder = self.logFolder + network + "\\"
+
+                    # if .bak directory doesn't exist
+                    if not os.path.isdir(self.bakFolder):
+                        os.mkdir(self.bakFolder)  # create one
+
+                    # incremental modes need the previous .bak
+                    elif self.incremental or self.incrementalBak:
+                        pass
+
+                    else:
+                        shutil.rmtree(self.bakFolder,
+                                      ignore_errors=True,
+                                      onerror=None)  # delete directory
+                        os.mkdir(self.bakFolder)  # create a new one
+
+                    # if .log directory doesn't exist
+                    if not os.path.isdir(self.logFolder):
+                        os.mkdir(self.logFolder)
+
+                    else:
+                        shutil.rmtree(self.logFolder,
+                                      ignore_errors=True,
+                                      onerror=None)  # delete directory
+                        os.mkdir(self.logFolder)  # create a new one
 
             else:
                 print("nothing to work on!")
@@ -210,84 +280,85 @@ class OSMOS:
         self.logFile.AddContent(f"SOLEIL network : {network}\n\n")
         # ------------------------------------------------------------
 
-        # sequence
-        for ip in self.listOfCBToGet:
+        self.instrumentation = {}
 
-            # ----------------- bak File Preparation ----------------------
-            bakName = self.__GenerateFileName(network, ip)
-            bakFullName = self.bakFolder + bakName
+        # round trip times learned on the previous runs
+        ControlBox.ControlBox.timeouts.Load(self.RTTFile)
 
-            connected = self.CB.Connect(ip)
-
-            if connected:
-                if os.path.exists(bakFullName.replace(".txt", ".bak")):
-                    oldFile = bakFullName.replace(".txt", ".bak")
-                    self.bakFile = txtf.TXT(oldFile)
-                    self.bakFile.DeleteFile()
-
-                bakFile = txtf.TXT(bakFullName)
-                bakFile.EraseContent()
-                bakFile.RenameFile(bakFullName.replace(".txt", ".bak"))
-
-                self.logFile.AddContent("------------------------------------")
-                self.logFile.AddContent(f"connected to {ip}")
-
-                # -------------------- system Info Part -----------------------
-                try:
-                    print("System Info : run...")
-                    bakFile.AddContent(self.__SystemInfo())
-                    self.logFile.AddContent("System ok")
-                    print("System Info : Done")
-
-                except Exception as ex:
-                    self.logFile.AddContent("Getting System Info Failed")
-                    self.logFile.AddContent(f"due to : {ex}")
-                    break
-
-                # -------------------- Parameters Part ------------------------
-                try:
-                    print("Parameters : run...")
-                    bakFile.AddContent(self.__Configuration(parametersList))
-                    self.logFile.AddContent("parameters ok")
-                    print("Parameters : Done")
-
-                except Exception as ex:
-                    self.logFile.AddContent("Getting configuration Failed")
-                    self.logFile.AddContent(f"error : {ex}")
-                    break
-
-                # -------------------- Variables Part -------------------------
-                try:
-                    print("Variables : run...")
-                    bakFile.AddContent(self.__Data())
-                    self.logFile.AddContent("Variables ok")
-                    print("Variables : Done")
-
-                except Exception as ex:
-                    self.logFile.AddContent("Getting Datas (variables) Failed")
-                    self.logFile.AddContent(f"error : {ex}")
-                    print("Variables : Done")
-                    break
-
-                # -------------------- Microcode Part -------------------------
-                try:
-                    print("Microcode : run...")
-                    bakFile.AddContent(self.__Program())
-                    self.logFile.AddContent("Microcode ok")
-                    print("Microcode : Done")
-
-                except Exception as ex:
-                    self.logFile.AddContent("Getting Microcode Failed")
-                    self.logFile.AddContent(f"error : {ex}")
-                    break
-                self.CB.Disconnect()
-
-                self.logFile.AddContent(f"disconnected from {ip}\n\n")
-                print("New bak created\n")
-            # end of sequence
-            else:
-                self.logFile.AddContent("------------------------------------")
-                self.logFile.AddContent(f"couldn't connect to {ip}\n\n")
+        # plans of the "configuration" part made on the previous runs
+        self.osmosf.LoadPlans(self.planFile)
+
+        self.failedCB = []
+        self.failures = {}
+        self.programPaths = {}
+        self.bakStatus = {}
+        self.bakFiles = {}
+
+        # --------------------- pre-flight --------------------------
+        listOfIP = self.listOfCBToGet
+        if self.preflight:
+            listOfIP = self.__Preflight(self.listOfCBToGet)
+
+        # sequence
+        self.__ExtractAll(listOfIP, network, parametersList)
+
+        # ----------------------- retry pass ------------------------
+        breakerThreshold = OSMOSExtract.OSMOSExtract.breakerThreshold
+        toRetry = [ip for ip in self.listOfCBToGet if ip in self.failedCB
+                   and self.failures.get(ip, 0) < breakerThreshold]
+
+        # unreachable at the preflight : retried only if they answer now
+        unreachable = [ip for ip in toRetry
+                       if self.reachability.get(ip) is False]
+        if self.retryPass and unreachable:
+            states = dict(zip(unreachable, self.__Probe(unreachable)))
+            toRetry = [ip for ip in toRetry if states.get(ip, True)]
+
+        if self.retryPass and toRetry:
+            self.__WriteLog(["====================================",
+                             f"retry of {len(toRetry)} ControlBox(es)\n"])
+            self.failedCB = [ip for ip in self.failedCB if ip not in toRetry]
+            self.__ExtractAll(toRetry, network, parametersList)
+
+        if self.failedCB:
+            failedCB = [ip for ip in self.listOfCBToGet
+                        if ip in self.failedCB]
+            self.__WriteLog(["====================================",
+                             f"{len(failedCB)} ControlBox(es) failed :"]
+                            + failedCB + [""])
+
+        if self.incremental:
+            paths = list(self.programPaths.values())
+            self.__WriteLog(["====================================",
+                             f"microcode reused : {paths.count('reused')} "
+                             f"ControlBox(es)",
+                             f"microcode uploaded : {paths.count('uploaded')} "
+                             f"ControlBox(es)\n"])
+
+        if self.incrementalBak:
+            status = list(self.bakStatus.values())
+            self.__WriteLog(["====================================",
+                             f".bak changed : {status.count('changed')} "
+                             f"ControlBox(es)",
+                             f".bak unchanged : {status.count('unchanged')} "
+                             f"ControlBox(es)\n"])
+
+        if self.bakStoreFolder:
+            self.__StoreBak(network or userIP)
+
+        try:
+            ControlBox.ControlBox.timeouts.Save(self.RTTFile)
+        except OSError as ex:
+            print(f"round trip times not saved : {ex}")
+
+        try:
+            self.osmosf.SavePlans(self.planFile)
+        except OSError as ex:
+            print(f"plans not saved : {ex}")
+
+        if self.instrumented:
+            self.__WriteInstrumentation(logFullName.replace(".txt",
+                                                           "_stats.json"))
 
         print("End of work")
         print("New log created")
@@ -301,13 +372,7 @@ class OSMOS:
         :rtype:
             list
         """
-        networksList = []
-        for network in self.osmosf.CBFileNtwrks():
-            # add network to the output only once
-            if networksList.count(network) < 1:
-                networksList.append(network)
-
-        return networksList
+        return self.osmosf.CBFileUniqueNtwrks()
 
     def GetAllParameters(self):
         """Return All parameters listed in the Cde ``.csv`` file.
@@ -347,544 +412,456 @@ class OSMOS:
         self.logFolder = newDir
         return self.logFolder
 
-    def UpdateCBFile(self, newFile):
-        """Update the location (file) the CB configuration is taken from.
+    def UpdateWorkers(self, workers):
+        """Update the number of ControlBoxes extracted at the same time.
 
-        :param newFile:
-            example format : *"D:/Temp_pro/OSMOS/Test/newFile.csv"*
-        :type newFile:
-            str
-        """
-        self.CBFile = newFile
-        self.osmosf.UpdateCBFile(newFile)
+        Each worker owns its own ControlBox (and gclib connection) and writes
+        its own ``.bak``. ``1`` extracts ControlBoxes one after the other.
 
-    def UpdateCdeFile(self, newFile):
-        """Update the location (file) the Cde configuration is taken from.
-
-        :param newFile:
-            example format : *"D:/Temp_pro/OSMOS/Test/newFile.csv"*
-        :type newFile:
-            str
+        :param workers:
+            number of ControlBoxes extracted in parallel (at least 1)
+        :type workers:
+            int
         """
-        self.CdeFile = newFile
-        self.osmosf.UpdateCdeFile(newFile)
-
-    def __SystemInfo(self):
-        """Parser of the "System Info" part of the .bak file.
-
-        This internal method prepare and return a string to write in the file.
-        System Inof contains, for example:
-            - The Firmware of the contained in the controlBox
-            - Serial Number of the controlBox
-            - ...
-
-        .. critical::
-        The format is Highly codified and imposed by GALIL. Not respecting it
-        can compromise the ability to upload the parameters into a ControlBox
-
-        :return:
-            Return a string composed of system informations
-        :rtype:
-            str
+        self.workers = max(1, int(workers))
+        return self.workers
+
+    def UpdatePreflight(self, preflight):
+        """Enable or disable the check of the ControlBoxes before extraction.
+
+        Every ControlBox is probed at the same time with a short TCP
+        connection (see ``ControlBox.IsReachable``). The unreachable ones are
+        written in the ``.log`` right away and not extracted, instead of
+        waiting for the connection timeout one after the other. They are
+        counted as failed : the retry pass (see ``UpdateRetryPass``) tries
+        them again with a full connection.
+
+        :param preflight:
+            ``True`` to check the ControlBoxes before extraction
+        :type preflight:
+            bool
+        """
+        self.preflight = bool(preflight)
+        return self.preflight
+
+    def UpdateRetryPass(self, retryPass):
+        """Enable or disable the second extraction of the failed ControlBoxes.
+
+        At the end of the sequence, the ControlBoxes which failed are
+        extracted once more, except the ones not requested anymore after too
+        many failures (see ``OSMOSExtract.breakerThreshold``). The ones found
+        unreachable by the preflight are checked again (``IsReachable``) and
+        only extracted if they answer now.
+
+        :param retryPass:
+            ``True`` to extract the failed ControlBoxes again
+        :type retryPass:
+            bool
         """
-        firmware = "Firmware=" + self.CB.GetFWVersion() + "\n"
-        serial = "Serial=" + self.CB.GetSerial() + "\n"
-        device = "Device=" + self.CB.GetFWVersion()[:7].replace("8", "x")
-        device = device + "\n"
-        axisNb = "Axis=" + self.CB.GetFWVersion()[5] + "\n"
+        self.retryPass = bool(retryPass)
+        return self.retryPass
+
+    def UpdateIncremental(self, incremental):
+        """Enable or disable the reuse of the stored microcode.
+
+        The microcode is the largest upload of a ControlBox and rarely
+        changes. When enabled, it is uploaded only if the label table of the
+        ControlBox differs from the previous ``.bak`` (see
+        ``OSMOSExtract.EnableIncremental``). How the microcode of each
+        ControlBox was got is kept in ``programPaths`` and summed up at the
+        end of the ``.log``. The ``.bak`` directory of the network is kept.
+
+        :param incremental:
+            ``True`` to reuse the stored microcode when unchanged
+        :type incremental:
+            bool
+        """
+        self.incremental = bool(incremental)
+        return self.incremental
 
-        systemInfo = "[SystemInfo]\n" + firmware + serial
-        systemInfo = systemInfo + device + axisNb
-        systemInfo = systemInfo + "\n"
+    def UpdateIncrementalBak(self, incrementalBak):
+        """Enable or disable the writing of the changed ``.bak`` only.
 
-        self.logFile.AddContent(f"firmware : {firmware}")
-        self.logFile.AddContent(f"serial : {serial}")
-        return systemInfo
+        When enabled, the ``.bak`` directory of the network is kept and a
+        ``.bak`` is replaced only if its content changed (see
+        ``OSMOSExtract.EnableIncrementalBak``). What happened to the
+        ``.bak`` of each ControlBox is kept in ``bakStatus`` and the
+        changed/unchanged counts are written at the end of the ``.log``.
 
-    def __Configuration(self, parametersList):
-        """Parser of the "configuration" part of the .bak file.
+        .. note::
+            The ``.bak`` of a ControlBox no longer in the CB ``.csv`` is
+            left in the directory.
 
-        This internal method prepare and return a string to write in the file.
-        Configuration contains the GALIL parameters values for each axis of a
-        controlBox.
+        :param incrementalBak:
+            ``True`` to write the changed ``.bak`` only
+        :type incrementalBak:
+            bool
+        """
+        self.incrementalBak = bool(incrementalBak)
+        return self.incrementalBak
 
-        .. note::
-        Configuration contains an *"init"* subsection wich is mainly for GALIL
-        purpose. It is, anyway, mandatory for the ``.bak`` to be functional.
+    def UpdateBakStore(self, storeFolder):
+        """Update the store keeping the history of the ``.bak`` files.
 
-        .. critical::
-        The format is Highly codified and imposed by GALIL. Not respecting it
-        can compromise the ability to upload the parameters into a ControlBox
+        At the end of ``OSMOSSeq``, the ``.bak`` files extracted are added
+        to the store as a snapshot of the network. Each section of a
+        ``.bak`` is stored once (see ``BakStore.BakStore``).
 
-        :return:
-            Return a string composed of init and parameters
-        :rtype:
+        :param storeFolder:
+            example format : *"D:/Temp_pro/OSMOS/Store/"*. ``None`` to not
+            store the ``.bak`` files.
+        :type storeFolder:
             str
         """
-# ******************************** init ***************************************
-        echo = "EO=false" + "\n"
-        motOFF = "MO\\size=1\n" + "MO\\1\\Cmd=MO" + "\\r" + "\n"
-        variableFormat = "VF=VF " + self.CB.GetParameter("VF?") + "\\r" + "\n"
-        positionFormat = "PF=PF " + self.CB.GetParameter("PF?") + "\\r" + "\n"
-        ommitLeading0 = "LZ=LZ 1\\r" + "\n"
-
-        config = "[Configuration]\n" + echo
-        config = config + variableFormat
-        config = config + positionFormat + ommitLeading0
-
-        for param in parametersList:
-            if self.__DoesFWExists(param):
-                config = config + self.__ParamTrt(param)
+        self.bakStoreFolder = storeFolder
 
-        config = config + motOFF + "\n"
-        return config
-# *****************************************************************************
+    def UpdateInstrumentation(self, instrumented):
+        """Enable or disable the measure of the transactions.
 
-    def __Data(self):
-        """Parser of the "Data" part of the .bak file.
+        When enabled, the transactions with each ControlBox are measured
+        (calls, errors, bytes and latency histogram per family of command,
+        see ``ControlBox.EnableInstrumentation``). The measures are kept
+        per IP (see ``GetInstrumentation``) and written in a ``_stats.json``
+        file next to the ``.log`` at the end of ``OSMOSSeq``.
 
-        This internal method prepare and return a string to write in the file.
-        Datas contains all variables and arrays used in the microcode.
+        :param instrumented:
+            ``True`` to measure the transactions
+        :type instrumented:
+            bool
+        """
+        self.instrumented = bool(instrumented)
+        return self.instrumented
 
-        .. critical::
-        The format is Highly codified and imposed by GALIL. Not respecting it
-        can compromise the ability to upload the parameters into a ControlBox
+    def GetInstrumentation(self):
+        """Return the measures of the last sequence.
 
         :return:
-            Return a string composed of variables and array
+            Return the measures per family of command, per ControlBox IP
         :rtype:
-            str
+            dict
         """
-# ***************************** Variables *************************************
-        variables = self.CB.GetAllVariables()
-        varSize = len(variables)
-
-        varData = ""
-        variableInit = "Variable\\"
-        for varNb, var in enumerate(variables):
-            nameValue = var.split("= ")
-            varName = nameValue[0]
-            varValue = nameValue[1]
-
-            varData = varData + variableInit
-            varData = varData + str(varNb+1) + "\\Name=" + varName + "\n"
-            varData = varData + variableInit
-            varData = varData + str(varNb+1) + "\\Value=" + varValue + "\n"
-
-        data = "[Data]\n"
-        data = data + variableInit + "size=" + str(varSize) + "\n"
-        data = data + varData
-
-# ****************************** Arrays ***************************************
-        arrays = self.CB.GetAllArrays()
-        arrNb = len(arrays)
-
-        arrData = ""
-        arrInit = "Array\\"
-
-        for arrNumber, array in enumerate(arrays):
-            nameLen = array.split("[")
-            arrName = nameLen[0]
+        return self.instrumentation
 
-            arrLen = nameLen[1].split("]")
-            arrLen = arrLen[0]
+    def UpdateRTTFile(self, newFile):
+        """Update the file where the round trip times are saved.
 
-            arrData = arrData + arrInit
-            arrData = arrData + str(arrNumber+1) + "\\Name=" + arrName + "\n"
-            arrData = arrData + arrInit
-            arrData = arrData + str(arrNumber+1) + "\\Size=" + arrLen + "\n"
+        The round trip time of each ControlBox is learned during
+        extraction to adapt its timeouts (see ``ControlBox.timeouts``).
+        It is saved at the end of ``OSMOSSeq`` and loaded at the next one.
 
-            ansData = ""
-            for i in range(int(arrLen)):
-                req = arrName + "[" + str(i) + "]"
-                ans = self.CB.GetVariable(req)
-
-                if i != int(arrLen)-1:
-                    ansData = ansData + ans + ", "
-
-                else:
-                    ansData = ansData + ans
-            arrData = arrData + arrInit
-            arrData = arrData + str(arrNumber+1) + "\\Value=" + ansData + "\n"
+        :param newFile:
+            example format : *"D:/Temp_pro/OSMOS/Test/OSMOS_RTT.json"*
+        :type newFile:
+            str
+        """
+        self.RTTFile = newFile
 
-        # print(arrData)
-        data = data + arrInit + "size=" + str(arrNb) + "\n"
-        data = data + arrData
+    def UpdatePlanFile(self, newFile):
+        """Update the file where the plans of the extractions are saved.
 
-        data = data + "\n"
-        return data
+        The ControlBoxes with the same firmware and axis share the plan of
+        their "configuration" part (see ``OSMOSFiles.GetPlans``). The plans
+        are saved at the end of ``OSMOSSeq`` and loaded at the next one,
+        while the Cde file is unchanged.
 
-    def __Program(self):
-        """Parser of the "Program" part of the .bak file.
+        :param newFile:
+            example format : *"D:/Temp_pro/OSMOS/Test/OSMOS_plans.json"*
+        :type newFile:
+            str
+        """
+        self.planFile = newFile
 
-        This internal method prepare and return a string to write in the file.
-        Program contains the microcode.
+    def UpdateCBFile(self, newFile):
+        """Update the location (file) the CB configuration is taken from.
 
-        .. note::
-        The microcode is written on a unique line in the ``.bak``. This has to
-        been done to be fully understood by GalilSuite.
+        :param newFile:
+            example format : *"D:/Temp_pro/OSMOS/Test/newFile.csv"*
+        :type newFile:
+            str
+        """
+        self.CBFile = newFile
+        self.osmosf.UpdateCBFile(newFile)
 
-        .. critical::
-        The format is Highly codified and imposed by GALIL. Not respecting it
-        can compromise the ability to upload the parameters into a ControlBox
+    def UpdateCdeFile(self, newFile):
+        """Update the location (file) the Cde configuration is taken from.
 
-        :return:
-            Return a unique string composed of the program
-        :rtype:
+        :param newFile:
+            example format : *"D:/Temp_pro/OSMOS/Test/newFile.csv"*
+        :type newFile:
             str
         """
-        programInit = "Program=\""
-        program = "[Program]\n"
-        mcode = self.CB.GetMicrocode().replace("\r\n", "\\n")
-        program = program + programInit + mcode + "\""
-        return program
+        self.CdeFile = newFile
+        self.osmosf.UpdateCdeFile(newFile)
 
         # In[1]: internal function for Class OSMOSGui
-    def __GenerateFileName(self, network=None, ip=None):
-        """Generate a name for the OSMOS files ``.bak`` and ``.log``.
-
-        The name is generated is automatic and is definedaccording to the
-        network, the CVS name and the IP
+    def __ExtractAll(self, listOfIP, network, parametersList):
+        """Extract ControlBoxes, with as many workers as set.
 
+        :param listOfIP:
+            IPs of the ControlBoxes to extract
+        :type listOfIP:
+            list
         :param network:
             form "RCM", "TEMPO", etc...
         :type network:
             str
-        :param ip:
-            IP of the controlbox
-        :type ip:
-            str
-
-        .. important::
-            ``UserIP`` should be xxxx.xxxx.xxxx.xxxx format (not GALIL format)
-
-        :return:
-            Return a string composed of system informations
-        :rtype:
-            str
+        :param parametersList:
+            GALIL parameters to request (ex : [SP, AC, ...])
+        :type parametersList:
+            list
         """
-        if ip is not None and network is not None:
-            CVSName = self.osmosf.CBFileGetName(ip)
-            name = "OSMOS_" + CVSName
-
-        elif ip is not None and network is None:
-            name = "OSMOS_" + ip
-
-        elif ip is None and network is not None:
-            name = "OSMOS_" + network
+        if self.workers > 1 and len(listOfIP) > 1:
+            # one extractor (then one ControlBox) per worker
+            workers = min(self.workers, len(listOfIP))
+            extractors = queue.Queue()
+            for i in range(workers):
+                extractors.put(OSMOSExtract.OSMOSExtract(self.osmosf))
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for ip in listOfIP:
+                    pool.submit(self.__WorkerSeq, extractors, network, ip,
+                                parametersList)
 
         else:
-            print("nothing to work on!")
-            return name
-        name = name + ".txt"
+            for ip in listOfIP:
+                self.__ExtractCB(self.extractor, network, ip, parametersList)
 
-        return name
-
-    def __ParamTrt(self, param):
-        """Look "how to treat" the parameter given inside the Cde ``.csv``.
+    def __ExtractCB(self, extractor, network, ip, parametersList):
+        """Extract a ControlBox and add the result into the ``.log`` file.
 
-        Parameters are given a category in the ``.csv`` document. According
-        to his category, the the way to requast a valul of the parameter is
-        different.
+        If the extraction fails, the ControlBox is added to ``failedCB``.
+        Its failures are kept in ``failures``. An unexpected error (``.bak``
+        not written...) is logged and stops this ControlBox only, whatever
+        the number of workers.
 
-        For example :
-            - ``SP`` is a``standard`` parameter. According to the category,
-            The way to ask the controlbox for is value is : ``SP<axis>=?``.
-            ``<axis>`` should have the value ``A``, ``B``, etc... until ``H``
-            - ``IA`` is a ``unique`` parameter. According to the category,
-            The way to ask the controlbox for is value is : ``IA ?``.
-
-        .. important::
-        The way to write the parameters in the ``.bak`` file has been
-        categorized as well. Unfortunately, there is a lot more way to write
-        than to read a parameter. Some of them have a unique way to be written,
-        which make them to be hard coded!
-        It is necessary to rethink the treatment of parameters to be as
-        independant as possible of the parameter.
-
-        :param param:
-            form "SP", "AC", etc...
-        :type param:
+        :param extractor:
+            extractor (and ControlBox) to use for this ControlBox
+        :type extractor:
+            OSMOSExtract.OSMOSExtract
+        :param network:
+            form "RCM", "TEMPO", etc...
+        :type network:
             str
-        :return:
-            Return 2 strings:
-                - 1 is the formatted string "How To read" the
-                  parameter.
-                - 2 is the formatted string "How To write" the
-                  parameter.
-        :rtype:
+        :param ip:
+            IP of the controlbox
+        :type ip:
             str
+        :param parametersList:
+            GALIL parameters to request (ex : [SP, AC, ...])
+        :type parametersList:
+            list
         """
-        howToRead, howToWrite = self.osmosf.CdeFileReadWriteType(param)
-
-        if howToRead == "Standard":
-            resultFromCB = self.__StdRead(param)
-
-        elif howToRead == "Unique":
-            resultFromCB = self.__UniqueRead(param)
-
-        elif howToRead == "Message":
-            resultFromCB = self.__MessageRead(param)
-
-        elif howToRead == "Vector":
-            resultFromCB = self.__VectorRead(param)
-
-        else:
-            resultFromCB = None
-            # error
+        try:
+            # ----------------- bak File Preparation ------------------
+            bakName = self.__GenerateFileName(network, ip)
+            bakFullName = self.bakFolder + bakName
 
-        if howToWrite == "Standard":
-            result = self.__StdWrite(param, resultFromCB)
+            extractor.CB.EnableInstrumentation(self.instrumented)
+            extractor.EnableIncremental(self.incremental)
+            extractor.EnableIncrementalBak(self.incrementalBak)
+
+            done = extractor.Extract(ip, bakFullName, parametersList,
+                                     self.failures.get(ip, 0))
+
+        except Exception as ex:
+            with self.__resultLock:
+                self.failedCB.append(ip)
+            self.__WriteLog(["------------------------------------",
+                             f"{ip} extraction stopped",
+                             f"error : {ex}\n\n"])
+            return
+
+        # results shared by the workers
+        with self.__resultLock:
+            self.failures[ip] = extractor.failures
+            if not done:
+                self.failedCB.append(ip)
+            else:
+                self.bakFiles[ip] = bakFullName.replace(".txt", ".bak")
+                if self.incremental:
+                    self.programPaths[ip] = extractor.programPath
+                if self.incrementalBak:
+                    self.bakStatus[ip] = extractor.bakStatus
 
-        elif howToWrite == "Sized":
-            result = self.__SizedWrite(param, resultFromCB)
+            if self.instrumented:
+                self.instrumentation[ip] = extractor.CB.GetInstrumentation()
 
-        elif howToWrite == "Special":
-            result = self.__SpecialWrite(param, resultFromCB)
+        self.__WriteLog(extractor.logLines)
 
-        elif howToWrite == "Unique":
-            result = self.__UniqueWrite(param, resultFromCB)
+    def __WorkerSeq(self, extractors, network, ip, parametersList):
+        """Extract a ControlBox from a worker thread.
 
-        elif howToWrite == "Vector":
-            result = self.__VectorWrite(param, resultFromCB)
+        An extractor is taken from ``extractors`` for the time of the
+        extraction, so that a ControlBox is never used by two threads.
 
-        else:
-            print("plop2")
-            # error
+        :param extractors:
+            extractors available, one for each worker
+        :type extractors:
+            queue.Queue
+        """
+        extractor = extractors.get()
+        try:
+            self.__ExtractCB(extractor, network, ip, parametersList)
 
-        return result
+        finally:
+            extractors.put(extractor)
 
-        # In[1]: internal function for Class OSMOSGui
-    def __StdRead(self, param):
-        """Extract the IPs according to the network input.
+    def __Preflight(self, listOfIP):
+        """Check all the ControlBoxes are reachable at the same time.
 
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
-            str
+        The reachable/unreachable table is written in the ``.log`` and kept
+        in ``reachability``. Unreachable ControlBoxes are logged as not
+        connected and added to ``failedCB``, with one failure.
 
-        .. warning::
-            Works only on .CSV.
+        :param listOfIP:
+            IPs of the ControlBoxes to extract
+        :type listOfIP:
+            list
+        :return:
+            Return the IPs of the reachable ControlBoxes
+        :rtype:
+            list
         """
-        answers = []
-        for axisValue in self.axis:
-            cmd = self.osmosf.GetFormattedCmd(param, axisValue)
-            ans = self.CB.GetParameter(cmd)
-            answers.append(ans)
+        self.reachability = {}
+        if not listOfIP:
+            return []
+
+        states = self.__Probe(listOfIP)
+
+        table = ["reachability :"]
+        reachableIP = []
+        for ip, state in zip(listOfIP, states):
+            self.reachability[ip] = state
+            if state:
+                table.append(f"{ip:<16} reachable")
+                reachableIP.append(ip)
+            else:
+                table.append(f"{ip:<16} unreachable")
+        table.append("")
+        self.__WriteLog(table)
 
-        return answers
+        for ip, state in zip(listOfIP, states):
+            if not state:
+                self.failedCB.append(ip)
+                self.failures[ip] = self.failures.get(ip, 0) + 1
+                self.__WriteLog(["------------------------------------",
+                                 f"couldn't connect to {ip}\n\n"])
 
-    def __StdWrite(self, param, answerFromCB):
-        output = self.osmosf.writeFormattedParam(param)
+        return reachableIP
 
-        for index, axisValue in enumerate(self.axis):
-            fullAns = param + axisValue + "=" + answerFromCB[index]
-            output = output.replace(param + axisValue + "=v", fullAns)
+    def __Probe(self, listOfIP):
+        """Check the ControlBoxes answer on the network, all at the same time.
 
-        return output
+        :param listOfIP:
+            IPs of the ControlBoxes to check
+        :type listOfIP:
+            list
+        :return:
+            Return ``True`` for each reachable ControlBox, in order
+        :rtype:
+            list
+        """
+        workers = min(self.PreflightWorkers, len(listOfIP))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(ControlBox.ControlBox.IsReachable,
+                                 listOfIP))
 
-        # In[1]: internal function for Class OSMOSGui
-    def __UniqueRead(self, param):
-        """Extract the IPs according to the network input.
+    def __StoreBak(self, network):
+        """Add the ``.bak`` files extracted into the store as a snapshot.
 
         :param network:
-            form "RCM", "TEMPO", etc...
+            name of the snapshots (network or IP)
         :type network:
             str
-
-        .. warning::
-            Works only on .CSV.
         """
-        cmd = self.osmosf.GetFormattedCmd(param)
-        ans = [self.CB.GetParameter(cmd)]
-
-        return ans
-
-    def __UniqueWrite(self, param, answerFromCB):
-        """Extract the IPs according to the network input.
-
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
+        bakFiles = [self.bakFiles[ip] for ip in self.listOfCBToGet
+                    if ip in self.bakFiles]
+        try:
+            store = BakStore.BakStore(self.bakStoreFolder)
+            snapshot = store.AddSnapshot(network, bakFiles)
+            self.__WriteLog(["====================================",
+                             f"snapshot {snapshot} : {len(bakFiles)} .bak "
+                             f"stored\n"])
+        except OSError as ex:
+            print(f".bak not stored : {ex}")
+            self.__WriteLog(["====================================",
+                             f".bak not stored : {ex}\n"])
+
+    def __WriteInstrumentation(self, statsFullName):
+        """Write the measures of the transactions in a ``.json`` file.
+
+        :param statsFullName:
+            path of the ``.json`` file
+        :type statsFullName:
             str
-
-        .. warning::
-            Works only on .CSV.
         """
-        output = self.osmosf.writeFormattedParam(param)
-        answerFromCB[0] = answerFromCB[0].replace(", ", ",")
-        output = output.replace("v", answerFromCB[0])
+        bounds = list(Instrumentation.Instrumentation.bounds)
+        stats = {"histogramBounds": bounds,
+                 "controlBoxes": self.instrumentation}
 
-        return output
+        with open(statsFullName, "w") as statsFile:
+            json.dump(stats, statsFile, indent=4)
 
-        # In[1]: internal function for Class OSMOSGui
-    def __MessageRead(self, param):
-        """Extract the IPs according to the network input.
+    def __WriteLog(self, lines):
+        """Add lines at the end of the ``.log`` file.
 
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
-            str
+        The lines are written all at once, so lines from different workers
+        are never mixed up.
 
-        .. warning::
-            Works only on .CSV.
+        :param lines:
+            lines to add. ``\\n`` is added to lines that don't end with it.
+        :type lines:
+            list
         """
-        cmd = self.osmosf.GetFormattedCmd(param)
-        ans = [self.CB.GetParameter(cmd)]
-        return ans
-
-        # In[1]: internal function for Class OSMOSGui
-    def __SizedWrite(self, param, resultFromCB):
-        """Extract the IPs according to the network input.
+        content = ""
+        for line in lines:
+            if line[-1:] == "\n":
+                content = content + line
+            else:
+                content = content + line + "\n"
 
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
-            str
+        with self.__logLock:
+            self.logFile.AddContent(content)
 
-        .. warning::
-            Works only on .CSV.
-        """
-        Size = 0
-        output = self.osmosf.writeFormattedParam(param, "1")
-
-        if param != "BA":
-            for value in resultFromCB:
-                if value != "0":
-                    Size += 1
-
-            output = self.osmosf.writeFormattedParam(param, Size)
-            output = output.replace("size=v", "size=" + str(Size))
-
-        if param != "BA":
-            nb = 0
-            for index, axisValue in enumerate(self.axis):
-                ans = resultFromCB[index]
-                if ans != "0":
-                    nb += 1
-                    searchSubStr = param + "\\" + str(nb) + "\\Cmd=\""
-                    searchSubStr = searchSubStr + param + "x=v"
-                    fullSubStr = param + "\\" + str(nb) + "\\Cmd=\"" + param
-                    fullSubStr = fullSubStr + axisValue + "=" + ans
-                    output = output.replace(searchSubStr, fullSubStr)
-
-        return output
+    def __GenerateFileName(self, network=None, ip=None):
+        """Generate a name for the OSMOS files ``.bak`` and ``.log``.
 
-        # In[1]: internal function for Class OSMOSGui
-    def __SpecialWrite(self, param, resultFromCB):
-        """Extract the IPs according to the network input.
+        The name is generated is automatic and is definedaccording to the
+        network, the CVS name and the IP
 
         :param network:
             form "RCM", "TEMPO", etc...
         :type network:
             str
-
-        .. warning::
-            Works only on .CSV.
-        """
-        output = self.osmosf.writeFormattedParam(param)
-
-        if resultFromCB[0].count(",") == 5:
-            for index, axisValue in enumerate(self.axis):
-                ansListed = resultFromCB[index].split(", ")
-                a = ansListed[0] + ","
-                b = ansListed[1] + ","
-                c = ansListed[2] + ","
-                d = ansListed[3] + "<"
-                e = ansListed[4] + ">"
-                f = ansListed[5]
-
-                output = output.replace(param + axisValue + "=a,b,c,d<e>f",
-                                        param +  axisValue + "=" + a + b + c + d + e + f)
-
-        if resultFromCB[0].count(",") == 4:
-            for index, axisValue in enumerate(self.axis):
-                ansListed = resultFromCB[index].split(", ")
-                a = ansListed[0] + ","
-                b = ansListed[1] + ","
-                c = ansListed[2] + ","
-                d = ansListed[3] + "<"
-                e = ansListed[4]
-
-                output = output.replace(param + axisValue + "=a,b,c,d<e",
-                                        param +  axisValue + "=" + a + b + c + d + e)
-
-        return output
-
-        # In[1]: internal function for Class OSMOSGui
-    def __VectorRead(self, param):
-        """Extract the IPs according to the network input.
-
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
+        :param ip:
+            IP of the controlbox
+        :type ip:
             str
 
-        .. warning::
-            Works only on .CSV.
-        """
-        if param[-1] == "I":
-            answers = []
-            for axisValue in self.vectorSpeed:
-                cmd = self.osmosf.GetFormattedCmd(param, axisValue)
-                ans = self.CB.GetParameter(cmd)
-                answers.append(ans)
-
-        else:
-            answers = []
-            for axisValue in self.vectors:
-                cmd = self.osmosf.GetFormattedCmd(param, axisValue)
-                ans = self.CB.GetParameter(cmd)
-                answers.append(ans)
-        return answers
-
-    def __VectorWrite(self, param, resultFromCB):
-        """Extract the IPs according to the network input.
+        .. important::
+            ``UserIP`` should be xxxx.xxxx.xxxx.xxxx format (not GALIL format)
 
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
+        :return:
+            Return a string composed of system informations
+        :rtype:
             str
-
-        .. warning::
-            Works only on .CSV.
         """
-        if param[-1] == "I":
-            output = self.osmosf.writeFormattedParam(param)
-            param = param[:2]
-
-            for index, axisValue in enumerate(self.vectorSpeed):
-                searchSubStr = param + axisValue + "=v"
-                fullSubStr = param + axisValue + "=" + resultFromCB[index]
-                output = output.replace(searchSubStr, fullSubStr)
-
-        else:
-            output = self.osmosf.writeFormattedParam(param)
-
-            for index, axisValue in enumerate(self.vectors):
-                output = output.replace(param + axisValue + "=v",
-                                        param + axisValue + "=" + resultFromCB[index])
-
-        return output
+        if ip is not None and network is not None:
+            CVSName = self.osmosf.CBFileGetName(ip)
+            name = "OSMOS_" + CVSName
 
-    def __DoesFWExists(self, parameter):
-        """Extract the IPs according to the network input.
+        elif ip is not None and network is None:
+            name = "OSMOS_" + ip
 
-        :param network:
-            form "RCM", "TEMPO", etc...
-        :type network:
-            str
+        elif ip is None and network is not None:
+            name = "OSMOS_" + network
 
-        .. warning::
-            Works only on .CSV.
-        """
-        firmwares = self.osmosf.CdeFileGetFWAvail(parameter)
-        firmware = self.CB.GetFWVersion()
-        for FW in firmwares:
-            if FW == firmware:
-                return True
+        else:
+            print("nothing to work on!")
+            return name
+        name = name + ".txt"
 
-        return False
+        return name
 
 
 if __name__ == '__main__':
@@ -0,0 +1,1105 @@
+# -*- coding: utf-8 -*-
+"""Extract one ControlBox into a ``.bak`` file.
+
+Description
+-----------
+OSMOSExtract python file holds everything needed to request the values of a
+single ControlBox and to write them, parsed at GALIL format, into its
+``.bak`` file.
+
+Each ``OSMOSExtract`` object owns its own ControlBox (and then its own
+gclib connection). Several objects can be used at the same time, each one
+in its own thread, to extract several ControlBoxes of a network in
+parallel (see ``OSMOS.UpdateWorkers``).
+
+The ``.log`` file is not written here. The lines to add are gathered in
+``logLines`` and written all at once by OSMOS, so the lines of two
+ControlBoxes never get mixed up in the ``.log``.
+
+Libraries/Modules
+-----------------
+- re standard library (https://docs.python.org/3/library/re.html)
+    - Find the labels of a stored microcode.
+- hashlib standard library (https://docs.python.org/3/library/hashlib.html)
+    - Compare the new content of a ``.bak`` with the existing one.
+- time standard library (https://docs.python.org/2/library/time.html)
+    - Wait before trying a part of the extraction again.
+- TXTFile library (:file:../FilePages/TXTFile.html)
+    - Access to writable files functions.
+- ControlBox library (:file:../CBPages/ControlBox.html)
+    - Access communications functions with a ControlBox.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- Split from OSMOS python file. The parsing methods are the same.
+- __ParamTrt is too complex. This should be reworked. Categories are too
+  specifics. This should be re-thought and changed.
+
+TODO
+----
+- Implement Tests according to Official tests protocol (TDD)
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import os
+import re
+import time
+import hashlib
+from File import TXTFile as txtf
+from Packages.Controlbox import ControlBox
+
+
+class OSMOSExtract:
+    """Class extracting the datas of one ControlBox at a time.
+
+    :param osmosf:
+        OSMOS configuration files (CB and Cde ``.csv``) to work with.
+        It is only read, so it can be shared between several objects.
+    :type osmosf:
+        OSMOSFiles.OSMOSFiles
+
+    :attr CB:
+        ControlBox owned by this object
+    :type CB:
+        ControlBox.ControlBox
+    :attr logLines:
+        lines to write into the ``.log`` for the last ControlBox extracted
+    :type logLines:
+        list
+    :attr axis:
+        every axis a ``.bak`` file holds, from "A" to "H"
+    :type axis:
+        list
+    :attr cbAxis:
+        axis the last ControlBox extracted actually has (read from its
+        system informations)
+    :type cbAxis:
+        list
+    :attr failures:
+        failures of the last ControlBox extracted since its last complete
+        extraction
+    :type failures:
+        int
+    :attr phaseAttempts:
+        times a part of the extraction is tried before giving up
+    :type phaseAttempts:
+        int
+    :attr retryDelay:
+        wait (s) before the first new attempt. It doubles each attempt.
+    :type retryDelay:
+        float
+    :attr breakerThreshold:
+        failures from which a ControlBox is not requested anymore
+    :type breakerThreshold:
+        int
+    :attr incremental:
+        ``True`` to keep the microcode of the previous ``.bak`` when the
+        ControlBox still has the same one (see ``EnableIncremental``)
+    :type incremental:
+        bool
+    :attr programPath:
+        how the microcode of the last ControlBox extracted was got :
+        "uploaded" or "reused" (``None`` if not got)
+    :type programPath:
+        str
+    :attr incrementalBak:
+        ``True`` to write the ``.bak`` only if its content changed (see
+        ``EnableIncrementalBak``)
+    :type incrementalBak:
+        bool
+    :attr bakStatus:
+        what happened to the ``.bak`` of the last ControlBox extracted, in
+        incremental ``.bak`` mode : "changed" or "unchanged" (``None``
+        otherwise)
+    :type bakStatus:
+        str
+    """
+
+    phaseAttempts = 3
+
+    retryDelay = 0.5
+
+    breakerThreshold = 5
+
+    def __init__(self, osmosf):
+        self.osmosf = osmosf
+        self.CB = ControlBox.ControlBox()
+        self.logLines = []
+        self.failures = 0
+        self.incremental = False
+        self.programPath = None
+        self.incrementalBak = False
+        self.bakStatus = None
+        self.__serial = None
+        self.__previousBak = None
+
+        self.axis = ["A", "B", "C", "D", "E", "F", "G", "H"]
+        self.cbAxis = self.axis
+        self.vectors = ["S", "T"]
+        self.vectorSpeed = ["N", "M"]
+
+        # writers of the parameters in the .bak, per type-wrtbak
+        self.__writers = {"Standard": self.__StdWrite,
+                          "Sized": self.__SizedWrite,
+                          "Special": self.__SpecialWrite,
+                          "Unique": self.__UniqueWrite,
+                          "Vector": self.__VectorWrite}
+
+    def EnableIncremental(self, enable=True):
+        """Enable or disable the reuse of the stored microcode.
+
+        When enabled, the label table of the ControlBox (see
+        ``ControlBox.GetLabels``) is compared to the labels of the microcode
+        in the previous ``.bak``. If they are the same, and the serial and
+        the size of the microcode too, the stored microcode is written again
+        instead of being uploaded.
+
+        The size is probed with the last line of the stored microcode and
+        the line after it (see ``ControlBox.GetProgramLines``) : a line
+        added, removed or changed at the end is seen.
+
+        .. warning::
+            A change which moves no label and keeps the size (ex : a value
+            in a line before the last one) is not seen : the stored
+            microcode is kept.
+
+        :param enable:
+            ``True`` to reuse the stored microcode when possible
+        :type enable:
+            bool
+        """
+        self.incremental = bool(enable)
+
+    def EnableIncrementalBak(self, enable=True):
+        """Enable or disable the writing of the changed ``.bak`` only.
+
+        When enabled, the content of the ``.bak`` is built in memory. The
+        existing ``.bak`` is replaced (see ``os.replace``) only if the digest
+        of its content differs, so an unchanged ``.bak`` is not touched. If
+        the extraction fails, the existing ``.bak`` is kept.
+
+        :param enable:
+            ``True`` to write the changed ``.bak`` only
+        :type enable:
+            bool
+        """
+        self.incrementalBak = bool(enable)
+
+    def Extract(self, ip, bakFullName, parametersList, failures=0):
+        """Request a ControlBox for every element and write its ``.bak``.
+
+        The sequence is disposed as such :
+            - connect to the ControlBox
+            - create and name the ``.bak`` file
+            - request the CB for elements and write in ``.bak`` file
+            - for each element done, add status in ``logLines``
+            - disconnect from the ControlBox
+
+        A part (System Info, parameters, variables, microcode) which fails
+        on a link error (see ``ControlBox.IsLinkError``) is tried again, up
+        to ``phaseAttempts`` times, waiting longer each time (``retryDelay``)
+        and reconnecting if needed. Any other error stops the extraction.
+
+        The failures of the ControlBox since its last complete extraction
+        are counted in ``failures``. From ``breakerThreshold`` failures, the
+        ControlBox is not requested anymore (circuit breaker) : the
+        extraction fails.
+
+        :param ip:
+            IP of the controlbox
+        :type ip:
+            str
+        :param bakFullName:
+            path of the ``.bak`` file, with a ``.txt`` extension
+        :type bakFullName:
+            str
+        :param parametersList:
+            GALIL parameters to request (ex : [SP, AC, ...])
+        :type parametersList:
+            list
+        :param failures:
+            failures of the ControlBox before this extraction
+        :type failures:
+            int
+        :return:
+            ``False`` if the ControlBox couldn't be reached or a part of the
+            extraction failed, ``True`` otherwise
+        :rtype:
+            bool
+
+        .. important::
+            ``ip`` should be xxxx.xxxx.xxxx.xxxx format (not GALIL format)
+        """
+        self.logLines = []
+        self.logLines.append("------------------------------------")
+        self.failures = failures
+        self.programPath = None
+        self.bakStatus = None
+        self.__serial = None
+        self.__previousBak = None
+
+        if self.failures >= self.breakerThreshold:
+            self.logLines.append(f"{ip} not requested after "
+                                 f"{self.failures} failures\n\n")
+            return False
+
+        if not self.CB.Connect(ip):
+            self.failures += 1
+            self.logLines.append(f"couldn't connect to {ip}\n\n")
+            return False
+
+        bakName = bakFullName.replace(".txt", ".bak")
+        if self.incremental and os.path.exists(bakName):
+            self.__previousBak = txtf.TXT(bakName).GetAllContent()
+
+        # in incremental .bak mode, the content is written at the end
+        bakFile = None
+        bakContent = []
+        if not self.incrementalBak:
+            if os.path.exists(bakName):
+                oldFile = txtf.TXT(bakName)
+                oldFile.DeleteFile()
+
+            bakFile = txtf.TXT(bakFullName)
+            bakFile.EraseContent()
+            bakFile.RenameFile(bakName)
+
+        self.logLines.append(f"connected to {ip}")
+
+        phases = [("System Info", self.__SystemInfo, (), "System ok",
+                   "Getting System Info Failed", "due to : "),
+                  ("Parameters", self.__Configuration, (parametersList,),
+                   "parameters ok", "Getting configuration Failed",
+                   "error : "),
+                  ("Variables", self.__Data, (), "Variables ok",
+                   "Getting Datas (variables) Failed", "error : "),
+                  ("Microcode", self.__Program, (), "Microcode ok",
+                   "Getting Microcode Failed", "error : ")]
+
+        for name, phase, args, okLine, failedLine, reason in phases:
+            try:
+                print(f"{name} : run...")
+                part = self.__RunPhase(ip, phase, *args)
+                if bakFile is None:
+                    bakContent.append(part)
+                else:
+                    bakFile.AddContent(part)
+                self.logLines.append(okLine)
+                print(f"{name} : Done")
+
+            except Exception as ex:
+                self.logLines.append(failedLine)
+                self.logLines.append(f"{reason}{ex}")
+                self.CB.Disconnect()
+                self.logLines.append(f"disconnected from {ip}\n\n")
+                return False
+
+        self.CB.Disconnect()
+        disconnectTime = self.CB.GetDisconnectTime()
+
+        if bakFile is None:
+            if self.__WriteBak(bakName, bakContent):
+                self.bakStatus = "changed"
+            else:
+                self.bakStatus = "unchanged"
+            self.logLines.append(f".bak {self.bakStatus}")
+
+        self.logLines.append(f"disconnection time : {disconnectTime:.3f} s")
+        self.logLines.append(f"disconnected from {ip}\n\n")
+        print("New bak created\n")
+        self.failures = 0
+        return True
+
+    def __WriteBak(self, bakName, bakContent):
+        """Write the ``.bak`` if its content changed.
+
+        The content is the same as the one written part by part with
+        ``AddContent``. It is written into a temporary file first, which
+        then replaces the ``.bak`` : the ``.bak`` is never half written.
+
+        :param bakName:
+            path of the ``.bak`` file
+        :type bakName:
+            str
+        :param bakContent:
+            parts of the ``.bak`` (System Info, parameters, ...)
+        :type bakContent:
+            list
+        :return:
+            ``True`` if the ``.bak`` was written, ``False`` if unchanged
+        :rtype:
+            bool
+        """
+        content = ""
+        for part in bakContent:
+            content = content + part
+            if part[-1:] != "\n":
+                content = content + "\n"
+
+        digest = hashlib.sha256(content.encode("utf-8")).digest()
+        if os.path.exists(bakName):
+            oldDigest = hashlib.sha256()
+            try:
+                with open(bakName, mode="r", encoding="utf-8") as file:
+                    for line in file:
+                        oldDigest.update(line.encode("utf-8"))
+
+                if oldDigest.digest() == digest:
+                    return False
+
+            except (OSError, ValueError):
+                pass  # unreadable : written again
+
+        with open(bakName + ".tmp", mode="w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(bakName + ".tmp", bakName)
+        return True
+
+    def __RunPhase(self, ip, phase, *args):
+        """Run a part of the extraction, trying it again if it fails.
+
+        :param ip:
+            IP of the controlbox
+        :type ip:
+            str
+        :param phase:
+            method giving the part of the ``.bak`` (ex : ``__Data``)
+        :type phase:
+            method
+        :return:
+            Return the part of the ``.bak``
+        :rtype:
+            str
+        :raise Exception:
+            the error of the last attempt, or the first error which is not
+            a link error
+        """
+        for attempt in range(1, self.phaseAttempts + 1):
+            try:
+                if attempt > 1 and not self.__Reconnect(ip):
+                    raise ConnectionError(f"couldn't connect to {ip}")
+
+                return phase(*args)
+
+            except Exception as ex:
+                self.failures += 1
+                if attempt == self.phaseAttempts or \
+                        self.failures >= self.breakerThreshold or \
+                        not ControlBox.ControlBox.IsLinkError(ex):
+                    raise
+
+                self.logLines.append(f"attempt {attempt} failed : {ex}")
+                time.sleep(self.retryDelay * 2 ** (attempt - 1))
+
+    def __Reconnect(self, ip):
+        """Connect again to the ControlBox if it doesn't answer anymore.
+
+        :return:
+            ``True`` if the ControlBox is connected
+        :rtype:
+            bool
+        """
+        if self.CB.Ping():
+            return True
+
+        self.CB.Disconnect()
+        return self.CB.Connect(ip)
+
+    def __SystemInfo(self):
+        """Parser of the "System Info" part of the .bak file.
+
+        This internal method prepare and return a string to write in the file.
+        System Inof contains, for example:
+            - The Firmware of the contained in the controlBox
+            - Serial Number of the controlBox
+            - ...
+
+        .. critical::
+        The format is Highly codified and imposed by GALIL. Not respecting it
+        can compromise the ability to upload the parameters into a ControlBox
+
+        :return:
+            Return a string composed of system informations
+        :rtype:
+            str
+        """
+        info = self.CB.GetSystemInfo()
+        firmware = "Firmware=" + info["firmware"] + "\n"
+        serial = "Serial=" + info["serial"] + "\n"
+        device = "Device=" + info["device"] + "\n"
+        axisNb = "Axis=" + info["axis"] + "\n"
+        self.cbAxis = self.__GetCBAxis(info["axis"])
+        self.__serial = info["serial"]
+
+        systemInfo = "[SystemInfo]\n" + firmware + serial
+        systemInfo = systemInfo + device + axisNb
+        systemInfo = systemInfo + "\n"
+
+        self.logLines.append(f"firmware : {firmware}")
+        self.logLines.append(f"serial : {serial}")
+        return systemInfo
+
+    def __Configuration(self, parametersList):
+        """Parser of the "configuration" part of the .bak file.
+
+        This internal method prepare and return a string to write in the file.
+        Configuration contains the GALIL parameters values for each axis of a
+        controlBox.
+
+        .. note::
+        Configuration contains an *"init"* subsection wich is mainly for GALIL
+        purpose. It is, anyway, mandatory for the ``.bak`` to be functional.
+
+        .. critical::
+        The format is Highly codified and imposed by GALIL. Not respecting it
+        can compromise the ability to upload the parameters into a ControlBox
+
+        :return:
+            Return a string composed of init and parameters
+        :rtype:
+            str
+        """
+# ******************************** init ***************************************
+        echo = "EO=false" + "\n"
+        motOFF = "MO\\size=1\n" + "MO\\1\\Cmd=MO" + "\\r" + "\n"
+        ommitLeading0 = "LZ=LZ 1\\r" + "\n"
+
+        # every request is sent at once, packed in a few transactions
+        plan = self.__Plan(parametersList)
+        answers = self.CB.QueryBatch(plan["commands"])
+
+        variableFormat = "VF=VF " + answers[0] + "\\r" + "\n"
+        positionFormat = "PF=PF " + answers[1] + "\\r" + "\n"
+
+        config = "[Configuration]\n" + echo
+        config = config + variableFormat
+        config = config + positionFormat + ommitLeading0
+
+        index = 2
+        for step in plan["parameters"]:
+            resultFromCB = answers[index:index + step["count"]]
+            index = index + step["count"]
+            config = config + self.__ParamTrt(step, resultFromCB)
+
+        config = config + motOFF + "\n"
+        return config
+# *****************************************************************************
+
+    def __Data(self):
+        """Parser of the "Data" part of the .bak file.
+
+        This internal method prepare and return a string to write in the file.
+        Datas contains all variables and arrays used in the microcode.
+
+        .. critical::
+        The format is Highly codified and imposed by GALIL. Not respecting it
+        can compromise the ability to upload the parameters into a ControlBox
+
+        :return:
+            Return a string composed of variables and array
+        :rtype:
+            str
+        """
+# ***************************** Variables *************************************
+        variables = self.CB.GetAllVariables()
+        varSize = len(variables)
+
+        varData = ""
+        variableInit = "Variable\\"
+        for varNb, var in enumerate(variables):
+            nameValue = var.split("= ")
+            varName = nameValue[0]
+            varValue = nameValue[1]
+
+            varData = varData + variableInit
+            varData = varData + str(varNb+1) + "\\Name=" + varName + "\n"
+            varData = varData + variableInit
+            varData = varData + str(varNb+1) + "\\Value=" + varValue + "\n"
+
+        data = "[Data]\n"
+        data = data + variableInit + "size=" + str(varSize) + "\n"
+        data = data + varData
+
+# ****************************** Arrays ***************************************
+        arrays = self.CB.GetAllArrays()
+        arrNb = len(arrays)
+
+        arrData = ""
+        arrInit = "Array\\"
+
+        for arrNumber, array in enumerate(arrays):
+            nameLen = array.split("[")
+            arrName = nameLen[0]
+
+            arrLen = nameLen[1].split("]")
+            arrLen = arrLen[0]
+
+            arrData = arrData + arrInit
+            arrData = arrData + str(arrNumber+1) + "\\Name=" + arrName + "\n"
+            arrData = arrData + arrInit
+            arrData = arrData + str(arrNumber+1) + "\\Size=" + arrLen + "\n"
+
+            ansData = ", ".join(self.CB.GetArray(arrName, int(arrLen)))
+            arrData = arrData + arrInit
+            arrData = arrData + str(arrNumber+1) + "\\Value=" + ansData + "\n"
+
+        # print(arrData)
+        data = data + arrInit + "size=" + str(arrNb) + "\n"
+        data = data + arrData
+
+        data = data + "\n"
+        return data
+
+    def __Program(self):
+        """Parser of the "Program" part of the .bak file.
+
+        This internal method prepare and return a string to write in the file.
+        Program contains the microcode.
+
+        .. note::
+        The microcode is written on a unique line in the ``.bak``. This has to
+        been done to be fully understood by GalilSuite.
+
+        .. critical::
+        The format is Highly codified and imposed by GALIL. Not respecting it
+        can compromise the ability to upload the parameters into a ControlBox
+
+        :return:
+            Return a unique string composed of the program
+        :rtype:
+            str
+        """
+        programInit = "Program=\""
+        program = "[Program]\n"
+
+        if self.incremental:
+            storedProgram = self.__StoredProgram()
+            if storedProgram is not None:
+                self.programPath = "reused"
+                self.logLines.append("microcode : reused")
+                return program + storedProgram
+
+        mcode = self.CB.GetMicrocode().replace("\r\n", "\\n")
+        program = program + programInit + mcode + "\""
+        self.programPath = "uploaded"
+        if self.incremental:
+            self.logLines.append("microcode : uploaded")
+        return program
+
+    def __StoredProgram(self):
+        """Give the microcode of the previous ``.bak`` if it is unchanged.
+
+        The microcode is considered unchanged when the previous ``.bak``
+        comes from the same ControlBox (serial), its labels are at the
+        same lines as in the label table of the ControlBox and the
+        ControlBox has the same number of lines, ending with the same one.
+
+        :return:
+            Return the ``Program=`` line of the previous ``.bak``, ``None``
+            if the microcode has to be uploaded
+        :rtype:
+            str
+        """
+        if not self.__previousBak or "\n[Program]\n" not in self.__previousBak:
+            return None
+
+        if f"\nSerial={self.__serial}\n" not in self.__previousBak:
+            return None
+
+        storedProgram = self.__previousBak.split("\n[Program]\n", 1)[1]
+        storedProgram = storedProgram.rstrip("\n")
+        if not (storedProgram.startswith("Program=\"")
+                and storedProgram.endswith("\"")):
+            return None
+
+        storedLabels = []
+        mcode = storedProgram[len("Program=\""):-1]
+        for line, code in enumerate(mcode.split("\\n")):
+            label = re.match(r"#\w+", code.strip())
+            if label:
+                storedLabels.append(f"{label.group(0)}={line}")
+
+        labels = self.CB.GetLabels()
+        if not labels or labels != storedLabels:
+            return None
+
+        # size of the microcode : same last line and nothing after it
+        lines = [code.strip() for code in mcode.split("\\n")]
+        while lines and lines[-1] == "":
+            lines.pop()
+        try:
+            lastLines = self.CB.GetProgramLines(len(lines) - 1, len(lines))
+        except ControlBox.gclib.GclibError as ex:
+            if ControlBox.ControlBox.IsLinkError(ex):
+                raise
+            return None
+        if lastLines != lines[-1:]:
+            return None
+        return storedProgram
+
+    def __Plan(self, parametersList):
+        """Give the plan of the "configuration" part for this ControlBox.
+
+        The ControlBoxes with the same firmware and the same axis read the
+        same parameters with the same commands. Their plan is made for the
+        first one and kept in ``osmosf.plans`` (see
+        ``OSMOSFiles.GetPlans``), shared by every ``OSMOSExtract``.
+
+        A plan holds :
+            - ``firmware`` and ``axis`` it is made for
+            - ``requested`` : the GALIL parameters asked for
+            - ``commands`` : every command to send, in order
+            - ``parameters`` : the step of each parameter available on the
+              firmware (see ``__ParamStep``)
+
+        :param parametersList:
+            GALIL parameters to request (ex : [SP, AC, ...])
+        :type parametersList:
+            list
+        :return:
+            Return the plan
+        :rtype:
+            dict
+        """
+        firmware = self.CB.GetFWVersion()
+        key = firmware + ":" + "".join(self.cbAxis)
+
+        plan = self.osmosf.plans.get(key)
+        if plan is not None and plan["requested"] == parametersList:
+            return plan
+
+        commands = ["VF?", "PF?"]
+        parameters = []
+        for param in parametersList:
+            if self.osmosf.CdeFileIsFWAvail(param, firmware):
+                paramCmds = self.__ParamReadCmds(param)
+                parameters.append(self.__ParamStep(param, len(paramCmds)))
+                commands.extend(paramCmds)
+
+        plan = {"firmware": firmware,
+                "axis": list(self.cbAxis),
+                "requested": list(parametersList),
+                "commands": commands,
+                "parameters": parameters}
+        self.osmosf.plans[key] = plan
+        return plan
+
+    def __ParamReadCmds(self, param):
+        """Give the commands to send to read a parameter.
+
+        The commands depend on the category of the parameter, given in the
+        Cde ``.csv`` (see ``__ParamTrt``).
+
+        :param param:
+            form "SP", "AC", etc...
+        :type param:
+            str
+        :return:
+            Return the commands to send (ex : [SPA=?, SPB=?, ...])
+        :rtype:
+            list
+        :raise ValueError:
+            if the type-getparam of the parameter is unknown
+        """
+        howToRead = self.osmosf.CdeFileReadWriteType(param)[0]
+
+        if howToRead == "Standard":
+            commands = self.__StdReadCmds(param)
+
+        elif howToRead == "AllAxes":
+            commands = self.__AllAxesReadCmds(param)
+
+        elif howToRead == "Unique":
+            commands = self.__UniqueReadCmds(param)
+
+        elif howToRead == "Message":
+            commands = self.__MessageReadCmds(param)
+
+        elif howToRead == "Vector":
+            commands = self.__VectorReadCmds(param)
+
+        else:
+            raise ValueError(f"{param} : unknown type-getparam "
+                             f"'{howToRead}' in the Cde file")
+
+        return commands
+
+    def __ParamStep(self, param, cmdsNb):
+        """Give the step of a plan writing a parameter in the ``.bak``.
+
+        Everything the Cde ``.csv`` tells about the parameter is looked up
+        once, when the plan is made :
+            - ``param`` : the GALIL parameter
+            - ``count`` : number of its commands in the plan
+            - ``split`` : its answer holds the values of every axis
+            - ``fill`` : number of absent axis to complete
+            - ``write`` : its type-wrtbak
+            - ``template`` : its output, with the values to replace (the
+              list of its lines for a ``Sized`` parameter)
+
+        :param param:
+            form "SP", "AC", etc...
+        :type param:
+            str
+        :param cmdsNb:
+            number of commands reading the parameter
+        :type cmdsNb:
+            int
+        :return:
+            Return the step
+        :rtype:
+            dict
+        :raise ValueError:
+            if the type-wrtbak of the parameter is unknown
+        """
+        howToRead, howToWrite = self.osmosf.CdeFileReadWriteType(param)
+        if howToWrite not in self.__writers:
+            raise ValueError(f"{param} : unknown type-wrtbak "
+                             f"'{howToWrite}' in the Cde file")
+
+        fill = 0
+        if howToRead in ("Standard", "AllAxes"):
+            fill = len(self.axis) - len(self.cbAxis)
+
+        if howToWrite == "Sized":
+            template = self.osmosf.writeFormattedParam(param, len(self.axis))
+            template = template.split("\n")[:-1]
+        else:
+            template = self.osmosf.writeFormattedParam(param)
+
+        return {"param": param,
+                "count": cmdsNb,
+                "split": howToRead == "AllAxes",
+                "fill": fill,
+                "write": howToWrite,
+                "template": template}
+
+    def __ParamTrt(self, step, resultFromCB):
+        """Look "how to treat" the parameter given inside the Cde ``.csv``.
+
+        Parameters are given a category in the ``.csv`` document. According
+        to his category, the the way to requast a valul of the parameter is
+        different.
+
+        For example :
+            - ``SP`` is a``standard`` parameter. According to the category,
+            The way to ask the controlbox for is value is : ``SP<axis>=?``.
+            ``<axis>`` should have the value ``A``, ``B``, etc... until ``H``
+            - ``IA`` is a ``unique`` parameter. According to the category,
+            The way to ask the controlbox for is value is : ``IA ?``.
+            - ``MT`` is an ``AllAxes`` parameter. According to the category,
+            the values of every axis are asked at once : ``MT ?,?,...``. The
+            answer is split to be written as a ``standard`` one.
+
+        .. important::
+        The way to write the parameters in the ``.bak`` file has been
+        categorized as well. Unfortunately, there is a lot more way to write
+        than to read a parameter. Some of them have a unique way to be written,
+        which make them to be hard coded!
+        It is necessary to rethink the treatment of parameters to be as
+        independant as possible of the parameter.
+
+        The step of the parameter is made by ``__ParamStep`` with the plan.
+        This method formats the answers of its commands.
+
+        :param step:
+            step of the plan for the parameter
+        :type step:
+            dict
+        :param resultFromCB:
+            answers of the controller to the ``__ParamReadCmds`` commands
+        :type resultFromCB:
+            list
+        :return:
+            Return the formatted string "How To write" the parameter.
+        :rtype:
+            str
+        """
+        if step["split"]:
+            resultFromCB = [value.strip() for value in
+                            resultFromCB[0].split(",")]
+
+        if step["fill"]:
+            resultFromCB = self.__FillAbsentAxis(resultFromCB, step["fill"])
+
+        write = self.__writers[step["write"]]
+        return write(step["param"], step["template"], resultFromCB)
+
+        # In[1]: internal function for Class OSMOSGui
+    def __StdReadCmds(self, param):
+        """Give the commands to read a parameter on each axis.
+
+        :param param:
+            form "SP", "AC", etc...
+        :type param:
+            str
+        :return:
+            Return one command per axis (ex : [SPA=?, SPB=?, ...])
+        :rtype:
+            list
+        """
+        commands = []
+        for axisValue in self.cbAxis:
+            cmd = self.osmosf.GetFormattedCmd(param, axisValue)
+            commands.append(cmd)
+
+        return commands
+
+        # In[1]: internal function for Class OSMOSGui
+    def __AllAxesReadCmds(self, param):
+        """Give the command to read a parameter on every axis at once.
+
+        :param param:
+            form "SP", "AC", etc...
+        :type param:
+            str
+        :return:
+            Return the command (ex : [SP ?,?,?,?,?,?,?,?])
+        :rtype:
+            list
+        """
+        cmd = self.osmosf.GetFormattedCmd(param, self.cbAxis)
+
+        return [cmd]
+
+    def __StdWrite(self, param, output, answerFromCB):
+
+        for index, axisValue in enumerate(self.axis):
+            fullAns = param + axisValue + "=" + answerFromCB[index]
+            output = output.replace(param + axisValue + "=v", fullAns)
+
+        return output
+
+        # In[1]: internal function for Class OSMOSGui
+    def __UniqueReadCmds(self, param):
+        """Give the command to read a parameter without axis.
+
+        :param param:
+            form "IA", "SM", etc...
+        :type param:
+            str
+        :return:
+            Return the command (ex : [IA ?])
+        :rtype:
+            list
+        """
+        cmd = self.osmosf.GetFormattedCmd(param)
+
+        return [cmd]
+
+    def __UniqueWrite(self, param, output, answerFromCB):
+        """Extract the IPs according to the network input.
+
+        :param network:
+            form "RCM", "TEMPO", etc...
+        :type network:
+            str
+
+        .. warning::
+            Works only on .CSV.
+        """
+        answerFromCB[0] = answerFromCB[0].replace(", ", ",")
+        output = output.replace("v", answerFromCB[0])
+
+        return output
+
+        # In[1]: internal function for Class OSMOSGui
+    def __MessageReadCmds(self, param):
+        """Give the command to read a parameter through a message.
+
+        :param param:
+            form "TM", "CN0", etc...
+        :type param:
+            str
+        :return:
+            Return the command (ex : [MG_TM])
+        :rtype:
+            list
+        """
+        cmd = self.osmosf.GetFormattedCmd(param)
+        return [cmd]
+
+        # In[1]: internal function for Class OSMOSGui
+    def __SizedWrite(self, param, lines, resultFromCB):
+        """Extract the IPs according to the network input.
+
+        :param network:
+            form "RCM", "TEMPO", etc...
+        :type network:
+            str
+
+        .. warning::
+            Works only on .CSV.
+        """
+        Size = 0
+        output = "\n".join(lines[:2]) + "\n"
+
+        if param != "BA":
+            for value in resultFromCB:
+                if value != "0":
+                    Size += 1
+
+            output = "\n".join(lines[:Size + 1]) + "\n"
+            output = output.replace("size=v", "size=" + str(Size))
+
+        if param != "BA":
+            nb = 0
+            for index, axisValue in enumerate(self.axis):
+                ans = resultFromCB[index]
+                if ans != "0":
+                    nb += 1
+                    searchSubStr = param + "\\" + str(nb) + "\\Cmd=\""
+                    searchSubStr = searchSubStr + param + "x=v"
+                    fullSubStr = param + "\\" + str(nb) + "\\Cmd=\"" + param
+                    fullSubStr = fullSubStr + axisValue + "=" + ans
+                    output = output.replace(searchSubStr, fullSubStr)
+
+        return output
+
+        # In[1]: internal function for Class OSMOSGui
+    def __SpecialWrite(self, param, output, resultFromCB):
+        """Extract the IPs according to the network input.
+
+        :param network:
+            form "RCM", "TEMPO", etc...
+        :type network:
+            str
+
+        .. warning::
+            Works only on .CSV.
+        """
+        if resultFromCB[0].count(",") == 5:
+            for index, axisValue in enumerate(self.axis):
+                ansListed = resultFromCB[index].split(", ")
+                a = ansListed[0] + ","
+                b = ansListed[1] + ","
+                c = ansListed[2] + ","
+                d = ansListed[3] + "<"
+                e = ansListed[4] + ">"
+                f = ansListed[5]
+
+                output = output.replace(param + axisValue + "=a,b,c,d<e>f",
+                                        param +  axisValue + "=" + a + b + c + d + e + f)
+
+        if resultFromCB[0].count(",") == 4:
+            for index, axisValue in enumerate(self.axis):
+                ansListed = resultFromCB[index].split(", ")
+                a = ansListed[0] + ","
+                b = ansListed[1] + ","
+                c = ansListed[2] + ","
+                d = ansListed[3] + "<"
+                e = ansListed[4]
+
+                output = output.replace(param + axisValue + "=a,b,c,d<e",
+                                        param +  axisValue + "=" + a + b + c + d + e)
+
+        return output
+
+        # In[1]: internal function for Class OSMOSGui
+    def __VectorReadCmds(self, param):
+        """Give the commands to read a parameter on each vector.
+
+        :param param:
+            form "VA", "ACI", etc...
+        :type param:
+            str
+        :return:
+            Return one command per vector (ex : [VAS=?, VAT=?])
+        :rtype:
+            list
+        """
+        if param[-1] == "I":
+            commands = []
+            for axisValue in self.vectorSpeed:
+                cmd = self.osmosf.GetFormattedCmd(param, axisValue)
+                commands.append(cmd)
+
+        else:
+            commands = []
+            for axisValue in self.vectors:
+                cmd = self.osmosf.GetFormattedCmd(param, axisValue)
+                commands.append(cmd)
+        return commands
+
+    def __VectorWrite(self, param, output, resultFromCB):
+        """Extract the IPs according to the network input.
+
+        :param network:
+            form "RCM", "TEMPO", etc...
+        :type network:
+            str
+
+        .. warning::
+            Works only on .CSV.
+        """
+        if param[-1] == "I":
+            param = param[:2]
+
+            for index, axisValue in enumerate(self.vectorSpeed):
+                searchSubStr = param + axisValue + "=v"
+                fullSubStr = param + axisValue + "=" + resultFromCB[index]
+                output = output.replace(searchSubStr, fullSubStr)
+
+        else:
+            for index, axisValue in enumerate(self.vectors):
+                output = output.replace(param + axisValue + "=v",
+                                        param + axisValue + "=" + resultFromCB[index])
+
+        return output
+
+    def __GetCBAxis(self, axisNb):
+        """Give the axis a ControlBox has.
+
+        :param axisNb:
+            number of axis given by the system informations (ex : "4")
+        :type axisNb:
+            str
+        :return:
+            Return the axis of the ControlBox (ex : [A, B, C, D]). Every axis
+            is returned if the number is not understood.
+        :rtype:
+            list
+        """
+        if axisNb.isdigit() and 0 < int(axisNb) <= len(self.axis):
+            return self.axis[:int(axisNb)]
+
+        return self.axis
+
+    def __FillAbsentAxis(self, resultFromCB, missing):
+        """Complete the values read on the axis of the ControlBox.
+
+        The ``.bak`` holds every axis. An axis the ControlBox doesn't have is
+        written as "0" (or as "0, 0, ..." when a value is made of several
+        fields, like ``SI``). Such an axis is not counted in the size of a
+        ``Sized`` parameter.
+
+        :param resultFromCB:
+            one value per axis of the ControlBox
+        :type resultFromCB:
+            list
+        :param missing:
+            number of axis of the ``.bak`` the ControlBox doesn't have
+        :type missing:
+            int
+        :return:
+            Return one value per axis of the ``.bak``
+        :rtype:
+            list
+        """
+        fields = resultFromCB[0].count(",") + 1 if resultFromCB else 1
+        filler = ", ".join(["0"] * fields)
+        return resultFromCB + [filler] * missing
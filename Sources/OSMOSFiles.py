@@ -13,6 +13,10 @@ Libraries/Modules
 -----------------
 - os standard library (https://docs.python.org/3/library/os.html)
     - Access to files function.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Cache of the parsed ``.csv``.
+- hashlib standard library (https://docs.python.org/3/library/hashlib.html)
+    - Tell if a ``.csv`` changed since it was cached.
 - CSVFile library (:file:../FilePages/CSVFile.html)
     - Access to a CSV wrapper File management.
 
@@ -26,7 +30,9 @@ Version
 
 Notes
 -----
-- None
+- The columns read from each ``.csv`` are cached next to it
+  (``OSM_LIST_CB_cache.json``), the ``.csv`` is read again only when its
+  content changed.
 
 TODO
 ----
@@ -36,6 +42,7 @@ Author(s)
 ---------
 - Created by M. Cerato on 10/05/2022.
 - Modified by M. Cerato on 10/12/2022.
+- Modified by agent on 18/10/2026.
 
 Copyright (c) 2022 Cerato Workshop.  All rights reserved.
 
@@ -43,9 +50,61 @@ Members
 -------
 """
 import os
+import json
+import hashlib
 from Packages.File import CSVFile as csvf
 
 
+class CdeRecord:
+    """Class holding a GALIL parameter of the Cde file, ready to be used.
+
+    :param datas:
+        cells of the parameter line, per column of ``OSMOSFiles.CdeColumns``
+    :type datas:
+        dict
+
+    :attr firmwareSet:
+        firmwares the parameter is available on
+    :type firmwareSet:
+        frozenset
+    :attr getPrefix:
+        start of the reading command, before its first ``?`` (``AllAxes``)
+    :type getPrefix:
+        str
+    :attr writeLines:
+        lines of the ``.bak`` template, ``'`` already replaced by ``"``
+    :type writeLines:
+        list
+    :attr writeOutput:
+        whole ``.bak`` template, ready to be written
+    :type writeOutput:
+        str
+    """
+
+    __slots__ = ("name", "firmware", "firmwares", "firmwareSet", "readType",
+                 "writeType", "getFormat", "setFormat", "writeFormat",
+                 "getPrefix", "writeLines", "writeOutput")
+
+    def __init__(self, datas):
+        self.name = datas["parameter"]
+        self.firmware = datas["Firmware"]
+        self.firmwares = self.firmware.split(", ")
+        self.firmwareSet = frozenset(self.firmwares)
+        self.readType = datas["type-getparam"]
+        self.writeType = datas["type-wrtbak"]
+        self.getFormat = datas["get"]
+        self.setFormat = datas["set"]
+        self.writeFormat = datas["write"]
+
+        self.getPrefix = self.getFormat.partition("?")[0]
+        self.writeOutput = self.writeFormat.replace("'", '"') + "\n"
+        self.writeLines = self.writeFormat.replace("'", '"').split(r"\n")
+
+    def __repr__(self):
+        """Display the parameter."""
+        return f"Cde parameter : {self.name}"
+
+
 class OSMOSFiles:
     """Class managing OSMOS project configuration Files.
 
@@ -67,13 +126,55 @@ class OSMOSFiles:
         Should be : ``OSMOS/Sources/.log``
     :type DefaultCdeFile:
         str
+    :attr CBColumns:
+        columns of the CB file used
+    :type CBColumns:
+        list
+    :attr CdeColumns:
+        columns of the Cde file used
+    :type CdeColumns:
+        list
+    :attr networkIPs:
+        IPs of each network of the CB file
+    :type networkIPs:
+        dict
+    :attr IPNames:
+        name ("Racine-nom-CVS") of each IP of the CB file
+    :type IPNames:
+        dict
+    :attr uniqueNetworks:
+        networks of the CB file, each one once, in the order of the file
+    :type uniqueNetworks:
+        list
+    :attr catalog:
+        parameters of the Cde file, per name (the first one if listed twice)
+    :type catalog:
+        dict
+    :attr plans:
+        plans of the "configuration" part of the ``.bak``, per firmware and
+        axis (see ``GetPlans``). Emptied when the Cde file is read again,
+        filled back by ``LoadPlans``.
+    :type plans:
+        dict
+    :attr cacheInventories:
+        ``True`` to keep the parsed columns of each ``.csv`` in a cache
+        file next to it (``cacheSuffix``), read instead of the ``.csv``
+        while the ``.csv`` is unchanged
+    :type cacheInventories:
+        bool
+    :attr cacheSuffix:
+        end of the name of a cache file (ex : ``OSM_LIST_CB_cache.json``)
+    :type cacheSuffix:
+        str
     """
 
     # Get default Files
     Project = "OSMOS"
     ProjectDir = os.path.dirname(__file__)
 
-    while os.path.basename(ProjectDir) != Project:
+    # stops at the root if the project isn't in a directory named Project
+    while (os.path.basename(ProjectDir) != Project
+           and os.path.dirname(ProjectDir) != ProjectDir):
         ProjectDir = os.path.dirname(ProjectDir)
 
     DefaultCBFile = ProjectDir + "\\Documentation\\Reference"
@@ -82,6 +183,15 @@ class OSMOSFiles:
     DefaultCdeFile = ProjectDir + "\\Documentation\\Reference"
     DefaultCdeFile = DefaultCdeFile + "\\OSM_LIST_CDE.csv"
 
+    CBColumns = ["network", "Adresse-IP", "Racine-nom-CVS"]
+
+    CdeColumns = ["parameter", "Firmware", "type-getparam", "type-wrtbak",
+                  "get", "set", "write"]
+
+    cacheInventories = True
+
+    cacheSuffix = "_cache.json"
+
     # ********************
 
     def __init__(self, pathCB=DefaultCBFile, pathCmd=DefaultCdeFile):
@@ -89,22 +199,15 @@ class OSMOSFiles:
         self.listCB = csvf.CSV(pathCB)
         self.listCde = csvf.CSV(pathCmd)
 
-        self.CBDatas = self.listCB.GetColumnDatas()
+        self.CBDatas = self.__ColumnDatas(self.listCB, self.CBColumns)
         self.networks = self.FileCleanup(self.CBDatas["network"], '')
         self.Ips = self.FileCleanup(self.CBDatas["Adresse-IP"], '')
         self.Names = self.FileCleanup(self.CBDatas["Racine-nom-CVS"], '')
+        self.__IndexCB()
 
-        self.CdeDatas = self.listCde.GetColumnDatas()
-        self.FWAvailable = self.FileCleanup(self.CdeDatas["Firmware"], '')
-        self.syntaxGetParam = self.FileCleanup(self.CdeDatas["type-getparam"],
-                                               '')
-        self.param = self.FileCleanup(self.CdeDatas["parameter"], '')
-        self.getParamFormat = self.FileCleanup(self.CdeDatas["get"], '')
-        self.setParamFormat = self.FileCleanup(self.CdeDatas["set"], '')
-
-        self.syntaxWriteBak = self.FileCleanup(self.CdeDatas["type-wrtbak"],
-                                               '')
-        self.writeBakFormat = self.FileCleanup(self.CdeDatas["write"], '')
+        self.CdeDatas = self.__ColumnDatas(self.listCde,
+                                           self.CdeColumns)
+        self.__IndexCde()
 
     def FileCleanup(self, listToClean, strToClean):
         """Take ``strToClean`` off the ``listToClean``.
@@ -142,10 +245,11 @@ class OSMOSFiles:
             str
         """
         self.listCB = csvf.CSV(newPath)
-        self.CBDatas = self.listCB.GetColumnDatas()
+        self.CBDatas = self.__ColumnDatas(self.listCB, self.CBColumns)
         self.networks = self.FileCleanup(self.CBDatas["network"], '')
         self.Ips = self.FileCleanup(self.CBDatas["Adresse-IP"], '')
         self.Names = self.FileCleanup(self.CBDatas["Racine-nom-CVS"], '')
+        self.__IndexCB()
         print(f"new file : {newPath}")
 
     def UpdateCdeFile(self, newPath):
@@ -159,17 +263,9 @@ class OSMOSFiles:
             str
         """
         self.listCde = csvf.CSV(newPath)
-        self.CdeDatas = self.listCde.GetColumnDatas()
-        self.FWAvailable = self.FileCleanup(self.CdeDatas["Firmware"], '')
-        self.syntaxGetParam = self.FileCleanup(self.CdeDatas["type-getparam"],
-                                               '')
-        self.param = self.FileCleanup(self.CdeDatas["parameter"], '')
-        self.getParamFormat = self.FileCleanup(self.CdeDatas["get"], '')
-        self.setParamFormat = self.FileCleanup(self.CdeDatas["set"], '')
-
-        self.syntaxWriteBak = self.FileCleanup(self.CdeDatas["type-wrtbak"],
-                                               '')
-        self.writeBakFormat = self.FileCleanup(self.CdeDatas["write"], '')
+        self.CdeDatas = self.__ColumnDatas(self.listCde,
+                                           self.CdeColumns)
+        self.__IndexCde()
         print(f"new file : {newPath}")
         # In[1]: internal function for Class OSMOSGui
 
@@ -185,6 +281,16 @@ class OSMOSFiles:
         """
         return self.networks
 
+    def CBFileUniqueNtwrks(self):
+        """Give the networks of the CB file, each one once.
+
+        :return:
+            Return a list of networks, in the order of the file
+        :rtype:
+            list
+        """
+        return list(self.uniqueNetworks)
+
     def CBFileNtwrkFilter(self, network):
         """Extract the IPs according to the network input.
 
@@ -197,11 +303,7 @@ class OSMOSFiles:
         :rtype:
             list
         """
-        networkIPs = []
-        for index, net in enumerate(self.networks):
-            if net == network:
-                networkIPs.append(self.Ips[index])
-        return networkIPs
+        return list(self.networkIPs.get(network, []))
 
     def CBFileGetName(self, IP):
         """Give the name of the ControlBox Associated to the given IP.
@@ -220,12 +322,7 @@ class OSMOSFiles:
         .. warning::
             IP can be ``None``! It will just be ignored in the .csv list
         """
-        for index, ip in enumerate(self.Ips):
-            if ip == IP:
-                CVSName = self.Names[index]
-                return CVSName
-
-        return None  # "NameNotFound"
+        return self.IPNames.get(IP)  # None : "NameNotFound"
 
         # In[1]: internal function for Class OSMOSGui
 
@@ -242,11 +339,8 @@ class OSMOSFiles:
         :rtype:
             list
         """
-        parameters = []
-        for index, FWValue in enumerate(self.FWAvailable):
-            if FWValue == FW:
-                parameters.append(self.param[index])
-        return parameters
+        return [record.name for record in self.records
+                if record.firmware == FW]
 
     def CdeFileParamList(self):
         """Return the entire list of paramters in the file.
@@ -259,7 +353,7 @@ class OSMOSFiles:
         :rtype:
             list
         """
-        return self.FileCleanup(self.CdeDatas["parameter"], '')
+        return list(self.param)
 
     def CdeFileReadWriteType(self, parameter):
         """Give the *""How to read"* and *"How to Write"* of a GALIL parameter.
@@ -282,11 +376,9 @@ class OSMOSFiles:
             list
 
         """
-        commandIndex = self.param.index(parameter)
-        readType = self.syntaxGetParam[commandIndex]
-        writeType = self.syntaxWriteBak[commandIndex]
+        record = self.__Record(parameter)
 
-        return readType, writeType
+        return record.readType, record.writeType
 
     def CdeFileGetFWAvail(self, parameter):
         """Return the available GALIL firmwares for a GALIL parameter given.
@@ -302,10 +394,26 @@ class OSMOSFiles:
             list
 
         """
-        commandIndex = self.param.index(parameter)
-        WhichFW = self.FWAvailable[commandIndex].split(", ")
+        return list(self.__Record(parameter).firmwares)
+
+    def CdeFileIsFWAvail(self, parameter, FW):
+        """Tell if a GALIL parameter is available on a GALIL firmware.
+
+        :param parameter:
+            GALIL parameter (ex: SP or AC or DC)
+        :type parameter:
+            str
+        :param FW:
+            GALIL Firmware (ex: DMC4183s56f or DMC2182s87j)
+        :type FW:
+            str
 
-        return WhichFW
+        :return:
+            Return ``True`` if the parameter is available
+        :rtype:
+            bool
+        """
+        return FW in self.__Record(parameter).firmwareSet
 
     def GetFormattedCmd(self, commandToGet, axis="A"):
         """Return the formatted way to read a parameter.
@@ -316,35 +424,41 @@ class OSMOSFiles:
             This is according to the way to read the parameter. i.e: IA doesn't
             have any axis then it will return "IA ?"
 
+        .. note::
+            An ``AllAxes`` parameter is read on every axis in one request. Its
+            axis are given at once (ex: parameter is SP and axis is "ABCD"
+            then, it returns SP ?,?,?,?)
+
         :param commandToGet:
             GALIL parameter (ex: SP or AC or DC)
         :type commandToGet:
             str
 
         :param axis:
-            GALIL axis from "A" to "H"
+            GALIL axis from "A" to "H" (all the axis for ``AllAxes``)
         :type axis:
-            str
+            str or list
 
         :return:
             the formatted reading string
         :rtype:
             str
         """
-        commandIndex = self.param.index(commandToGet)
-        if self.syntaxGetParam[commandIndex] == "Standard":
-            paramCommandFormat = self.getParamFormat[commandIndex]
-            command = paramCommandFormat.replace("x", axis)
+        record = self.__Record(commandToGet)
+        if record.readType == "Standard":
+            command = record.getFormat.replace("x", axis)
 
-        elif self.syntaxGetParam[commandIndex] == "Unique":
-            command = self.getParamFormat[commandIndex]
+        elif record.readType == "AllAxes":
+            command = record.getPrefix + ",".join(["?"] * len(axis))
 
-        elif self.syntaxGetParam[commandIndex] == "Message":
-            command = self.getParamFormat[commandIndex]
+        elif record.readType == "Unique":
+            command = record.getFormat
+
+        elif record.readType == "Message":
+            command = record.getFormat
 
         else:
-            paramCommandFormat = self.getParamFormat[commandIndex]
-            command = paramCommandFormat.replace("x", axis)
+            command = record.getFormat.replace("x", axis)
 
         return command
 
@@ -373,26 +487,239 @@ class OSMOSFiles:
         :rtype:
             str
         """
-        commandIndex = self.param.index(paramTolook)
+        record = self.__Record(paramTolook)
 
-        if self.syntaxWriteBak[commandIndex] == "Sized":
-            paramWriteFormat = self.writeBakFormat[commandIndex]
-            paramList = paramWriteFormat.split(r"\n")
-            paramList = paramList[:int(size)+1]
-            paramWriteFormat = ""
+        if record.writeType == "Sized":
+            return "\n".join(record.writeLines[:int(size)+1]) + "\n"
 
-            for elt in paramList:
-                if elt != paramList[-1]:
-                    paramWriteFormat = paramWriteFormat + elt + "\n"
-                else:
-                    paramWriteFormat = paramWriteFormat + elt
-            paramWriteFormat = paramWriteFormat.replace("'", '"')
+        return record.writeOutput
 
-        else:
-            paramWriteFormat = self.writeBakFormat[commandIndex]
-            paramWriteFormat = paramWriteFormat.replace("'", '"')
+    def GetPlans(self):
+        """Give the plans made by the extractions since the Cde file read.
 
-        return paramWriteFormat + "\n"
+        A plan holds the commands sent to read the parameters of the
+        ControlBoxes with a firmware and some axis (ex : key
+        ``DMC4183s56g:ABCDEFGH``), see ``OSMOSExtract``.
+
+        :return:
+            Return the plans, per firmware and axis
+        :rtype:
+            dict
+        """
+        return dict(self.plans)
+
+    def SavePlans(self, fullName):
+        """Write the plans into a ``.json`` file, to be read by ``LoadPlans``.
+
+        The SHA-256 of the Cde file is written with them : the plans are
+        only loaded again with the same Cde file.
+
+        :param fullName:
+            path of the ``.json`` file
+        :type fullName:
+            str
+        """
+        saved = {"Cde": self.__CdeDigest(), "plans": self.GetPlans()}
+        with open(fullName, "w", encoding="utf-8") as file:
+            json.dump(saved, file, indent=4, sort_keys=True)
+
+    def LoadPlans(self, fullName):
+        """Add the plans saved by ``SavePlans`` to ``plans``.
+
+        A missing or unreadable file is ignored, as the plans made from
+        another Cde file (its content changed since they were saved) or
+        saved by a version whose plans had other fields.
+
+        :param fullName:
+            path of the ``.json`` file
+        :type fullName:
+            str
+        """
+        try:
+            with open(fullName, encoding="utf-8") as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(saved, dict) or not isinstance(saved.get("plans"),
+                                                          dict):
+            return
+        if saved.get("Cde") is None or saved["Cde"] != self.__CdeDigest():
+            return
+
+        keys = {"firmware", "axis", "requested", "commands", "parameters"}
+        stepKeys = {"param", "count", "split", "fill", "write", "template"}
+        for key, plan in saved["plans"].items():
+            if not isinstance(plan, dict) or not keys <= set(plan):
+                continue
+            if all(isinstance(step, dict) and stepKeys <= set(step)
+                   for step in plan["parameters"]):
+                self.plans.setdefault(key, plan)
+
+    # In[2]: internal functions for the indexes of the CB and Cde files
+    def __IndexCB(self):
+        """Build the indexes of the CB file, once per file read.
+
+        - ``networkIPs`` : IPs of each network
+        - ``IPNames`` : name of each IP (the first one if listed twice)
+        - ``uniqueNetworks`` : networks, each one once
+
+        The indexes are built line by line : a line with a blank network,
+        IP or name is skipped, it never shifts the cells of the others.
+        """
+        columns = [self.CBDatas[column] for column in self.CBColumns]
+        self.networkIPs = {}
+        self.IPNames = {}
+        for network, ip, name in zip(*columns):
+            if network == '' or ip == '' or name == '':
+                continue
+            self.networkIPs.setdefault(network, []).append(ip)
+            self.IPNames.setdefault(ip, name)
+
+        self.uniqueNetworks = list(self.networkIPs)
+
+    def __IndexCde(self):
+        """Build the catalog of the Cde file, once per file read.
+
+        One ``CdeRecord`` per line with a parameter : its cells stay
+        together even when other lines have blank cells. The lists
+        ``param``, ``FWAvailable``, ``syntaxGetParam``, ... are kept for
+        the callers reading them, built from the same records.
+        """
+        columns = [self.CdeDatas[column] for column in self.CdeColumns]
+        self.records = []
+        for cells in zip(*columns):
+            datas = dict(zip(self.CdeColumns, cells))
+            if datas["parameter"] != '':
+                self.records.append(CdeRecord(datas))
+
+        self.catalog = {}
+        for record in self.records:
+            self.catalog.setdefault(record.name, record)
+
+        self.param = [record.name for record in self.records]
+        self.FWAvailable = [record.firmware for record in self.records]
+        self.syntaxGetParam = [record.readType for record in self.records]
+        self.syntaxWriteBak = [record.writeType for record in self.records]
+        self.getParamFormat = [record.getFormat for record in self.records]
+        self.setParamFormat = [record.setFormat for record in self.records]
+        self.writeBakFormat = [record.writeFormat for record in self.records]
+
+        # made from the previous Cde file
+        self.plans = {}
+
+    def __CdeDigest(self):
+        """Give the SHA-256 of the Cde file, ``None`` if it can't be read."""
+        cdeFullName = os.path.join(self.listCde.GetFilePath(),
+                                   self.listCde.GetFileName())
+        try:
+            return self.__Digest(cdeFullName)
+        except OSError:
+            return None
+
+    def __Record(self, parameter):
+        """Give the record of a parameter of the Cde file.
+
+        :raise ValueError:
+            if the parameter isn't in the Cde file
+        """
+        try:
+            return self.catalog[parameter]
+        except KeyError:
+            raise ValueError(f"{parameter} is not in the Cde file") from None
+
+    # In[3]: internal functions for the cache of the .csv
+    def __ColumnDatas(self, csvFile, columns):
+        """Give the columns of a ``.csv``, from its cache if unchanged.
+
+        The cache file holds the size, the modification time and the
+        SHA-256 of the ``.csv`` it was made from. The ``.csv`` is read
+        again only if its content changed : a ``.csv`` only touched (same
+        content, new modification time) just updates the cache.
+
+        :param csvFile:
+            ``.csv`` to read
+        :type csvFile:
+            CSVFile.CSV
+        :param columns:
+            columns to read
+        :type columns:
+            list
+        :return:
+            Return the datas of each column, as ``GetColumnDatas``
+        :rtype:
+            dict
+        """
+        if not self.cacheInventories:
+            return csvFile.GetColumnDatas(columns)
+
+        csvFullName = os.path.abspath(os.path.join(csvFile.GetFilePath(),
+                                                   csvFile.GetFileName()))
+        cacheFullName = os.path.splitext(csvFullName)[0] + self.cacheSuffix
+
+        try:
+            stat = os.stat(csvFullName)
+        except OSError:
+            return csvFile.GetColumnDatas(columns)
+
+        cache = self.__ReadCache(cacheFullName)
+        digest = None
+        if (cache.get("source") == csvFullName
+                and cache.get("columns") == columns
+                and cache.get("size") == stat.st_size):
+            if cache.get("mtime") == stat.st_mtime_ns:
+                return cache["datas"]
+
+            digest = self.__Digest(csvFullName)
+            if cache.get("sha256") == digest:
+                cache["mtime"] = stat.st_mtime_ns
+                self.__WriteCache(cacheFullName, cache)
+                return cache["datas"]
+
+        # hashed once, even when compared to the cache
+        if digest is None:
+            digest = self.__Digest(csvFullName)
+
+        datas = csvFile.GetColumnDatas(columns)
+        self.__WriteCache(cacheFullName,
+                          {"source": csvFullName,
+                           "size": stat.st_size,
+                           "mtime": stat.st_mtime_ns,
+                           "sha256": digest,
+                           "columns": columns,
+                           "datas": datas})
+        return datas
+
+    def __Digest(self, fullName):
+        """Give the SHA-256 of a file."""
+        digest = hashlib.sha256()
+        with open(fullName, mode="rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def __ReadCache(self, cacheFullName):
+        """Read a cache file, empty if missing or unreadable."""
+        try:
+            with open(cacheFullName, encoding="utf-8") as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def __WriteCache(self, cacheFullName, cache):
+        """Write a cache file, never half written.
+
+        .. note::
+            A cache which can't be written (read only directory...) is
+            ignored : the ``.csv`` is just read again next time.
+        """
+        try:
+            with open(cacheFullName + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(cache, file, separators=(",", ":"))
+            os.replace(cacheFullName + ".tmp", cacheFullName)
+        except OSError:
+            pass
 
 
 if __name__ == '__main__':
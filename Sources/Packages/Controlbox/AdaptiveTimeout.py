@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Learn the timeouts of the ControlBoxes from their round trip times.
+
+Description
+-----------
+gclib waits up to 5 s for every answer, whatever the ControlBox. A fast
+ControlBox answers in a few ms : a dead one costs 5 s per command.
+
+``AdaptiveTimeout`` keeps, for each IP, a rolling estimate of the round
+trip time (RTT) of the commands and gives the timeout to use with it :
+    - a command : ``rttFactor`` times the RTT (at least ``minTimeout``)
+    - a bulk transfer (microcode, arrays, lists) : ``bulkFactor`` times the
+      RTT (at least ``minBulkTimeout``)
+
+A command never waits more than ``maxTimeout`` (the gclib timeout). A bulk
+transfer never waits less than the gclib timeout, nor more than
+``maxBulkTimeout`` : its length depends on the size transferred more than
+on the RTT. A timeout doubles the estimate, until the next answer.
+
+The estimates can be saved in a ``.json`` file and loaded at the next run,
+so the first command of a ControlBox already uses a sensible timeout.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Save the estimates between runs.
+- threading standard library (https://docs.python.org/3/library/threading.html)
+    - Share the estimates between ControlBoxes of several threads.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- The estimate is an exponentially weighted moving average (as TCP does).
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import json
+import threading
+
+
+class AdaptiveTimeout:
+    """Class keeping the RTT estimates of the ControlBoxes.
+
+    :attr alpha:
+        weight of a new RTT measure in the estimate
+    :type alpha:
+        float
+    :attr rttFactor:
+        timeout of a command, in RTT
+    :type rttFactor:
+        float
+    :attr bulkFactor:
+        timeout of a bulk transfer, in RTT
+    :type bulkFactor:
+        float
+    :attr minTimeout:
+        smallest timeout (ms) of a command
+    :type minTimeout:
+        int
+    :attr minBulkTimeout:
+        smallest timeout (ms) of a bulk transfer, the one of gclib
+    :type minBulkTimeout:
+        int
+    :attr maxTimeout:
+        greatest timeout (ms) of a command, the one of gclib
+    :type maxTimeout:
+        int
+    :attr maxBulkTimeout:
+        greatest timeout (ms) of a bulk transfer
+    :type maxBulkTimeout:
+        int
+    """
+
+    alpha = 0.125
+
+    rttFactor = 8
+
+    bulkFactor = 50
+
+    minTimeout = 200
+
+    minBulkTimeout = 5000
+
+    maxTimeout = 5000
+
+    maxBulkTimeout = 60000
+
+    def __init__(self):
+        self.__rtt = {}
+        self.__lock = threading.Lock()
+
+    def Update(self, ip, rtt):
+        """Add a RTT measure of a ControlBox.
+
+        :param ip:
+            IP of the ControlBox
+        :type ip:
+            str
+        :param rtt:
+            time (s) between a command and its answer
+        :type rtt:
+            float
+        """
+        rtt = rtt * 1000
+        with self.__lock:
+            if ip in self.__rtt:
+                rtt = (1 - self.alpha) * self.__rtt[ip] + self.alpha * rtt
+            self.__rtt[ip] = rtt
+
+    def Failure(self, ip):
+        """Take a timeout of a ControlBox into account.
+
+        The estimate is doubled (up to the one giving ``maxTimeout``).
+
+        :param ip:
+            IP of the ControlBox
+        :type ip:
+            str
+        """
+        with self.__lock:
+            if ip in self.__rtt:
+                self.__rtt[ip] = min(2 * self.__rtt[ip],
+                                     self.maxTimeout / self.rttFactor)
+
+    def GetRTT(self, ip):
+        """Return the RTT estimate of a ControlBox.
+
+        :return:
+            Return the estimate (ms), ``None`` if unknown
+        :rtype:
+            float
+        """
+        with self.__lock:
+            return self.__rtt.get(ip)
+
+    def GetTimeout(self, ip, bulk=False):
+        """Return the timeout to use with a ControlBox.
+
+        :param ip:
+            IP of the ControlBox
+        :type ip:
+            str
+        :param bulk:
+            ``True`` for a bulk transfer (microcode, arrays, lists)
+        :type bulk:
+            bool
+        :return:
+            Return the timeout (ms, multiple of 10), ``None`` if the RTT of
+            the ControlBox is unknown
+        :rtype:
+            int
+        """
+        rtt = self.GetRTT(ip)
+        if rtt is None:
+            return None
+
+        if bulk:
+            timeout = max(self.bulkFactor * rtt, self.minBulkTimeout)
+            timeout = min(timeout, self.maxBulkTimeout)
+        else:
+            timeout = max(self.rttFactor * rtt, self.minTimeout)
+            timeout = min(timeout, self.maxTimeout)
+
+        return int(-(-timeout // 10) * 10)
+
+    def Load(self, path):
+        """Load the estimates saved by ``Save``.
+
+        A missing or unreadable file is ignored.
+
+        :param path:
+            path of the ``.json`` file
+        :type path:
+            str
+        """
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path) as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(saved, dict):
+            return
+
+        with self.__lock:
+            for ip, rtt in saved.items():
+                if isinstance(rtt, (int, float)) and rtt > 0:
+                    self.__rtt[ip] = float(rtt)
+
+    def Save(self, path):
+        """Save the estimates (ms per IP) in a ``.json`` file.
+
+        The file is written next to it then renamed : it is never left half
+        written.
+
+        :param path:
+            path of the ``.json`` file
+        :type path:
+            str
+        """
+        with self.__lock:
+            saved = dict(self.__rtt)
+
+        with open(path + ".tmp", "w") as file:
+            json.dump(saved, file, indent=4, sort_keys=True)
+        os.replace(path + ".tmp", path)
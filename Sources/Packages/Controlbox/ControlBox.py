@@ -15,6 +15,12 @@ Libraries/Modules
 -----------------
 - gclib library (https://www.galil.com/sw/pub/all/doc/gclib/html/python.html)
     - provided by GALIL to communicate with their product
+- socket standard library (https://docs.python.org/3/library/socket.html)
+    - check a ControlBox answers on the network before connecting.
+- Instrumentation library (:file:Instrumentation.html)
+    - measure the transactions with the controller (opt-in).
+- AdaptiveTimeout library (:file:AdaptiveTimeout.html)
+    - timeouts learned from the round trip times of the controllers.
 
 Version
 -------
@@ -31,14 +37,18 @@ TODO
 Author(s)
 ---------
 - Created by M. Cerato on 10/05/2022.
-- Modified by M. Cerato on 10/12/2022.
+- Modified by agent on 18/10/2026.
 
 Copyright (c) 2022 Cerato Workshop.  All rights reserved.
 
 Members
 -------
 """
+import time
+import socket
 from Packages.Controlbox import gclib
+from Packages.Controlbox import Instrumentation
+from Packages.Controlbox import AdaptiveTimeout
 
 
 class ControlBox:
@@ -48,10 +58,87 @@ class ControlBox:
         g is the object wich represent a connection.
     :type g:
         gclib
+    :attr linkErrors:
+        parts of gclib error messages meaning the connection is lost.
+        Other errors (ex : question mark returned by the controller) leave
+        the connection state untouched.
+    :type linkErrors:
+        tuple
+    :attr commandLength:
+        maximum number of characters sent in one transaction by
+        ``QueryBatch`` (command line limit of the controller).
+    :type commandLength:
+        int
+    :attr arrayChunk:
+        maximum number of array elements uploaded in one transaction.
+        It is sized to fit the gclib response buffer.
+    :type arrayChunk:
+        int
+    :attr disconnectTimeout:
+        timeout (ms) of the disconnection command on the fast
+        ``Disconnect``. No answer is expected from the controller.
+    :type disconnectTimeout:
+        int
+    :attr galilPort:
+        TCP port the GALIL controllers listen on
+    :type galilPort:
+        int
+    :attr reachTimeout:
+        timeout (s) to open a TCP connection in ``IsReachable``
+    :type reachTimeout:
+        float
+    :attr adaptiveTimeout:
+        ``True`` to take the gclib timeout of each transaction from the
+        RTT estimates of the controller (see ``timeouts``)
+    :type adaptiveTimeout:
+        bool
+    :attr timeouts:
+        RTT estimates of the controllers, shared by every ControlBox
+    :type timeouts:
+        AdaptiveTimeout.AdaptiveTimeout
+    :attr bulkCommands:
+        commands whose answer can be long (lists and uploads). They get the
+        bulk transfer timeout, as the gclib functions of ``bulkFunctions``.
+    :type bulkCommands:
+        tuple
+    :attr bulkFunctions:
+        gclib functions transferring the microcode or arrays
+    :type bulkFunctions:
+        tuple
+    :attr commandFunctions:
+        gclib functions sending a command line. Their RTT is measured
+        unless the command is a bulk one.
+    :type commandFunctions:
+        tuple
     """
 
+    linkErrors = ("time", "read", "write", "open", "connect", "establish")
+
+    commandLength = 80
+
+    # up to 20 characters per value : "-2147483647.9999" + separator
+    arrayChunk = gclib._buf_size // 20
+
+    disconnectTimeout = 100
+
+    galilPort = 23
+    reachTimeout = 0.5
+
+    adaptiveTimeout = True
+    timeouts = AdaptiveTimeout.AdaptiveTimeout()
+    bulkCommands = ("LV", "LA", "LL", "LS", "UL", "QU")
+    bulkFunctions = ("GProgramUpload", "GArrayUpload", "GArrayUploadText",
+                     "GArrayUploadInto")
+    commandFunctions = ("GCommand", "GCommandRaw")
+
     def __init__(self):
         self.g = gclib.py()
+        self.__connected = False
+        self.__systemInfo = None
+        self.__disconnectTime = 0.0
+        self.__instrumentation = None
+        self.__ip = None
+        self.__timeout = None
 
     def __del__(self):
         """Close connection when deleted.
@@ -74,42 +161,177 @@ class ControlBox:
         :rtype:
             Bool
         """
+        if self.__instrumentation is not None:
+            self.__instrumentation.Reset()
+
+        # a new connection starts with the gclib timeout
+        self.__ip = ip
+        self.__timeout = None
+
         try:
-            self.g.GOpen(ip)
+            self.__Call(self.g.GOpen, ip)
+            self.__connected = True
+            self.__systemInfo = None
             print(f"connected to {ip}")
             return True
         except gclib.GclibError:
+            self.__connected = False
             print(f"couldn't connect to {ip}")
             return False
 
-    def Disconnect(self):
+    @classmethod
+    def IsReachable(cls, ip, timeout=None):
+        """Check a ControlBox answers on the network.
+
+        A TCP connection is opened to the GALIL port and closed right after.
+        It doesn't wait for the gclib timeout of ``Connect`` when the
+        ControlBox is off or unknown.
+
+        :param ip:
+            should be a standard IP addresse (ex : 172.20.24.65)
+        :type ip:
+            str
+        :param timeout:
+            timeout (s) of the connection. If not given, ``reachTimeout``
+            or the command timeout learned for the ControlBox (see
+            ``timeouts``), the longest one
+        :type timeout:
+            float
+        :return:
+            ``True`` if the ControlBox accepted the connection
+        :rtype:
+            bool
+        """
+        if timeout is None:
+            timeout = cls.reachTimeout
+            learned = cls.timeouts.GetTimeout(ip)
+            if learned is not None:
+                timeout = max(timeout, learned / 1000)
+
+        try:
+            with socket.create_connection((ip, cls.galilPort), timeout):
+                return True
+        except (OSError, ValueError):
+            return False
+
+    @classmethod
+    def IsLinkError(cls, error):
+        """Tell if an error means the connection to the ControlBox is lost.
+
+        The message of the error is looked for the words of ``linkErrors``
+        (ex : "device timed out"). Other errors, as a question mark returned
+        by the controller, leave the connection usable.
+
+        :param error:
+            error raised by a request to the ControlBox
+        :type error:
+            Exception
+        :return:
+            ``True`` for a link error (timeout, read, write, connection)
+        :rtype:
+            bool
+        """
+        message = str(error).lower()
+        for linkError in cls.linkErrors:
+            if linkError in message:
+                return True
+        return False
+
+    def Disconnect(self, fast=True):
         """Disconnect from a ControlBox.
 
         before just closing a connection from application side, it sends a
         command to the controller which closes actual connection from his
         side too.
 
+        The controller never answers this command : the connection is closed
+        before. The gclib error arrives after the gclib timeout (up to 5 s).
+        When ``fast``, the command is sent with a ``disconnectTimeout``
+        timeout and the connection is closed right after, whatever the
+        answer.
+
+        .. note::
+            The time spent is given by ``GetDisconnectTime``
+
+        :param fast:
+            ``False`` to wait for the controller with the gclib timeout
+        :type fast:
+            bool
         :return:
             Return the **disconnection** State. ``True`` if disconnected
         :rtype:
             bool
         """
+        start = time.perf_counter()
         try:
+            if fast:
+                self.g.GTimeout(self.disconnectTimeout)
+
             # close UDP and TCP if used of surrent connection (not others)
             self.g.GCommand("IHS =>-3")
-            print("Disconnection failed")
-            return False
+
+            if not fast:
+                self.__disconnectTime = time.perf_counter() - start
+                print("Disconnection failed")
+                return False
 
         except gclib.GclibError:
-            self.g.GClose()
-            print("Disconnected")
-            return True
+            pass
+
+        self.g.GClose()
+        self.__connected = False
+        self.__systemInfo = None
+        self.__timeout = None
+        self.__disconnectTime = time.perf_counter() - start
+        print("Disconnected")
+        return True
+
+    def EnableInstrumentation(self, enable=True):
+        """Measure (or not) the transactions with the controller.
+
+        Each transaction is measured (time, bytes, errors) and gathered by
+        family of command (see ``Instrumentation``). The measures start over
+        at each ``Connect``.
+
+        :param enable:
+            ``True`` to measure the transactions
+        :type enable:
+            bool
+        """
+        if not enable:
+            self.__instrumentation = None
+        elif self.__instrumentation is None:
+            self.__instrumentation = Instrumentation.Instrumentation()
+
+    def GetInstrumentation(self):
+        """Return the measures of the transactions since the last connection.
+
+        :return:
+            Return the measures per family of command (see
+            ``Instrumentation.GetStats``), ``None`` if not enabled
+        :rtype:
+            dict
+        """
+        if self.__instrumentation is None:
+            return None
+        return self.__instrumentation.GetStats()
+
+    def GetDisconnectTime(self):
+        """Return the time spent by the last ``Disconnect``.
+
+        :return:
+            Return the duration in seconds
+        :rtype:
+            float
+        """
+        return self.__disconnectTime
 
     def Reset(self):
         """Restart the Controller (ControlBox).
 
         .. warning::
-            This function is disabled for now (need to create a timeout)
+            This function is disabled for now (need to create a timeout).
+            Only the system informations kept in cache are forgotten.
         """
 # =============================================================================
 #         if self.__IsConnected() is True:
@@ -118,7 +340,7 @@ class ControlBox:
 #             # try to connect until it does connect or timeout
 #             self.g.Connect(savedIP)
 # =============================================================================
-        pass
+        self.__systemInfo = None
 
     def GetMicrocode(self):
         r"""Return the microcode from the controller.
@@ -132,12 +354,55 @@ class ControlBox:
             displays the carriage return + line feed as ``\n``
         """
         if self.__IsConnected() is True:
-            return self.g.GProgramUpload()
+            return self.__Call(self.g.GProgramUpload)
+
+    def GetLabels(self):
+        """Get the label table of the microcode.
+
+        The table is a short answer, compared to the microcode : it tells
+        cheaply whether the microcode may have changed.
+
+        :return:
+            the labels and their line (ex : ["#AUTO=0", "#LOOP=3"])
+        :rtype:
+            list
+        """
+        if self.__IsConnected() is True:
+            rawLabels = self.__Command("LL")
+            return [label.strip() for label in rawLabels.split("\r\n")
+                    if label.strip() != ""]
+
+    def GetProgramLines(self, first, last):
+        """Get some lines of the microcode, without uploading all of it.
+
+        :param first:
+            number of the first line (from 0)
+        :type first:
+            int
+        :param last:
+            number of the last line
+        :type last:
+            int
+        :return:
+            the lines of the microcode between ``first`` and ``last``,
+            without their number (ex : ["#LOOP", "JP #LOOP"]). Lines after
+            the end of the microcode are not given.
+        :rtype:
+            list
+        """
+        if self.__IsConnected() is True:
+            rawLines = self.__Command(f"LS {first},{last}")
+            lines = []
+            for line in rawLines.split("\r\n"):
+                number, _, code = line.strip().partition(" ")
+                if number.isdigit():
+                    lines.append(code.strip())
+            return lines
 
     def SetMicrocode(self, code):
         """Download the microcode into the controller."""
         if self.__IsConnected() is True:
-            self.g.GProgramDownload(code)
+            self.__Call(self.g.GProgramDownload, code)
 
     def GetVariable(self, galilVar):
         """Get the value of a variable.
@@ -156,7 +421,58 @@ class ControlBox:
             and gives a zero value.
         """
         if self.__IsConnected() is True:
-            return self.g.GCommand(galilVar + "=?")
+            return self.__Command(galilVar + "=?")
+
+    def GetArray(self, galilArray, size):
+        """Get all the values of an array.
+
+        The values are uploaded by chunks fitting the gclib response buffer,
+        which makes a few transactions instead of one for each element. The
+        values are the strings of the controller, never formatted again.
+
+        :param galilArray:
+            should be an existing array of galil script (ex : Cmd)
+        :type galilArray:
+            str
+        :param size:
+            number of elements of the array
+        :type size:
+            int
+        :return:
+            the values, formatted as ``GetVariable`` gives them
+        :rtype:
+            list
+
+        .. note::
+            The first value of each chunk is also requested with
+            ``GetVariable``. The values of a chunk whose upload fails, gives
+            another number of values than requested, or formats its values
+            differently from ``GetVariable`` (other first value, other
+            number of decimals), are requested one by one.
+        """
+        if self.__IsConnected() is True:
+            values = []
+            for first in range(0, size, self.arrayChunk):
+                last = min(first + self.arrayChunk, size) - 1
+                try:
+                    chunk = self.__Call(self.g.GArrayUploadText, galilArray,
+                                        first, last)
+                except gclib.GclibError:
+                    if self.__IsConnected() is False:
+                        raise
+                    chunk = []
+
+                # the same strings as GetVariable, or read one by one
+                check = self.GetVariable(galilArray + "[" + str(first) + "]")
+                decimals = len(check.partition(".")[2])
+                if (len(chunk) != last - first + 1 or chunk[0] != check
+                        or any(len(value.partition(".")[2]) != decimals
+                               for value in chunk)):
+                    chunk = [check] + [self.GetVariable(galilArray + "["
+                                                        + str(i) + "]")
+                                       for i in range(first + 1, last + 1)]
+                values.extend(chunk)
+            return values
 
     def GetAllVariables(self):
         """Get the value of all variables.
@@ -167,7 +483,7 @@ class ControlBox:
             list
         """
         if self.__IsConnected() is True:
-            rawVariables = self.g.GCommand("LV")
+            rawVariables = self.__Command("LV")
             variables = rawVariables.split("\r\n")
             return variables
 
@@ -186,7 +502,7 @@ class ControlBox:
             str
         """
         if self.__IsConnected() is True:
-            rawArrays = self.g.GCommand("LA")
+            rawArrays = self.__Command("LA")
             arrays = rawArrays.split("\r\n")
             return arrays
 
@@ -205,14 +521,39 @@ class ControlBox:
         """
         if self.__IsConnected() is True:
             if command[-1:] == "?":
-                return self.g.GCommand(command)
+                return self.__Command(command)
 
             elif command[:3] == "MG_":
-                return self.g.GCommand(command)
+                return self.__Command(command)
 
             else:
                 print(f"the command {command} is not a query")
 
+    def QueryBatch(self, commands):
+        """Return the values of several parameters.
+
+        Queries are packed, separated by ``;``, into transactions no longer
+        than ``commandLength``. The answer of each transaction is splitted
+        back, one answer per query.
+
+        If a transaction fails, or gives an unexpected number of answers,
+        its queries are sent again one by one (as ``GetParameter``).
+
+        :param commands:
+            queries as given to ``GetParameter`` (ex : [SPA=?, IA ?, MG_CN0])
+        :type commands:
+            list
+        :return:
+            The results from the ControlBox, in the same order as commands
+        :rtype:
+            list
+        """
+        if self.__IsConnected() is True:
+            answers = []
+            for batch in self.__Batches(commands):
+                answers.extend(self.__QueryBatch(batch))
+            return answers
+
     def SetParameter(self, command):
         """Return the value of a parameter.
 
@@ -223,7 +564,7 @@ class ControlBox:
             str
         """
         if self.__IsConnected() is True:
-            self.g.GCommand(command)
+            self.__Command(command)
 
     def GetIp(self):
         """Get the IP of the controller. If not connected, return None.
@@ -238,10 +579,37 @@ class ControlBox:
             ``xxxx, xxxx, xxxx, xxxx``
         """
         if self.__IsConnected() is True:
-            return self.g.GCommand("IA?")
+            return self.__Command("IA?")
         else:
             return None
 
+    def GetSystemInfo(self):
+        """Return the system informations of the product.
+
+        The informations are requested (``GInfo``) once per connection and
+        kept in cache. The cache is cleared on ``Connect``, ``Disconnect``
+        and ``Reset``.
+
+        :return:
+            Return a dictionnary as :
+            ``{"firmware": "DMC4183s56g", "serial": "15953.0000",
+            "device": "DMC41x3", "axis": "8"}``
+        :rtype:
+            dict
+        """
+        if self.__IsConnected() is True:
+            if self.__systemInfo is None:
+                info = self.__Call(self.g.GInfo).split(", ")
+                firmware = info[1]
+
+                self.__systemInfo = {}
+                self.__systemInfo["firmware"] = firmware
+                self.__systemInfo["serial"] = info[2] + ".0000"
+                self.__systemInfo["device"] = firmware[:7].replace("8", "x")
+                self.__systemInfo["axis"] = firmware[5]
+
+            return self.__systemInfo
+
     def GetFWVersion(self):
         """Return the Firmware of the product.
 
@@ -251,7 +619,7 @@ class ControlBox:
             str
         """
         if self.__IsConnected() is True:
-            return self.g.GInfo().split(", ")[1]
+            return self.GetSystemInfo()["firmware"]
 
     def GetSerial(self):
         """Get the serial number of the product.
@@ -262,22 +630,218 @@ class ControlBox:
             str
         """
         if self.__IsConnected() is True:
-            return self.g.GInfo().split(", ")[2] + ".0000"
+            return self.GetSystemInfo()["serial"]
+
+    def Ping(self):
+        """Ask the controller if the connection is still alive.
+
+        Unlike the other methods, which trust the connection state kept
+        locally, this one sends a request to the controller.
+
+        :return:
+            ``True`` if the controller answered, ``False`` otherwise
+        :rtype:
+            bool
+        """
+        if self.__IsConnected() is True:
+            try:
+                self.__Command("IA?")
+                return True
+            except gclib.GclibError:
+                return False
+        return False
+
+    def __Batches(self, commands):
+        """Pack queries into transactions not longer than ``commandLength``.
+
+        .. note::
+            a command which is not a query is left alone in its batch.
+
+        :param commands:
+            queries to pack
+        :type commands:
+            list
+        :return:
+            Return a list of batches (lists of queries)
+        :rtype:
+            list
+        """
+        batches = []
+        batch = []
+        batchLength = 0
+        for command in commands:
+            isQuery = command[-1:] == "?" or command[:3] == "MG_"
+
+            if batch and (not isQuery or
+                          batchLength + 1 + len(command) > self.commandLength):
+                batches.append(batch)
+                batch = []
+                batchLength = 0
+
+            if not isQuery:
+                batches.append([command])
+                continue
+
+            if batch:
+                batchLength = batchLength + 1
+            batch.append(command)
+            batchLength = batchLength + len(command)
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def __QueryBatch(self, batch):
+        """Send a batch of queries in one transaction.
+
+        :param batch:
+            queries to send together
+        :type batch:
+            list
+        :return:
+            The results from the ControlBox, one per query
+        :rtype:
+            list
+        """
+        if len(batch) > 1:
+            try:
+                rawAnswers = self.__Command(";".join(batch))
+
+                answers = []
+                for answer in rawAnswers.split("\r\n"):
+                    answer = answer.strip().lstrip(":").strip()
+                    if answer != "":
+                        answers.append(answer)
+
+                if len(answers) == len(batch):
+                    return answers
+
+            except gclib.GclibError:
+                if self.__IsConnected() is False:
+                    raise
+
+        answers = []
+        for command in batch:
+            answers.append(self.GetParameter(command))
+        return answers
 
     def __IsConnected(self):
         """Control the connexion State.
 
+        The state is kept locally : set by ``Connect``, cleared by
+        ``Disconnect`` or when a gclib error shows the connection is lost.
+        No request is sent to the controller (see ``Ping``).
+
         :return:
             ``True`` if the soft is connected to the controller
             ``False`` otherwise
         :rtype:
             bool
         """
+        return self.__connected
+
+    def __Command(self, command):
+        """Send a command line and give its answer.
+
+        The answer is read without copy (``GCommandRaw``) and decoded once.
+
+        :param command:
+            command line (ex : SPA=?)
+        :type command:
+            str
+        :return:
+            the answer, trimmed
+        :rtype:
+            str
+        """
+        return str(self.__Call(self.g.GCommandRaw, command), "ascii")
+
+    def __Call(self, gclibFunction, *args):
+        """Call a gclib function and follow the connection state.
+
+        :param gclibFunction:
+            gclib function to call (ex : ``self.g.GCommand``)
+        :type gclibFunction:
+            method
+        :return:
+            what the gclib function returns
+        :raise gclib.GclibError:
+            the gclib error, after the connection state has been updated
+        """
+        bulk = self.__IsBulk(gclibFunction, args)
+        self.__AdaptTimeout(gclibFunction, bulk)
+
+        start = time.perf_counter()
         try:
-            self.g.GCommand("IA?")
+            answer = gclibFunction(*args)
+        except gclib.GclibError as ex:
+            self.__Measure(gclibFunction, args, start, None, True)
+            if "time" in str(ex).lower() and self.__ip is not None:
+                self.timeouts.Failure(self.__ip)
+            if self.IsLinkError(ex):
+                self.__connected = False
+            raise
+
+        if gclibFunction.__name__ in self.commandFunctions and not bulk \
+                and self.__ip is not None:
+            self.timeouts.Update(self.__ip, time.perf_counter() - start)
+
+        self.__Measure(gclibFunction, args, start, answer)
+        return answer
+
+    def __IsBulk(self, gclibFunction, args):
+        """Tell if a transaction is a bulk transfer (long answer).
+
+        :return:
+            ``True`` for uploads and lists (see ``bulkCommands``)
+        :rtype:
+            bool
+        """
+        if gclibFunction.__name__ in self.bulkFunctions:
             return True
+        if gclibFunction.__name__ in self.commandFunctions and args:
+            return str(args[0]).strip()[:2] in self.bulkCommands
+        return False
+
+    def __AdaptTimeout(self, gclibFunction, bulk):
+        """Set the gclib timeout learned for the controller.
+
+        Nothing is done to open the connection, when the RTT of the
+        controller is unknown or when the timeout is already set.
+        """
+        if not self.adaptiveTimeout or gclibFunction.__name__ == "GOpen":
+            return
+
+        timeout = self.timeouts.GetTimeout(self.__ip, bulk)
+        if timeout is None or timeout == self.__timeout:
+            return
+
+        try:
+            self.g.GTimeout(timeout)
+            self.__timeout = timeout
         except gclib.GclibError:
-            return False
+            pass
+
+    def __Measure(self, gclibFunction, args, start, answer, error=False):
+        """Record a transaction when the instrumentation is enabled.
+
+        :param answer:
+            what the gclib function returned
+        :param error:
+            ``True`` if the gclib function failed
+        """
+        if self.__instrumentation is None:
+            return
+
+        duration = time.perf_counter() - start
+        family = Instrumentation.Instrumentation.Family(
+            gclibFunction.__name__, args)
+        bytesOut = sum(Instrumentation.Instrumentation.Size(arg)
+                       for arg in args)
+        bytesIn = Instrumentation.Instrumentation.Size(answer)
+
+        self.__instrumentation.Record(family, duration, bytesOut, bytesIn,
+                                      error)
 
 
 if __name__ == '__main__':
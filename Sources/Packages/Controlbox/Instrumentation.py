@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Measure the transactions with a ControlBox.
+
+Description
+-----------
+Record, for each family of commands sent to a ControlBox, the number of
+calls, the errors, the bytes sent and received and an histogram of the
+latencies.
+
+A family is the GALIL command (ex : ``SP`` for ``SPA=?``, ``MG`` for
+``MG_TPA``), ``batch`` for several commands sent at once, ``variable`` and
+``array`` for the reading of a variable or of an array element, or the
+gclib function for other transactions (ex : ``GInfo``).
+
+Libraries/Modules
+-----------------
+- re standard library (https://docs.python.org/3/library/re.html)
+    - Find the family of a command.
+- bisect standard library (https://docs.python.org/3/library/bisect.html)
+    - Find the histogram bin of a latency.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- None
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import re
+import bisect
+
+
+class Instrumentation:
+    """Class gathering the measures of the transactions with a ControlBox.
+
+    :attr bounds:
+        upper bounds (ms) of the bins of the latency histograms. The last
+        bin holds every longer latency.
+    :type bounds:
+        tuple
+    """
+
+    bounds = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.__families = {}
+
+    def Reset(self):
+        """Forget every measure."""
+        self.__families = {}
+
+    def Record(self, family, duration, bytesOut=0, bytesIn=0, error=False):
+        """Add the measure of a transaction.
+
+        :param family:
+            family of the transaction (see ``Family``)
+        :type family:
+            str
+        :param duration:
+            time spent (s)
+        :type duration:
+            float
+        :param bytesOut:
+            bytes sent to the ControlBox
+        :type bytesOut:
+            int
+        :param bytesIn:
+            bytes received from the ControlBox
+        :type bytesIn:
+            int
+        :param error:
+            ``True`` if the transaction failed
+        :type error:
+            bool
+        """
+        if family not in self.__families:
+            self.__families[family] = {"calls": 0,
+                                       "errors": 0,
+                                       "bytesOut": 0,
+                                       "bytesIn": 0,
+                                       "totalTime": 0.0,
+                                       "maxTime": 0.0,
+                                       "histogram": [0] * (len(self.bounds)
+                                                           + 1)}
+
+        stats = self.__families[family]
+        stats["calls"] += 1
+        stats["bytesOut"] += bytesOut
+        stats["bytesIn"] += bytesIn
+        stats["totalTime"] += duration
+        stats["maxTime"] = max(stats["maxTime"], duration)
+        if error:
+            stats["errors"] += 1
+
+        stats["histogram"][bisect.bisect_left(self.bounds,
+                                              duration * 1000)] += 1
+
+    def GetStats(self):
+        """Return the measures of every family.
+
+        :return:
+            Return, per family, the calls, errors, bytes, times (s) and the
+            latency histogram (one count per bin of ``bounds``)
+        :rtype:
+            dict
+        """
+        stats = {}
+        for family, familyStats in self.__families.items():
+            stats[family] = dict(familyStats)
+            stats[family]["histogram"] = list(familyStats["histogram"])
+            stats[family]["meanTime"] = (familyStats["totalTime"]
+                                         / familyStats["calls"])
+        return stats
+
+    @staticmethod
+    def Family(gclibFunction, args):
+        """Give the family of a transaction.
+
+        :param gclibFunction:
+            name of the gclib function called (ex : GCommand). The
+            commands of ``GCommand`` and ``GCommandRaw`` are split in
+            families, the other functions are their own family.
+        :type gclibFunction:
+            str
+        :param args:
+            arguments of the gclib function
+        :type args:
+            tuple
+        :return:
+            Return the family (ex : SP, batch, variable, GInfo)
+        :rtype:
+            str
+        """
+        if gclibFunction not in ("GCommand", "GCommandRaw") or not args:
+            return gclibFunction
+
+        command = args[0]
+        if isinstance(command, bytes):
+            command = command.decode("ascii")
+        command = str(command).strip()
+        if ";" in command:
+            return "batch"
+        if "[" in command:
+            return "array"
+
+        name = re.split(r"[^A-Za-z0-9]", command, 1)[0]
+        if len(name) <= 3 and name.isupper():
+            return name[:2]
+        return "variable"
+
+    @staticmethod
+    def Size(value):
+        """Give the number of bytes of an argument or an answer.
+
+        :return:
+            Return the length of a string, bytes or memoryview (or of a
+            list of strings)
+        :rtype:
+            int
+        """
+        if isinstance(value, (str, bytes, memoryview)):
+            return len(value)
+        if isinstance(value, (list, tuple)):
+            return sum(len(str(item)) + 1 for item in value)
+        return 0
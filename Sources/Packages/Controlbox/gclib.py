@@ -7,72 +7,10 @@ Contact softwaresupport@galil.com with questions, comments, and suggestions.
 # Part of implementation, don't use directly.
 ###############################################################################
 import platform #for distinguishing 'Windows', 'Linux', 'Darwin'
+import threading #for loading the libraries once and sharing the pool of response buffers between connections
+import re #for parsing uploaded arrays in the response buffer
 from ctypes import *
 
-if platform.system() == 'Windows':
-    if '64 bit' in platform.python_compiler():
-        WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x64\libcrypto-1_1-x64.dll')
-        WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x64\libssl-1_1-x64.dll')
-        _gclib_path = r'C:\Program Files (x86)\Galil\gclib\dll\x64\gclib.dll'
-        _gclibo_path = r'C:\Program Files (x86)\Galil\gclib\dll\x64\gclibo.dll'
-        _gclib = WinDLL(_gclib_path)
-        _gclibo = WinDLL(_gclibo_path)
-    else:
-        WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x86\libcrypto-1_1.dll')
-        WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x86\libssl-1_1.dll')
-        _gclib_path = r'C:\Program Files (x86)\Galil\gclib\dll\x86\gclib.dll'
-        _gclibo_path = r'C:\Program Files (x86)\Galil\gclib\dll\x86\gclibo.dll'
-        _gclib = WinDLL(_gclib_path)
-        _gclibo = WinDLL(_gclibo_path)
-        #Reassign symbol name, Python doesn't like @ in function names
-        #gclib calls
-        setattr(_gclib, 'GArrayDownload', getattr(_gclib, '_GArrayDownload@20'))
-        setattr(_gclib, 'GArrayUpload', getattr(_gclib, '_GArrayUpload@28'))
-        setattr(_gclib, 'GClose', getattr(_gclib, '_GClose@4'))
-        setattr(_gclib, 'GCommand', getattr(_gclib, '_GCommand@20'))
-        setattr(_gclib, 'GFirmwareDownload', getattr(_gclib, '_GFirmwareDownload@8'))
-        setattr(_gclib, 'GInterrupt', getattr(_gclib, '_GInterrupt@8'))
-        setattr(_gclib, 'GMessage', getattr(_gclib, '_GMessage@12'))
-        setattr(_gclib, 'GOpen', getattr(_gclib, '_GOpen@8'))
-        setattr(_gclib, 'GProgramDownload', getattr(_gclib, '_GProgramDownload@12'))
-        setattr(_gclib, 'GProgramUpload', getattr(_gclib, '_GProgramUpload@12'))
-        #gclibo calls (open source component/convenience functions)
-        setattr(_gclibo, 'GAddresses', getattr(_gclibo, '_GAddresses@8'))
-        setattr(_gclibo, 'GArrayDownloadFile', getattr(_gclibo, '_GArrayDownloadFile@8'))
-        setattr(_gclibo, 'GArrayUploadFile', getattr(_gclibo, '_GArrayUploadFile@12'))
-        setattr(_gclibo, 'GAssign', getattr(_gclibo, '_GAssign@8'))
-        setattr(_gclibo, 'GError', getattr(_gclibo, '_GError@12'))
-        setattr(_gclibo, 'GInfo', getattr(_gclibo, '_GInfo@12'))
-        setattr(_gclibo, 'GIpRequests', getattr(_gclibo, '_GIpRequests@8'))
-        setattr(_gclibo, 'GMotionComplete', getattr(_gclibo, '_GMotionComplete@8'))
-        setattr(_gclibo, 'GProgramDownloadFile', getattr(_gclibo, '_GProgramDownloadFile@12'))
-        setattr(_gclibo, 'GSleep', getattr(_gclibo, '_GSleep@4'))
-        setattr(_gclibo, 'GProgramUploadFile', getattr(_gclibo, '_GProgramUploadFile@8'))
-        setattr(_gclibo, 'GTimeout', getattr(_gclibo, '_GTimeout@8'))
-        setattr(_gclibo, 'GVersion', getattr(_gclibo, '_GVersion@8'))
-        setattr(_gclibo, 'GSetupDownloadFile', getattr(_gclibo, '_GSetupDownloadFile@20'))
-        setattr(_gclibo, 'GServerStatus', getattr(_gclibo, '_GServerStatus@8'))
-        setattr(_gclibo, 'GSetServer', getattr(_gclibo, '_GSetServer@4'))
-        setattr(_gclibo, 'GListServers', getattr(_gclibo, '_GListServers@8'))
-        setattr(_gclibo, 'GPublishServer', getattr(_gclibo, '_GPublishServer@12'))
-        setattr(_gclibo, 'GRemoteConnections', getattr(_gclibo, '_GRemoteConnections@8'))
-
-elif platform.system() == 'Linux':
-    cdll.LoadLibrary("libgclib.so.0")
-    _gclib = CDLL("libgclib.so.0")
-    cdll.LoadLibrary("libgclibo.so.0")
-    _gclibo = CDLL("libgclibo.so.0")
-
-elif platform.system() == 'Darwin': #OSX
-    _gclib_path = '/Applications/gclib/dylib/gclib.0.dylib'
-    _gclibo_path = '/Applications/gclib/dylib/gclibo.0.dylib'
-    cdll.LoadLibrary(_gclib_path)
-    _gclib = CDLL(_gclib_path)
-    cdll.LoadLibrary(_gclibo_path)
-    _gclibo = CDLL(_gclibo_path)
-    
-    
-
 # Python "typedefs"
 _GReturn = c_int #type for a return code
 _GCon = c_void_p #type for a Galil connection handle
@@ -85,56 +23,215 @@ _GOption = c_int #type for option variables, e.g.    GArrayDownload
 _GStatus = c_ubyte #type for interrupt status bytes
 _GStatus_ptr = POINTER(_GStatus) #used for argtypes declaration
 
-#Define arguments and result type (if not C int type)
-#gclib calls
-_gclib.GArrayDownload.argtypes = [_GCon, _GCStringIn, _GOption, _GOption, _GCStringIn]
-_gclib.GArrayUpload.argtypes = [_GCon, _GCStringIn, _GOption, _GOption, _GOption, _GCStringOut, _GSize]
-_gclib.GClose.argtypes = [_GCon]
-_gclib.GCommand.argtypes = [_GCon, _GCStringIn, _GCStringOut, _GSize, _GSize_ptr]
-_gclib.GFirmwareDownload.argtypes = [_GCon, _GCStringIn]
-_gclib.GInterrupt.argtypes = [_GCon, _GStatus_ptr]
-_gclib.GMessage.argtypes = [_GCon, _GCStringOut, _GSize]
-_gclib.GOpen.argtypes = [_GCStringIn, _GCon_ptr]
-_gclib.GProgramDownload.argtypes = [_GCon, _GCStringIn, _GCStringIn]
-_gclib.GProgramUpload.argtypes = [_GCon, _GCStringOut, _GSize]
-#gclibo calls (open source component/convenience functions)
-_gclibo.GAddresses.argtypes = [_GCStringOut, _GSize]
-_gclibo.GArrayDownloadFile.argtypes = [_GCon, _GCStringIn]
-_gclibo.GArrayUploadFile.argtypes = [_GCon, _GCStringIn, _GCStringIn]
-_gclibo.GAssign.argtypes = [_GCStringIn, _GCStringIn]
-_gclibo.GError.argtypes = [_GReturn, _GCStringOut, _GSize]
-_gclibo.GError.restype    = None
-_gclibo.GError.argtypes = [_GCon, _GCStringOut, _GSize]
-_gclibo.GIpRequests.argtypes = [_GCStringOut, _GSize]
-_gclibo.GMotionComplete.argtypes = [_GCon, _GCStringIn]
-_gclibo.GProgramDownloadFile.argtypes = [_GCon, _GCStringIn, _GCStringIn]
-_gclibo.GSleep.argtypes = [c_uint]
-_gclibo.GSleep.restype    = None
-_gclibo.GProgramUploadFile.argtypes = [_GCon, _GCStringIn]
-_gclibo.GTimeout.argtypes = [_GCon, c_int]
-_gclibo.GVersion.argtypes = [_GCStringOut, _GSize]
-_gclibo.GServerStatus.argtypes = [_GCStringOut, _GSize]
-_gclibo.GSetServer.argtypes = [_GCStringIn]
-_gclibo.GListServers.argtypes = [_GCStringOut, _GSize]
-_gclibo.GPublishServer.argtypes = [_GCStringIn, _GOption, _GOption]
-_gclibo.GRemoteConnections.argtypes = [_GCStringOut, _GSize]
-_gclibo.GSetupDownloadFile.argtypes = [_GCon, _GCStringIn, _GOption, _GCStringOut, _GSize]
+
+def _libraries():
+    """Loads the native libraries and declares their calls. Returns the gclib and gclibo libraries."""
+    if platform.system() == 'Windows':
+        if '64 bit' in platform.python_compiler():
+            WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x64\libcrypto-1_1-x64.dll')
+            WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x64\libssl-1_1-x64.dll')
+            _gclib_path = r'C:\Program Files (x86)\Galil\gclib\dll\x64\gclib.dll'
+            _gclibo_path = r'C:\Program Files (x86)\Galil\gclib\dll\x64\gclibo.dll'
+            _gclib = WinDLL(_gclib_path)
+            _gclibo = WinDLL(_gclibo_path)
+        else:
+            WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x86\libcrypto-1_1.dll')
+            WinDLL(r'C:\Program Files (x86)\Galil\gclib\dll\x86\libssl-1_1.dll')
+            _gclib_path = r'C:\Program Files (x86)\Galil\gclib\dll\x86\gclib.dll'
+            _gclibo_path = r'C:\Program Files (x86)\Galil\gclib\dll\x86\gclibo.dll'
+            _gclib = WinDLL(_gclib_path)
+            _gclibo = WinDLL(_gclibo_path)
+            #Reassign symbol name, Python doesn't like @ in function names
+            #gclib calls
+            setattr(_gclib, 'GArrayDownload', getattr(_gclib, '_GArrayDownload@20'))
+            setattr(_gclib, 'GArrayUpload', getattr(_gclib, '_GArrayUpload@28'))
+            setattr(_gclib, 'GClose', getattr(_gclib, '_GClose@4'))
+            setattr(_gclib, 'GCommand', getattr(_gclib, '_GCommand@20'))
+            setattr(_gclib, 'GFirmwareDownload', getattr(_gclib, '_GFirmwareDownload@8'))
+            setattr(_gclib, 'GInterrupt', getattr(_gclib, '_GInterrupt@8'))
+            setattr(_gclib, 'GMessage', getattr(_gclib, '_GMessage@12'))
+            setattr(_gclib, 'GOpen', getattr(_gclib, '_GOpen@8'))
+            setattr(_gclib, 'GProgramDownload', getattr(_gclib, '_GProgramDownload@12'))
+            setattr(_gclib, 'GProgramUpload', getattr(_gclib, '_GProgramUpload@12'))
+            #gclibo calls (open source component/convenience functions)
+            setattr(_gclibo, 'GAddresses', getattr(_gclibo, '_GAddresses@8'))
+            setattr(_gclibo, 'GArrayDownloadFile', getattr(_gclibo, '_GArrayDownloadFile@8'))
+            setattr(_gclibo, 'GArrayUploadFile', getattr(_gclibo, '_GArrayUploadFile@12'))
+            setattr(_gclibo, 'GAssign', getattr(_gclibo, '_GAssign@8'))
+            setattr(_gclibo, 'GError', getattr(_gclibo, '_GError@12'))
+            setattr(_gclibo, 'GInfo', getattr(_gclibo, '_GInfo@12'))
+            setattr(_gclibo, 'GIpRequests', getattr(_gclibo, '_GIpRequests@8'))
+            setattr(_gclibo, 'GMotionComplete', getattr(_gclibo, '_GMotionComplete@8'))
+            setattr(_gclibo, 'GProgramDownloadFile', getattr(_gclibo, '_GProgramDownloadFile@12'))
+            setattr(_gclibo, 'GSleep', getattr(_gclibo, '_GSleep@4'))
+            setattr(_gclibo, 'GProgramUploadFile', getattr(_gclibo, '_GProgramUploadFile@8'))
+            setattr(_gclibo, 'GTimeout', getattr(_gclibo, '_GTimeout@8'))
+            setattr(_gclibo, 'GVersion', getattr(_gclibo, '_GVersion@8'))
+            setattr(_gclibo, 'GSetupDownloadFile', getattr(_gclibo, '_GSetupDownloadFile@20'))
+            setattr(_gclibo, 'GServerStatus', getattr(_gclibo, '_GServerStatus@8'))
+            setattr(_gclibo, 'GSetServer', getattr(_gclibo, '_GSetServer@4'))
+            setattr(_gclibo, 'GListServers', getattr(_gclibo, '_GListServers@8'))
+            setattr(_gclibo, 'GPublishServer', getattr(_gclibo, '_GPublishServer@12'))
+            setattr(_gclibo, 'GRemoteConnections', getattr(_gclibo, '_GRemoteConnections@8'))
+
+    elif platform.system() == 'Linux':
+        cdll.LoadLibrary("libgclib.so.0")
+        _gclib = CDLL("libgclib.so.0")
+        cdll.LoadLibrary("libgclibo.so.0")
+        _gclibo = CDLL("libgclibo.so.0")
+
+    elif platform.system() == 'Darwin': #OSX
+        _gclib_path = '/Applications/gclib/dylib/gclib.0.dylib'
+        _gclibo_path = '/Applications/gclib/dylib/gclibo.0.dylib'
+        cdll.LoadLibrary(_gclib_path)
+        _gclib = CDLL(_gclib_path)
+        cdll.LoadLibrary(_gclibo_path)
+        _gclibo = CDLL(_gclibo_path)
+
+    #Define arguments and result type (if not C int type)
+    #gclib calls
+    _gclib.GArrayDownload.argtypes = [_GCon, _GCStringIn, _GOption, _GOption, _GCStringIn]
+    _gclib.GArrayUpload.argtypes = [_GCon, _GCStringIn, _GOption, _GOption, _GOption, _GCStringOut, _GSize]
+    _gclib.GClose.argtypes = [_GCon]
+    _gclib.GCommand.argtypes = [_GCon, _GCStringIn, _GCStringOut, _GSize, _GSize_ptr]
+    _gclib.GFirmwareDownload.argtypes = [_GCon, _GCStringIn]
+    _gclib.GInterrupt.argtypes = [_GCon, _GStatus_ptr]
+    _gclib.GMessage.argtypes = [_GCon, _GCStringOut, _GSize]
+    _gclib.GOpen.argtypes = [_GCStringIn, _GCon_ptr]
+    _gclib.GProgramDownload.argtypes = [_GCon, _GCStringIn, _GCStringIn]
+    _gclib.GProgramUpload.argtypes = [_GCon, _GCStringOut, _GSize]
+    #gclibo calls (open source component/convenience functions)
+    _gclibo.GAddresses.argtypes = [_GCStringOut, _GSize]
+    _gclibo.GArrayDownloadFile.argtypes = [_GCon, _GCStringIn]
+    _gclibo.GArrayUploadFile.argtypes = [_GCon, _GCStringIn, _GCStringIn]
+    _gclibo.GAssign.argtypes = [_GCStringIn, _GCStringIn]
+    _gclibo.GError.argtypes = [_GReturn, _GCStringOut, _GSize]
+    _gclibo.GError.restype    = None
+    _gclibo.GError.argtypes = [_GCon, _GCStringOut, _GSize]
+    _gclibo.GIpRequests.argtypes = [_GCStringOut, _GSize]
+    _gclibo.GMotionComplete.argtypes = [_GCon, _GCStringIn]
+    _gclibo.GProgramDownloadFile.argtypes = [_GCon, _GCStringIn, _GCStringIn]
+    _gclibo.GSleep.argtypes = [c_uint]
+    _gclibo.GSleep.restype    = None
+    _gclibo.GProgramUploadFile.argtypes = [_GCon, _GCStringIn]
+    _gclibo.GTimeout.argtypes = [_GCon, c_int]
+    _gclibo.GVersion.argtypes = [_GCStringOut, _GSize]
+    _gclibo.GServerStatus.argtypes = [_GCStringOut, _GSize]
+    _gclibo.GSetServer.argtypes = [_GCStringIn]
+    _gclibo.GListServers.argtypes = [_GCStringOut, _GSize]
+    _gclibo.GPublishServer.argtypes = [_GCStringIn, _GOption, _GOption]
+    _gclibo.GRemoteConnections.argtypes = [_GCStringOut, _GSize]
+    _gclibo.GSetupDownloadFile.argtypes = [_GCon, _GCStringIn, _GOption, _GCStringOut, _GSize]
+    return _gclib, _gclibo
+
+
+class _LazyLibrary:
+    """Stands for a native library until its first use, which loads both libraries."""
+    
+    def __init__(self, name):
+        self._name = name
+    
+    def __getattr__(self, attribute):
+        _load()
+        return getattr(globals()[self._name], attribute)
+
+_gclib = _LazyLibrary("_gclib")
+_gclibo = _LazyLibrary("_gclibo")
+_load_lock = threading.Lock()
+
+def _load():
+    """
+    Replaces the lazy libraries by the native ones, on first use of gclib (usually GOpen).
+    Importing this module does not need the Galil runtime: a missing library raises GclibError on first use.
+    """
+    global _gclib, _gclibo
+    with _load_lock:
+        if isinstance(_gclib, _LazyLibrary):
+            try:
+                _gclib, _gclibo = _libraries()
+            except OSError as ex:
+                raise GclibError("gclib library not loaded: " + str(ex))
 
 #Set up some constants
 _enc = "ASCII" #byte encoding for going between python strings and c strings.
-_buf_size = 500000 #size of response buffer. Big enough to fit entire 4000 program via UL/LS, or 24000 elements of array data.
-_error_buf = create_string_buffer(128)    #buffer for retrieving error code descriptions.
+_buf_size = 500000 #size of large response buffers. Big enough to fit entire 4000 program via UL/LS, or 24000 elements of array data.
+_small_buf_size = 4096 #size of the response buffer of each connection. Used for the commands known to have a short reply.
+_pool_size = 4 #least number of large response buffers kept for reuse once released, one more per open connection beyond.
+_bulk_commands = (b"LA", b"LL", b"LS", b"LV", b"QU", b"UL") #commands whose reply can exceed _small_buf_size.
+_value_size = 32 #room for one value of a query reply, separators included.
+_error_size = 128 #size of the buffer retrieving an error code description.
+_blanks = frozenset(b" \t\r\n\x0b\x0c") #bytes trimmed from responses, as str.strip() does.
+_array_value = re.compile(rb"[^,\x00]*") #one value of an uploaded array, up to its comma or the end of the response.
     
 def _rc(return_code):
     """Checks return codes from gclib and raises a python error if result is exceptional."""
     if return_code != 0:
-        _gclibo.GError(return_code, _error_buf, 128) #Get the library's error description
-        raise GclibError(str(_error_buf.value.decode(_enc)))
+        error_buf = create_string_buffer(_error_size) #one per error, never overwritten by another thread
+        _gclibo.GError(return_code, error_buf, _error_size) #Get the library's error description
+        raise GclibError(str(error_buf.value.decode(_enc)))
     return 
 
 class GclibError(Exception):
     """Error class for non-zero gclib return codes."""
     pass 
+
+class _BufferPool:
+    """
+    Large response buffers shared by every connection. Part of implementation, don't use directly.
+    A connection holds one large buffer at most: one buffer is kept per open connection (at least keep), so workers never allocate one again.
+    """
+    
+    def __init__(self, size, keep):
+        self._size = size
+        self._keep = keep
+        self._free = []
+        self._users = 0 #open connections
+        self._lock = threading.Lock()
+    
+    def attach(self):
+        """Counts a connection opened."""
+        with self._lock:
+            self._users += 1
+    
+    def detach(self):
+        """Counts a connection closed. The buffers kept beyond the open connections are freed."""
+        with self._lock:
+            self._users -= 1
+            del self._free[max(self._keep, self._users):]
+    
+    def acquire(self):
+        """Returns a free large buffer, allocated if none is left."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return create_string_buffer(self._size)
+    
+    def release(self, buf):
+        """Gives back a large buffer. It is kept while there are less buffers kept than open connections (at least keep), else freed."""
+        with self._lock:
+            if len(self._free) < max(self._keep, self._users):
+                self._free.append(buf)
+
+_pool = _BufferPool(_buf_size, _pool_size)
+
+def _is_short(command):
+    """
+    Tells if the reply to an encoded command line surely fits _small_buf_size, before sending it.
+    Only lines of queries (e.g. SPA=?;IA?;MG_TPA) are known to be short: each ? asks one value, as each MG_<operand>.
+    Any other line may have a long reply and is sent with a large buffer, as it cannot be sent twice.
+    """
+    if b'"' in command:
+        return False
+    values = 0
+    for part in command.split(b";"):
+        part = part.strip()
+        if part[:3] == b"MG_" and b"," not in part:
+            values += 1
+        elif b"?" in part and part[:2] not in _bulk_commands:
+            values += part.count(b"?")
+        else:
+            return False
+    return values * _value_size < _small_buf_size
  
 class py:
     """Represents a single Python connection to a Galil Controller or PLC."""
@@ -142,7 +239,11 @@ class py:
     def __init__(self):
         """Constructor for the Connection class. Initializes gclib's handle and read buffer."""
         self._gcon = _GCon(0) #handle to connection
-        self._buf = create_string_buffer(_buf_size)
+        self._buf = create_string_buffer(_small_buf_size)
+        self._large_buf = None #large buffer taken from the pool for a bulk transaction
+        self._attached = False #counted by the pool as an open connection
+        self._view = memoryview(self._buf).cast('B') #view of the read buffer, sliced without copy by GCommandRaw
+        self._bytes_read = _GSize(0) #length of the last response read by GCommandRaw
         self._timeout = 5000
         return        
     
@@ -156,6 +257,31 @@ class py:
         if self._gcon.value == None:
             _rc(-1201) #G_CONNECTION_NOT_ESTABLISHED
     
+    def _acquire(self):
+        """Takes a large buffer from the pool for a bulk transaction. It is held until _release."""
+        self._release()
+        self._large_buf = _pool.acquire()
+        return self._large_buf
+    
+    def _release(self):
+        """Gives the large buffer back to the pool, if one is held."""
+        if self._large_buf is not None:
+            _pool.release(self._large_buf)
+            self._large_buf = None
+    
+    def _command(self, command, bytes_read):
+        """
+        Sends an encoded command once, with the small buffer if its reply is known to be short (see _is_short), else with a large buffer.
+        Returns the buffer holding the response. A large buffer is held until _release.
+        """
+        self._release()
+        if _is_short(command):
+            _rc(_gclib.GCommand(self._gcon, command, self._buf, _small_buf_size, bytes_read))
+            return self._buf
+        buf = self._acquire()
+        _rc(_gclib.GCommand(self._gcon, command, buf, _buf_size, bytes_read))
+        return buf
+    
     def GOpen(self, address):
         """
         Opens a connection a galil controller.
@@ -163,6 +289,9 @@ class py:
         """
         c_address = _GCStringIn(address.encode(_enc))
         _rc(_gclib.GOpen(c_address, byref(self._gcon)))
+        if not self._attached:
+            _pool.attach()
+            self._attached = True
         return
         
      
@@ -170,6 +299,10 @@ class py:
         """
         Closes a connection to a Galil Controller.
         """
+        self._release()
+        if self._attached:
+            _pool.detach()
+            self._attached = False
         if self._gcon.value != None:
             _rc(_gclib.GClose(self._gcon))
             self._gcon = _GCon(0)
@@ -182,11 +315,33 @@ class py:
         Trims the response.
         """
         self._cc()
-        c_command = _GCStringIn(command.encode(_enc))
-        _rc(_gclib.GCommand(self._gcon, c_command, self._buf, _buf_size, None))
-        response = str(self._buf.value.decode(_enc))
+        buf = self._command(command.encode(_enc), None)
+        response = str(buf.value.decode(_enc))
+        self._release()
         return response[:-3].strip() # trim trailing /r/n: and leading space
 
+
+    def GCommandRaw(self, command):
+        """
+        Performs a command-and-response transaction on the connection, without decoding nor copying the response.
+        The command can be bytes (sent as is) or str.
+        Returns a memoryview of the read buffer, trimmed as GCommand trims the response.
+        The view is overwritten by the next transaction on the connection: use bytes(view) or view.tobytes() to keep it.
+        The large buffer of a bulk command is given back to the pool by the next transaction.
+        """
+        self._cc()
+        if isinstance(command, str):
+            command = command.encode(_enc)
+        buf = self._command(command, byref(self._bytes_read))
+        view = self._view if buf is self._buf else memoryview(buf).cast('B')
+        start = 0
+        end = self._bytes_read.value - 3 # trim trailing /r/n:
+        while start < end and view[start] in _blanks:
+            start += 1
+        while end > start and view[end - 1] in _blanks:
+            end -= 1
+        return view[start:max(start, end)]
+
         
     def GSleep(self, val):
         """
@@ -200,11 +355,11 @@ class py:
         """
         Provides the gclib version number. Please include the output of this function on all support cases.
         """
-        _rc(_gclibo.GVersion(self._buf, _buf_size))
+        _rc(_gclibo.GVersion(self._buf, _small_buf_size))
         return "py." + str(self._buf.value.decode(_enc))
         
     def GServerStatus(self):
-        _rc(_gclibo.GServerStatus(self._buf, _buf_size))
+        _rc(_gclibo.GServerStatus(self._buf, _small_buf_size))
         return str(self._buf.value.decode(_enc))
 		
     def GSetServer(self, server_name):
@@ -213,7 +368,7 @@ class py:
         return
         
     def GListServers(self):
-        _rc(_gclibo.GListServers(self._buf, _buf_size))
+        _rc(_gclibo.GListServers(self._buf, _small_buf_size))
         return str(self._buf.value.decode(_enc))
 		
     def GPublishServer(self, server_name, publish, save):
@@ -222,14 +377,14 @@ class py:
         return
 		
     def GRemoteConnections(self):
-        _rc(_gclibo.GRemoteConnections(self._buf, _buf_size))
+        _rc(_gclibo.GRemoteConnections(self._buf, _small_buf_size))
         return str(self._buf.value.decode(_enc))
 		
     def GInfo(self):
         """
         Provides a useful connection string. Please include the output of this function on all support cases.
         """
-        _rc(_gclibo.GInfo(self._gcon, self._buf, _buf_size))
+        _rc(_gclibo.GInfo(self._gcon, self._buf, _small_buf_size))
         return str(self._buf.value.decode(_enc))
         
         
@@ -242,9 +397,14 @@ class py:
         
         Linux/OS X users must be root to use GIpRequests() and have UDP access to bind and listen on port 67.
         """
-        _rc(_gclibo.GIpRequests(self._buf, _buf_size)) #get the c string from gclib
+        buf = self._acquire()
+        try:
+            _rc(_gclibo.GIpRequests(buf, _buf_size)) #get the c string from gclib
+            response = str(buf.value.decode(_enc))
+        finally:
+            self._release()
         ip_req_dict = {}
-        for line in str(self._buf.value.decode(_enc)).splitlines():
+        for line in response.splitlines():
             line = line.replace(' ', '') #trim spaces throughout
             if (line == ""): continue
             fields = line.split(',')
@@ -271,9 +431,14 @@ class py:
         Returns a dictionary mapping 'address' -> 'revision reports', where possible
         e.g. {}
         """
-        _rc(_gclibo.GAddresses(self._buf, _buf_size))
+        buf = self._acquire()
+        try:
+            _rc(_gclibo.GAddresses(buf, _buf_size))
+            response = str(buf.value.decode(_enc))
+        finally:
+            self._release()
         addr_dict = {}
-        for line in str(self._buf.value.decode(_enc)).splitlines():
+        for line in response.splitlines():
             fields = line.split(',')
             if len(fields) >= 2:
                 addr_dict[fields[0]] = fields[1]
@@ -300,8 +465,12 @@ class py:
         Uploads a program from the controller's program buffer.
         """
         self._cc()
-        _rc(_gclib.GProgramUpload(self._gcon, self._buf, _buf_size))
-        return str(self._buf.value.decode(_enc))
+        buf = self._acquire()
+        try:
+            _rc(_gclib.GProgramUpload(self._gcon, buf, _buf_size))
+            return str(buf.value.decode(_enc))
+        finally:
+            self._release()
         
         
     def GProgramDownloadFile(self, file_path, preprocessor=""):
@@ -370,16 +539,58 @@ class py:
         """
         Uploads array data from the controller's array table.
         """
-        self._cc()
-        c_name = _GCStringIn(name.encode(_enc))
-        _rc(_gclib.GArrayUpload(self._gcon, c_name, first, last, 1, self._buf, _buf_size)) #1 is comma delimiter
-        string_list = str(self._buf.value.decode(_enc)).split(',')
+        string_list = self.GArrayUploadText(name, first, last)
         float_list = []
         for s in string_list:
             float_list.append(float(s))
         return float_list
     
     
+    def GArrayUploadInto(self, name, first, last, out, offset=0):
+        """
+        Uploads array data from the controller's array table into a preallocated buffer.
+        out is any writable sequence of floats, e.g. array('d') or a NumPy array, filled in place from out[offset].
+        Returns the number of values written.
+        The response is parsed in place through a memoryview of the buffer: it is not copied, decoded nor split into a list.
+        Each value is converted by float() from its slice of the buffer.
+        """
+        self._cc()
+        c_name = _GCStringIn(name.encode(_enc))
+        buf = self._acquire()
+        try:
+            _rc(_gclib.GArrayUpload(self._gcon, c_name, first, last, 1, buf, _buf_size)) #1 is comma delimiter
+            view = memoryview(buf).cast('B')
+            if view[0] == 0: #empty response
+                return 0
+            count = 0
+            start = 0
+            while True:
+                end = _array_value.match(view, start).end()
+                out[offset + count] = float(view[start:end])
+                count += 1
+                if view[end] != 44: #not a comma: end of the response
+                    return count
+                start = end + 1
+        finally:
+            self._release()
+    
+    
+    def GArrayUploadText(self, name, first, last):
+        """
+        Uploads array data from the controller's array table.
+        Returns a list of strings, the values being formatted by the controller.
+        """
+        self._cc()
+        c_name = _GCStringIn(name.encode(_enc))
+        buf = self._acquire()
+        try:
+            _rc(_gclib.GArrayUpload(self._gcon, c_name, first, last, 1, buf, _buf_size)) #1 is comma delimiter
+            string_list = str(buf.value.decode(_enc)).split(',')
+        finally:
+            self._release()
+        return [s.strip() for s in string_list]
+    
+    
     def GTimeout(self, timeout):
         """
         Set the library timeout. Set to -1 to use the intitial library timeout, as specified in GOpen.
@@ -421,8 +632,12 @@ class py:
         Provides access to unsolicited messages from the controller.
         """
         self._cc()
-        _rc(_gclib.GMessage(self._gcon, self._buf, _buf_size))
-        return str(self._buf.value.decode(_enc))
+        buf = self._acquire()
+        try:
+            _rc(_gclib.GMessage(self._gcon, buf, _buf_size))
+            return str(buf.value.decode(_enc))
+        finally:
+            self._release()
      
      
     def GMotionComplete(self, axes):
@@ -453,12 +668,17 @@ class py:
         self._cc()
         c_path = _GCStringIn(file_path.encode(_enc))
 
-        rc = _gclibo.GSetupDownloadFile(self._gcon, c_path, options, self._buf, _buf_size)
-        if (options != 0):
-            _rc(rc)
+        buf = self._acquire()
+        try:
+            rc = _gclibo.GSetupDownloadFile(self._gcon, c_path, options, buf, _buf_size)
+            if (options != 0):
+                _rc(rc)
+            response = str(buf.value.decode(_enc))
+        finally:
+            self._release()
 
         info_dict = {}
-        for line in str(self._buf.value.decode(_enc)).split("\"\n"):
+        for line in response.split("\"\n"):
             fields = line.split(',',1)
 
             if (fields[0] == ""): continue
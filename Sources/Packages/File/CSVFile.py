@@ -21,6 +21,8 @@ Libraries/Modules
 -----------------
 - os standard library (https://docs.python.org/3/library/os.html)
     - Access to files function.
+- csv standard library (https://docs.python.org/3/library/csv.html)
+    - Split the lines into columns (quoting included).
 - FileWrapper library (:file:FileWrapper.html)
     - Access to files function.
 
@@ -39,7 +41,7 @@ TODO
 Author(s)
 ---------
 - Created by M. Cerato on 10/04/2022.
-- Modified by xxx on xx/xx/xxxx.
+- Modified by agent on 18/10/2026.
 
 Copyright (c) 2020 Cerato Workshop.  All rights reserved.
 
@@ -50,6 +52,7 @@ Members
 
 # In[1]: imports
 import os
+import csv
 from Packages.File import FileWrapper as fw
 
 
@@ -199,13 +202,17 @@ class CSV(fw.File):
                       mode='w', encoding="utf-8") as file:
                 file.writelines("")
 
-    def GetColumnDatas(self):
+    def GetColumnDatas(self, columns=None):
         """Extract Datas as colomn in a dictionnary form.
 
-        :param contentToWrite:
-            Line to read.
-        :type contentToWrite:
-            str, list
+        The file is read line by line and each line is splitted once.
+        Quoted values (ex : ``"a;b"``) are kept whole. A line shorter than
+        the header gives empty values for its missing columns.
+
+        :param columns:
+            headers of the columns to extract, every column if ``None``
+        :type columns:
+            list
 
         for example:
         =========================== ================================
@@ -220,21 +227,34 @@ class CSV(fw.File):
 
         .. warning::
             Worksd only on .CSV. As said, separators HAVE TO be ";"
+
+        .. note::
+            If two columns have the same header, the last one is kept.
         """
         columnSortedDict = {}
         if self.GetFileFormat() == ".csv":
             with open(os.path.join(self.GetFilePath(),
                                    self.GetFileName()),
-                      mode='r', encoding="utf-8") as file:
-                contentFile = file.readlines()
-                header = contentFile[0]
-                corpus = contentFile[1:]
-
-                for index, text in enumerate(header.split(";")):
-                    listValues = []
-                    for val in corpus:
-                        listValues.append(val.split(";")[index])
-                    columnSortedDict[text] = listValues
+                      mode='r', encoding="utf-8", newline="") as file:
+                reader = csv.reader(file, delimiter=";")
+                header = next(reader, [])
+
+                indexes = {}
+                for index, text in enumerate(header):
+                    if columns is None or text in columns:
+                        indexes[text] = index
+
+                selected = []
+                for text, index in indexes.items():
+                    columnSortedDict[text] = []
+                    selected.append((columnSortedDict[text], index))
+
+                width = len(header)
+                for row in reader:
+                    if len(row) < width:
+                        row = row + [""] * (width - len(row))
+                    for listValues, index in selected:
+                        listValues.append(row[index])
 
         return columnSortedDict
 
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Measure the reading of a large CB ``.csv``.
+
+Description
+-----------
+CSVBenchmark python file builds a synthetic ``OSM_LIST_CB.csv`` (100 000
+ControlBoxes by default) and measures how long ``CSVFile.GetColumnDatas``
+takes to read it :
+    - every column
+    - only the columns OSMOS uses (``OSMOSFiles.CBColumns``)
+
+Each measure is the best of several reads. Results are printed and can be
+written in a ``.json`` file, with the commit they were measured on.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Results file.
+- time standard library (https://docs.python.org/2/library/time.html)
+    - Measure the time of a read.
+- shutil standard library (https://docs.python.org/3/library/shutil.html)
+    - Remove the synthetic file.
+- argparse standard library (https://docs.python.org/3/library/argparse.html)
+    - Choose the size from command line.
+- tempfile standard library
+  (https://docs.python.org/3/library/tempfile.html)
+    - Directory of the synthetic file.
+- CSVFile library (:file:../FilePages/CSVFile.html)
+    - Reading measured.
+- OSMOSFiles library (:file:../Src/OSMOSFiles.html)
+    - Columns OSMOS uses.
+- SweepBenchmark library (:file:SweepBenchmark.html)
+    - Access to OSMOS sources, commit measured.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- Some lines are shorter than the header, as in the real inventories.
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import SweepBenchmark as sb
+
+import OSMOSFiles  # noqa: E402
+from Packages.File import CSVFile as csvf  # noqa: E402
+
+DefaultRows = 100000
+
+
+def BuildInventory(folder, rows):
+    """Write a CB ``.csv`` of ``rows`` ControlBoxes.
+
+    :param folder:
+        directory of the file
+    :type folder:
+        str
+    :param rows:
+        number of ControlBoxes
+    :type rows:
+        int
+    :return:
+        Return the path of the file
+    :rtype:
+        str
+    """
+    CBFile = os.path.join(folder, "OSM_LIST_CB.csv")
+    with open(CBFile, "w", encoding="utf-8") as file:
+        file.write("network;Device;Adresse-IP;Racine-nom-CVS;"
+                   "Numversion:1.7;DateRevision: 28/07/2022\n")
+        for index in range(rows):
+            network = f"NET{index % 40}"
+            line = (f"{network};{network}/CB.{index};"
+                    f"10.{index // 65536}.{index // 256 % 256}.{index % 256};"
+                    f"{network}_CB{index}_parameters")
+            if index % 10:
+                line = line + ";;"
+            file.write(line + "\n")
+    return CBFile
+
+
+def Measure(CBFile, columns=None, repeat=3):
+    """Read the columns of a CB ``.csv`` and measure it.
+
+    :param columns:
+        columns to read, every column if ``None``
+    :type columns:
+        list
+    :param repeat:
+        number of reads
+    :type repeat:
+        int
+    :return:
+        Return the best time (s) of the reads
+    :rtype:
+        float
+    """
+    csvFile = csvf.CSV(CBFile)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        csvFile.GetColumnDatas(columns)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the reading of a "
+                                     "large CB .csv")
+    parser.add_argument("--rows", type=int, default=DefaultRows)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="results file (.json)")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="osmos_csv_")
+    try:
+        CBFile = BuildInventory(folder, args.rows)
+        results = {"rows": args.rows,
+                   "allColumns": Measure(CBFile, None, args.repeat),
+                   "usedColumns": Measure(CBFile,
+                                          OSMOSFiles.OSMOSFiles.CBColumns,
+                                          args.repeat)}
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print(f"{args.rows} rows : every column {results['allColumns']:.3f} s, "
+          f"used columns {results['usedColumns']:.3f} s")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"commit": sb.Commit(), "results": results}, file,
+                      indent=4)
+        print(f"results written in {args.output}")
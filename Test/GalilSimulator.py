@@ -0,0 +1,568 @@
+# -*- coding: utf-8 -*-
+"""Simulate GALIL ControlBoxes on the local network.
+
+Description
+-----------
+GalilSimulator python file runs fake GALIL controllers answering the ASCII
+commands OSMOS sends through gclib on TCP. Nothing needs a real ControlBox :
+the simulated ones can be used to test and to measure an extraction
+offline.
+
+Each ``GalilSimulator`` is one controller listening on its own address.
+Its firmware, number of axis, parameters, variables, arrays, microcode and
+latency (per command line) are given when created. ``GalilFleet`` starts
+as many of them as needed on the loopback.
+
+Protocol
+--------
+- a command line ends with ``\\r`` (or ``\\n``). Several commands can be
+  sent on the same line, separated by ``;``.
+- every answer of the line is followed by ``\\r\\n``. The line ends with
+  ``:`` when every command is accepted.
+- a rejected command answers ``?`` and the rest of the line is ignored.
+  ``TC1`` gives the reason.
+- ``IHS =>-3`` closes the connection without answering (as a controller
+  does).
+
+Understood commands : ``^R^V``, ``IA ?``, ``WH``, ``TC1``, ``LV``, ``LA``,
+``LL``, ``LS n,m``, ``UL``, ``QU``, ``MG_xxx``, ``MG _xxx``, ``SPA=?``,
+``SP ?,?,...``, ``VF?``, ``name=?``, ``name[i]=?``, assignments
+(``SPA=2000``) and ``IHS``. Other commands are accepted without answer.
+
+Libraries/Modules
+-----------------
+- socket standard library (https://docs.python.org/3/library/socket.html)
+    - Access to TCP connections.
+- socketserver standard library
+  (https://docs.python.org/3/library/socketserver.html)
+    - One thread per client connection.
+- threading standard library (https://docs.python.org/3/library/threading.html)
+    - Run the simulators in background.
+- time standard library (https://docs.python.org/2/library/time.html)
+    - Simulate the latency of a controller.
+- re standard library (https://docs.python.org/3/library/re.html)
+    - Recognize the commands.
+- argparse standard library (https://docs.python.org/3/library/argparse.html)
+    - Run simulators from command line.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- Only the commands used by OSMOS are simulated. Motion is not.
+- UDP (unsolicited messages and interrupts) is not simulated.
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import re
+import time
+import socket
+import argparse
+import threading
+import socketserver
+
+
+class GalilCommandError(Exception):
+    """Command rejected by a simulated controller (answered ``?``)."""
+
+
+class GalilSimulator:
+    """Class representing one simulated GALIL controller.
+
+    :param host:
+        address to listen on (ex : 127.0.0.1)
+    :type host:
+        str
+    :param port:
+        TCP port to listen on. ``0`` lets the system choose a free one
+    :type port:
+        int
+    :param firmware:
+        firmware of the controller (ex : DMC4183s56g)
+    :type firmware:
+        str
+    :param serial:
+        serial number of the controller (ex : 15953)
+    :type serial:
+        str
+    :param axis:
+        number of axis of the controller (1 to 8)
+    :type axis:
+        int
+    :param parameters:
+        values of the parameters. An axis parameter is given as a list,
+        one value per axis (ex : {"SP": ["2000", "3000"], "VF": "10.4"}).
+        Unknown parameters are read as in ``defaults``, or as "0"
+    :type parameters:
+        dict
+    :param variables:
+        values of the variables (ex : {"McRevSpe": "1.0000"})
+    :type variables:
+        dict
+    :param arrays:
+        values of the arrays (ex : {"tab": [1.0, 2.5]})
+    :type arrays:
+        dict
+    :param microcode:
+        program of the controller, lines separated by ``\\r\\n``
+    :type microcode:
+        str
+    :param latency:
+        time (s) waited before answering each command line
+    :type latency:
+        float
+
+    :attr stats:
+        command lines (round trips), commands and bytes received and sent
+        by the controller
+    :type stats:
+        dict
+    """
+
+    axisNames = "ABCDEFGH"
+
+    vectorNames = "STNM"
+
+    # parameters made of several fields
+    defaults = {"SI": "0, 0, 0, 0, 0, 0", "SS": "0, 0, 0, 0, 0"}
+
+    # time (s) for a stopped controller to leave its listening loop
+    pollInterval = 0.05
+
+    def __init__(self, host="127.0.0.1", port=0, firmware="DMC4183s56g",
+                 serial="15953", axis=8, parameters=None, variables=None,
+                 arrays=None, microcode="#AUTO\r\nEN\r\n", latency=0.0):
+        self.host = host
+        self.port = port
+        self.firmware = firmware
+        self.serial = serial
+        self.axis = self.axisNames[:max(1, min(int(axis), 8))]
+        self.parameters = dict(parameters or {})
+        self.variables = dict(variables or {})
+        self.arrays = dict(arrays or {})
+        self.microcode = microcode
+        self.latency = latency
+
+        self.stats = {"lines": 0, "commands": 0, "bytesIn": 0,
+                      "bytesOut": 0}
+        self.__lastError = "0 NO ERROR"
+        self.__lock = threading.Lock()
+        self.__server = None
+        self.__thread = None
+
+    def Start(self):
+        """Start listening in background.
+
+        :return:
+            Return the address (host, port) the controller listens on
+        :rtype:
+            tuple
+        """
+        simulator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                simulator._Serve(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.__server = socketserver.ThreadingTCPServer((self.host,
+                                                         self.port), Handler)
+        self.__server.daemon_threads = True
+        self.port = self.__server.server_address[1]
+
+        self.__thread = threading.Thread(target=self.__server.serve_forever,
+                                         args=(self.pollInterval,),
+                                         daemon=True)
+        self.__thread.start()
+        return self.host, self.port
+
+    def Stop(self):
+        """Stop listening."""
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+    def Answer(self, command):
+        """Give the answer of the controller to one command.
+
+        :param command:
+            GALIL command, without ``;`` nor ``\\r`` (ex : SPA=?)
+        :type command:
+            str
+        :return:
+            Return the answer, ``""`` if the command doesn't answer
+        :rtype:
+            str
+        :raises GalilCommandError:
+            if the controller rejects the command
+        """
+        command = command.strip()
+        compact = command.replace(" ", "")
+
+        if command == "\x12\x16":
+            return self.firmware
+
+        if compact == "IA?":
+            return ", ".join(self.host.split("."))
+
+        if compact == "WH":
+            return "IHA"
+
+        if compact == "TC1":
+            return self.__lastError
+
+        if compact == "LV":
+            return "\r\n".join(f"{name}= {value}" for name, value in
+                               sorted(self.variables.items()))
+
+        if compact == "LA":
+            return "\r\n".join(f"{name}[{len(values)}]" for name, values in
+                               sorted(self.arrays.items()))
+
+        if compact == "LL":
+            return "\r\n".join(f"{label}={line}" for line, label in
+                               self.__Labels())
+
+        if compact == "UL":
+            return self.microcode.rstrip("\r\n") + "\r\n\x1a"
+
+        match = re.match(r"^LS(\d+),(\d+)$", compact)
+        if match:
+            return self.__List(int(match.group(1)), int(match.group(2)))
+
+        match = re.match(r"^QU(\w+)\[\],(\d+),(\d+),(\d)$", compact)
+        if match:
+            return self.__Upload(*match.groups())
+
+        match = re.match(r"^MG_?(_\w+|\w+)$", compact)
+        if match:
+            return self.__Message(match.group(1).lstrip("_"))
+
+        match = re.match(r"^(\w+)\[(\d+)\]=\?$", compact)
+        if match:
+            return self.__Element(match.group(1), int(match.group(2)))
+
+        match = re.match(r"^([A-Z][A-Z0-9])\?(,\?)*$", compact)
+        if match:
+            return self.__Read(match.group(1), compact.count("?"))
+
+        match = re.match(r"^([A-Z][A-Z0-9])([A-HSTNM])=\?$", compact)
+        if match:
+            return self.__ReadAxis(match.group(1), match.group(2))
+
+        match = re.match(r"^(\w+)=\?$", compact)
+        if match:
+            if match.group(1) in self.variables:
+                return self.variables[match.group(1)]
+            raise GalilCommandError("1 Unrecognized command")
+
+        match = re.match(r"^([A-Z][A-Z0-9])([A-HSTNM])=(.+)$", compact)
+        if match:
+            self.__Assign(match.group(1), match.group(2), match.group(3))
+            return ""
+
+        return ""
+
+    def AnswerLine(self, line):
+        """Give the answer of the controller to a command line.
+
+        :param line:
+            commands separated by ``;``, without ``\\r`` (ex : SPA=?;SPB=?)
+        :type line:
+            str
+        :return:
+            Return the full answer, ``None`` if the connection is closed
+        :rtype:
+            str
+        """
+        output = ""
+        for command in line.split(";"):
+            if command.strip() == "":
+                continue
+
+            with self.__lock:
+                self.stats["commands"] += 1
+
+            if re.match(r"^IHS\s*=\s*>\s*-3$", command.strip()):
+                return None
+
+            try:
+                answer = self.Answer(command)
+            except GalilCommandError as ex:
+                self.__lastError = str(ex)
+                return output + "?"
+
+            if answer != "":
+                output = output + answer + "\r\n"
+
+        return output + ":"
+
+    def _Serve(self, connection):
+        """Answer the command lines of one client connection.
+
+        :param connection:
+            socket of the client
+        :type connection:
+            socket.socket
+        """
+        pending = ""
+        while True:
+            try:
+                data = connection.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+
+            with self.__lock:
+                self.stats["bytesIn"] += len(data)
+            pending = pending + data.decode("ascii", "replace")
+
+            while True:
+                ends = [pending.find(end) for end in "\r\n" if end in pending]
+                if not ends:
+                    break
+                line, pending = pending[:min(ends)], pending[min(ends) + 1:]
+                if line.strip() == "":
+                    continue
+
+                with self.__lock:
+                    self.stats["lines"] += 1
+
+                answer = self.AnswerLine(line)
+                if answer is None:
+                    connection.close()
+                    return
+
+                if self.latency:
+                    time.sleep(self.latency)
+
+                with self.__lock:
+                    self.stats["bytesOut"] += len(answer)
+                connection.sendall(answer.encode("ascii"))
+
+# ************************** internal methods ********************************
+    def __Labels(self):
+        labels = []
+        for index, line in enumerate(self.microcode.split("\r\n")):
+            match = re.match(r"^(#\w+)", line.strip())
+            if match:
+                labels.append((index, match.group(1)))
+        return labels
+
+    def __List(self, first, last):
+        lines = self.microcode.rstrip("\r\n").split("\r\n")
+        return "\r\n".join(f"{index} {lines[index]}" for index in
+                            range(first, min(last, len(lines) - 1) + 1))
+
+    def __Upload(self, name, first, last, delimiter):
+        if name not in self.arrays:
+            raise GalilCommandError("1 Unrecognized command")
+        values = self.arrays[name][int(first):int(last) + 1]
+        separator = "," if delimiter == "1" else "\r\n"
+        return separator.join(self.__Format(value) for value in values)
+
+    def __Message(self, operand):
+        if operand == "BN":
+            return " " + self.__Format(self.serial)
+        if operand in self.variables:
+            return self.variables[operand]
+        if operand in self.parameters:
+            value = self.parameters[operand]
+            return value[0] if isinstance(value, list) else value
+        return " " + self.__Format(0)
+
+    def __Element(self, name, index):
+        if name not in self.arrays or index >= len(self.arrays[name]):
+            raise GalilCommandError("1 Unrecognized command")
+        return self.__Format(self.arrays[name][index])
+
+    def __Read(self, param, count):
+        value = self.parameters.get(param, self.defaults.get(param, "0"))
+        if not isinstance(value, list):
+            if count == 1:
+                return value
+            value = [value] * len(self.axis)
+
+        if count > len(self.axis):
+            raise GalilCommandError("6 Number out of range")
+        return ", ".join(self.__AxisValue(value, index)
+                         for index in range(count))
+
+    def __ReadAxis(self, param, axisName):
+        value = self.parameters.get(param, self.defaults.get(param, "0"))
+        if axisName in self.vectorNames:
+            return self.parameters.get(param + axisName, "0")
+
+        if axisName not in self.axis:
+            raise GalilCommandError("6 Number out of range")
+        if not isinstance(value, list):
+            return value
+        return self.__AxisValue(value, self.axis.index(axisName))
+
+    def __Assign(self, param, axisName, value):
+        if axisName in self.vectorNames:
+            self.parameters[param + axisName] = value
+            return
+
+        if axisName not in self.axis:
+            raise GalilCommandError("6 Number out of range")
+        values = self.parameters.get(param, self.defaults.get(param, "0"))
+        if not isinstance(values, list):
+            values = [values] * len(self.axis)
+        values = list(values) + ["0"] * (len(self.axis) - len(values))
+        values[self.axis.index(axisName)] = value
+        self.parameters[param] = values
+
+    def __AxisValue(self, values, index):
+        if index < len(values):
+            return values[index]
+        return "0"
+
+    def __Format(self, value):
+        try:
+            return "%.4f" % float(value)
+        except ValueError:
+            return str(value)
+
+
+class GalilFleet:
+    """Class representing many simulated controllers on the loopback.
+
+    :param count:
+        number of controllers
+    :type count:
+        int
+    :param hosts:
+        addresses of the controllers. By default all controllers listen on
+        127.0.0.1, each one on its own port
+    :type hosts:
+        list
+    :param port:
+        TCP port of every controller when ``hosts`` is given (``0`` lets
+        the system choose)
+    :type port:
+        int
+
+    Any other keyword is given to each ``GalilSimulator``.
+
+    :attr simulators:
+        the controllers of the fleet
+    :type simulators:
+        list
+    """
+
+    def __init__(self, count, hosts=None, port=0, **settings):
+        if hosts is None:
+            hosts = ["127.0.0.1"] * count
+        self.simulators = [GalilSimulator(host=host, port=port, **settings)
+                           for host in hosts[:count]]
+
+    def Start(self):
+        """Start every controller.
+
+        :return:
+            Return the addresses (host, port) of the controllers
+        :rtype:
+            list
+        """
+        return [simulator.Start() for simulator in self.simulators]
+
+    def Stop(self):
+        """Stop every controller (all at the same time)."""
+        threads = [threading.Thread(target=simulator.Stop)
+                   for simulator in self.simulators]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def Stats(self):
+        """Sum the statistics of every controller.
+
+        :return:
+            Return the command lines, commands and bytes received and sent
+            by the fleet
+        :rtype:
+            dict
+        """
+        total = {"lines": 0, "commands": 0, "bytesIn": 0, "bytesOut": 0}
+        for simulator in self.simulators:
+            for key in total:
+                total[key] += simulator.stats[key]
+        return total
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+
+def SendCommand(address, command, timeout=5.0):
+    """Send one command line to a controller and return its raw answer.
+
+    :param address:
+        (host, port) of the controller
+    :type address:
+        tuple
+    :param command:
+        command line, without ``\\r``
+    :type command:
+        str
+    :return:
+        Return the answer, up to the final ``:`` or ``?``
+    :rtype:
+        str
+    """
+    with socket.create_connection(address, timeout) as connection:
+        connection.sendall((command + "\r").encode("ascii"))
+        answer = b""
+        while not answer.endswith((b":", b"?")):
+            data = connection.recv(4096)
+            if not data:
+                break
+            answer = answer + data
+    return answer.decode("ascii")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run simulated GALIL "
+                                     "controllers on the loopback")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--axis", type=int, default=8)
+    parser.add_argument("--firmware", default="DMC4183s56g")
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fleet = GalilFleet(args.count, hosts=[args.host] * args.count,
+                       port=args.port, axis=args.axis,
+                       firmware=args.firmware, latency=args.latency)
+    for host, port in fleet.Start():
+        print(f"{host}:{port}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fleet.Stop()
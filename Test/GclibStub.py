@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Stand for the gclib native libraries with simulated controllers.
+
+Description
+-----------
+GclibStub python file replaces the native gclib libraries (``gclib.dll``,
+``libgclib.so``...) loaded by ``gclib.py``. Each call is answered as the
+native library would, by the simulated controllers of GalilSimulator,
+without any network : ``gclib.py``, ``ControlBox`` and OSMOS can be tested
+offline, with no library installed.
+
+The stub is given to ``gclib.py`` in place of its two libraries (see
+``Install``). Only the calls OSMOS makes are simulated : ``GOpen``,
+``GClose``, ``GCommand``, ``GArrayUpload``, ``GProgramUpload``, ``GInfo``,
+``GTimeout`` and ``GError``.
+
+Libraries/Modules
+-----------------
+- ctypes standard library (https://docs.python.org/3/library/ctypes.html)
+    - Fill the buffers given by ``gclib.py``.
+- threading standard library (https://docs.python.org/3/library/threading.html)
+    - Connections opened by several workers at the same time.
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- The return codes are the stub's ones. Their messages hold the words
+  ``ControlBox.linkErrors`` looks for, as the gclib messages do.
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import ctypes
+import threading
+import GalilSimulator as gs
+
+
+class GclibStub:
+    """Class answering the gclib calls with simulated controllers.
+
+    :param simulators:
+        simulated controllers, per IP (ex : {"127.0.0.1": simulator})
+    :type simulators:
+        dict
+
+    :attr lines:
+        command lines received by ``GCommand``, in order
+    :type lines:
+        list
+    :attr timeouts:
+        timeouts (ms) set by ``GTimeout``, in order
+    :type timeouts:
+        list
+    :attr messages:
+        error message of each return code of the stub
+    :type messages:
+        dict
+    """
+
+    timeoutError = -1
+
+    openError = -2
+
+    questionMark = -3
+
+    bufferTooSmall = -4
+
+    notConnected = -1201
+
+    messages = {timeoutError: "device timed out",
+                openError: "device could not be opened",
+                questionMark: "question mark returned by controller",
+                bufferTooSmall: "buffer too small for the response",
+                notConnected: "connection not established"}
+
+    def __init__(self, simulators):
+        self.simulators = dict(simulators)
+        self.lines = []
+        self.timeouts = []
+        self.__connections = {}
+        self.__handles = 0
+        self.__lock = threading.Lock()
+
+    def Install(self, monkeypatch, gclib):
+        """Give the stub to ``gclib.py`` instead of its native libraries.
+
+        :param monkeypatch:
+            pytest fixture undoing the change at the end of the test
+        :type monkeypatch:
+            pytest.MonkeyPatch
+        :param gclib:
+            ``gclib.py`` module
+        :type gclib:
+            module
+        :return:
+            Return the stub
+        :rtype:
+            GclibStub
+        """
+        monkeypatch.setattr(gclib, "_gclib", self)
+        monkeypatch.setattr(gclib, "_gclibo", self)
+        return self
+
+    # ***************************** gclib calls ******************************
+    def GOpen(self, address, connection):
+        ip = self.__Value(address).decode("ascii").split()[0]
+        if ip not in self.simulators:
+            return self.openError
+
+        # GOpen of several workers at the same time
+        with self.__lock:
+            self.__handles = self.__handles + 1
+            connection._obj.value = self.__handles
+            self.__connections[self.__handles] = ip
+        return 0
+
+    def GClose(self, connection):
+        self.__connections.pop(self.__Value(connection), None)
+        return 0
+
+    def GCommand(self, connection, command, buf, size, bytesRead):
+        simulator = self.__Simulator(connection)
+        if simulator is None:
+            return self.notConnected
+
+        line = self.__Value(command).decode("ascii")
+        self.lines.append(line)
+        answer = simulator.AnswerLine(line)
+        if answer is None:  # connection closed by the controller
+            self.GClose(connection)
+            return self.timeoutError
+        if answer.endswith("?"):
+            return self.questionMark
+
+        if bytesRead is not None:
+            bytesRead._obj.value = len(answer)
+        return self.__Fill(buf, size, answer)
+
+    def GArrayUpload(self, connection, name, first, last, delimiter, buf,
+                     size):
+        simulator = self.__Simulator(connection)
+        if simulator is None:
+            return self.notConnected
+
+        name = self.__Value(name).decode("ascii")
+        try:
+            answer = simulator.Answer(f"QU {name}[],{first},{last},"
+                                      f"{delimiter}")
+        except gs.GalilCommandError:
+            return self.questionMark
+        return self.__Fill(buf, size, answer)
+
+    def GProgramUpload(self, connection, buf, size):
+        simulator = self.__Simulator(connection)
+        if simulator is None:
+            return self.notConnected
+        return self.__Fill(buf, size, simulator.Answer("UL").rstrip("\x1a"))
+
+    def GInfo(self, connection, buf, size):
+        simulator = self.__Simulator(connection)
+        if simulator is None:
+            return self.notConnected
+        return self.__Fill(buf, size, f"{simulator.host}, "
+                           f"{simulator.firmware}, {simulator.serial}, "
+                           f"IHA IHB")
+
+    def GTimeout(self, connection, timeout):
+        self.timeouts.append(timeout)
+        return 0
+
+    def GError(self, returnCode, buf, size):
+        self.__Fill(buf, size, self.messages.get(returnCode, "error"))
+
+    # ************************** internal methods ****************************
+    def __Simulator(self, connection):
+        ip = self.__connections.get(self.__Value(connection))
+        if ip is None:
+            return None
+        return self.simulators[ip]
+
+    def __Fill(self, buf, size, answer):
+        """Copy an answer into a buffer, ended by a null character."""
+        data = answer.encode("ascii")
+        if len(data) + 1 > size:
+            return self.bufferTooSmall
+
+        ctypes.memmove(buf, data, len(data))
+        buf[len(data)] = b"\x00"
+        return 0
+
+    @staticmethod
+    def __Value(argument):
+        """Give the value of a ctypes argument (or the argument itself)."""
+        return getattr(argument, "value", argument)
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""Measure the extraction of a simulated network of ControlBoxes.
+
+Description
+-----------
+SweepBenchmark python file runs ``OSMOS.OSMOSSeq`` on a network of
+simulated controllers (see GalilSimulator) and records how long it takes.
+
+For each scenario, a synthetic ``OSM_LIST_CB.csv`` is built with one line
+per simulated controller (network "BENCH") next to a copy of the Cde
+``.csv``. Scenarios sweep :
+    - the number of controllers (1, 10, 100 and 433 by default)
+    - the latency (RTT) of a controller
+    - the size of the arrays of a controller
+
+Each result gives the wall time, the round trips (command lines) and
+commands per controller, the bytes transferred and the peak RSS of the
+process. Results are written in a ``.json`` file, with the commit they were
+measured on, so two commits can be compared (``--compare``).
+
+.. important::
+    gclib connects on the GALIL port (23) of an IP address. The simulated
+    controllers listen on 127.0.x.y:23, which needs the right to open that
+    port. gclib (and its library) has to be installed.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- sys standard library (https://docs.python.org/3/library/sys.html)
+    - Access to OSMOS sources.
+- io standard library (https://docs.python.org/3/library/io.html)
+    - Silence OSMOS prints during the measure.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Results file.
+- time standard library (https://docs.python.org/2/library/time.html)
+    - Measure the wall time.
+- shutil standard library (https://docs.python.org/3/library/shutil.html)
+    - Copy and remove the files of a scenario.
+- argparse standard library (https://docs.python.org/3/library/argparse.html)
+    - Choose the scenarios from command line.
+- platform standard library
+  (https://docs.python.org/3/library/platform.html)
+    - Describe the machine of the results.
+- tempfile standard library
+  (https://docs.python.org/3/library/tempfile.html)
+    - Working directory of a scenario.
+- contextlib standard library
+  (https://docs.python.org/3/library/contextlib.html)
+    - Silence OSMOS prints during the measure.
+- subprocess standard library
+  (https://docs.python.org/3/library/subprocess.html)
+    - Get the commit measured.
+- resource standard library (https://docs.python.org/3/library/resource.html)
+    - Peak RSS (not on Windows).
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+- OSMOS library (:file:../Src/OSMOS.html)
+    - Extraction measured.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- The peak RSS is the one of the whole process : it can only grow from a
+  scenario to the next one.
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import GalilSimulator as gs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ProjectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ProjectDir, "Sources"))
+
+import OSMOS  # noqa: E402
+
+DefaultCdeFile = os.path.join(ProjectDir, "Documentation", "Reference",
+                              "OSM_LIST_CDE.csv")
+
+DefaultCounts = [1, 10, 100, 433]
+
+Network = "BENCH"
+
+
+def Hosts(count):
+    """Give an address on the loopback to each simulated controller.
+
+    :param count:
+        number of controllers (up to 250 * 256)
+    :type count:
+        int
+    :return:
+        Return the addresses (ex : [127.0.0.1, 127.0.0.2, ...])
+    :rtype:
+        list
+    """
+    return [f"127.0.{index // 250}.{index % 250 + 1}"
+            for index in range(count)]
+
+
+def BuildFiles(folder, hosts, cdeFile=DefaultCdeFile):
+    """Write the CB and Cde ``.csv`` of a scenario.
+
+    :param folder:
+        directory of the scenario
+    :type folder:
+        str
+    :param hosts:
+        addresses of the simulated controllers
+    :type hosts:
+        list
+    :param cdeFile:
+        Cde ``.csv`` to extract the parameters of
+    :type cdeFile:
+        str
+    :return:
+        Return the paths of the CB and Cde ``.csv``
+    :rtype:
+        tuple
+    """
+    CBFile = os.path.join(folder, "OSM_LIST_CB.csv")
+    lines = ["network;Device;Adresse-IP;Racine-nom-CVS;;"]
+    for index, host in enumerate(hosts):
+        lines.append(f"{Network};BENCH/CB.{index + 1};{host};"
+                     f"BENCH_CB{index + 1}_parameters;;")
+
+    with open(CBFile, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+    CdeFile = os.path.join(folder, "OSM_LIST_CDE.csv")
+    shutil.copyfile(cdeFile, CdeFile)
+
+    return CBFile, CdeFile
+
+
+def PeakRSS():
+    """Give the peak resident memory of the process.
+
+    :return:
+        Return the peak RSS in bytes, ``None`` if unknown
+    :rtype:
+        int
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == "Darwin":
+        return peak  # already in bytes
+    return peak * 1024
+
+
+def RunScenario(count, latency=0.0, arraySize=100, variables=20,
+                workers=1, cdeFile=DefaultCdeFile):
+    """Extract a network of simulated controllers and measure it.
+
+    :param count:
+        number of controllers of the network
+    :type count:
+        int
+    :param latency:
+        time (s) a controller waits before answering a command line
+    :type latency:
+        float
+    :param arraySize:
+        number of elements of the array of each controller
+    :type arraySize:
+        int
+    :param variables:
+        number of variables of each controller
+    :type variables:
+        int
+    :param workers:
+        number of ControlBoxes OSMOS extracts at the same time
+    :type workers:
+        int
+    :param cdeFile:
+        Cde ``.csv`` to extract the parameters of
+    :type cdeFile:
+        str
+    :return:
+        Return the measures of the scenario
+    :rtype:
+        dict
+    :raise RuntimeError:
+        if a controller couldn't be extracted : the measures would not be
+        the ones of the whole network
+    """
+    folder = tempfile.mkdtemp(prefix="osmos_bench_")
+    bakFolder = os.path.join(folder, "bak") + os.sep
+    logFolder = os.path.join(folder, "log") + os.sep
+    os.mkdir(bakFolder)
+    os.mkdir(logFolder)
+
+    hosts = Hosts(count)
+    CBFile, CdeFile = BuildFiles(folder, hosts, cdeFile)
+
+    settings = {"latency": latency,
+                "arrays": {"bench": [index * 0.5
+                                     for index in range(arraySize)]},
+                "variables": {f"var{index}": f"{index}.0000"
+                              for index in range(variables)},
+                "microcode": "#AUTO\r\nMG \"bench\"\r\nEN\r\n"}
+
+    try:
+        # gclib only connects on the GALIL port
+        with gs.GalilFleet(count, hosts=hosts,
+                           port=OSMOS.ControlBox.ControlBox.galilPort,
+                           **settings) as fleet:
+            osmos = OSMOS.OSMOS(CBFile=CBFile, CdeFile=CdeFile,
+                                bakFolder=bakFolder, logFolder=logFolder,
+                                RTTFile=os.path.join(folder, "rtt.json"),
+                                planFile=os.path.join(folder,
+                                                      "plans.json"))
+            osmos.UpdateWorkers(workers)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                osmos.OSMOSSeq(network=Network)
+            wallTime = time.perf_counter() - start
+
+            stats = fleet.Stats()
+            failedCB = list(osmos.failedCB)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if failedCB:
+        raise RuntimeError(f"{len(failedCB)} simulated controller(s) not "
+                           f"extracted (ex : {failedCB[0]})")
+
+    return {"controllers": count,
+            "latency": latency,
+            "arraySize": arraySize,
+            "variables": variables,
+            "workers": workers,
+            "wallTime": wallTime,
+            "wallTimePerController": wallTime / count,
+            "roundTripsPerController": stats["lines"] / count,
+            "commandsPerController": stats["commands"] / count,
+            "bytesIn": stats["bytesIn"],
+            "bytesOut": stats["bytesOut"],
+            "peakRSS": PeakRSS()}
+
+
+def Commit():
+    """Give the commit the benchmark is run on.
+
+    :return:
+        Return the commit hash, ``None`` if unknown
+    :rtype:
+        str
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                       cwd=ProjectDir, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def Key(result):
+    """Identify the scenario of a result."""
+    return (result["controllers"], result["latency"], result["arraySize"],
+            result["variables"], result["workers"])
+
+
+def Compare(oldResults, newResults):
+    """Print the wall time of the scenarios measured in both results.
+
+    :param oldResults:
+        results of the reference commit
+    :type oldResults:
+        dict
+    :param newResults:
+        results of the commit compared
+    :type newResults:
+        dict
+    """
+    old = {Key(result): result for result in oldResults["results"]}
+    print(f"{'scenario':<40}{'old (s)':>10}{'new (s)':>10}{'ratio':>8}")
+    for result in newResults["results"]:
+        if Key(result) not in old:
+            continue
+        oldTime = old[Key(result)]["wallTime"]
+        newTime = result["wallTime"]
+        scenario = ("{} CB, {} s, array {}, var {}, {} workers"
+                    .format(*Key(result)))
+        print(f"{scenario:<40}{oldTime:>10.3f}{newTime:>10.3f}"
+              f"{newTime / oldTime:>8.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure OSMOS on a "
+                                     "simulated network of ControlBoxes")
+    parser.add_argument("--counts", type=int, nargs="+",
+                        default=DefaultCounts)
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.0],
+                        help="RTT of a controller (s)")
+    parser.add_argument("--array-size", type=int, nargs="+", default=[100])
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cde", default=DefaultCdeFile)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="results file of a previous run")
+    args = parser.parse_args()
+
+    results = []
+    for latency in args.latency:
+        for arraySize in args.array_size:
+            for count in args.counts:
+                result = RunScenario(count, latency, arraySize,
+                                     args.variables, args.workers,
+                                     args.cde)
+                results.append(result)
+                print(f"{count} CB, {latency} s, array {arraySize} : "
+                      f"{result['wallTime']:.3f} s, "
+                      f"{result['roundTripsPerController']:.1f} round trips"
+                      f" per CB")
+
+    output = {"commit": Commit(),
+              "date": time.strftime("%d/%m/%Y %H:%M:%S"),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "results": results}
+
+    with open(args.output, "w") as file:
+        json.dump(output, file, indent=4)
+    print(f"results written in {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            Compare(json.load(file), output)
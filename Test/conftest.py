@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Prepare the tests of OSMOS.
+
+Description
+-----------
+pytest reads this file before the tests. It gives the tests access to the
+OSMOS sources (``Sources``), as OSMOS is run from there, and to the local
+packages (``Sources/Packages``) when they are not installed.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- sys standard library (https://docs.python.org/3/library/sys.html)
+    - Access to OSMOS sources.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- None
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+- agent
+
+"""
+import os
+import sys
+
+ProjectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SourcesDir = os.path.join(ProjectDir, "Sources")
+PackagesDir = os.path.join(SourcesDir, "Packages")
+
+if SourcesDir not in sys.path:
+    sys.path.insert(0, SourcesDir)
+
+# installed local packages (see Sources/Packages/setup.py) come first
+if PackagesDir not in sys.path:
+    sys.path.append(PackagesDir)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Test the class AdaptiveTimeout.
+
+Description
+-----------
+Sequence of tests for AdaptiveTimeout : RTT estimates, failures, timeouts
+of the commands and of the bulk transfers, and saved estimates.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Read the saved estimates.
+- AdaptiveTimeout library (:file:../CBPages/AdaptiveTimeout.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import json
+from Packages.Controlbox.AdaptiveTimeout import AdaptiveTimeout
+
+
+class Test_AdaptiveTimeout:
+    """Class testing the arithmetic of the timeouts.
+
+    :attr ip:
+        IP of the ControlBox measured
+    :type ip:
+        str
+    """
+    ip = "172.16.3.65"
+
+    def test_Update(self):
+        timeouts = AdaptiveTimeout()
+        assert timeouts.GetRTT(self.ip) is None
+        timeouts.Update(self.ip, 0.010)
+        assert timeouts.GetRTT(self.ip) == 10.0
+
+        # exponentially weighted : 7/8 of the estimate, 1/8 of the measure
+        timeouts.Update(self.ip, 0.018)
+        assert abs(timeouts.GetRTT(self.ip) - 11.0) < 1e-9
+
+    def test_Failure(self):
+        timeouts = AdaptiveTimeout()
+        timeouts.Failure(self.ip)
+        assert timeouts.GetRTT(self.ip) is None
+
+        timeouts.Update(self.ip, 0.100)
+        timeouts.Failure(self.ip)
+        assert abs(timeouts.GetRTT(self.ip) - 200.0) < 1e-9
+
+        # never more than the estimate giving maxTimeout
+        for failure in range(10):
+            timeouts.Failure(self.ip)
+        assert timeouts.GetRTT(self.ip) == \
+            timeouts.maxTimeout / timeouts.rttFactor
+        assert timeouts.GetTimeout(self.ip) == timeouts.maxTimeout
+
+    def test_GetTimeout(self):
+        timeouts = AdaptiveTimeout()
+        assert timeouts.GetTimeout(self.ip) is None
+        assert timeouts.GetTimeout(self.ip, True) is None
+
+        # fast ControlBox : smallest timeouts
+        timeouts.Update(self.ip, 0.002)
+        assert timeouts.GetTimeout(self.ip) == timeouts.minTimeout
+        assert timeouts.GetTimeout(self.ip, True) == timeouts.minBulkTimeout
+
+        # rttFactor and bulkFactor times the RTT, rounded up to 10 ms
+        timeouts = AdaptiveTimeout()
+        timeouts.Update(self.ip, 0.1234)
+        assert timeouts.GetTimeout(self.ip) == 990
+        assert timeouts.GetTimeout(self.ip, True) == 6170
+
+    def test_GetTimeout_max(self):
+        timeouts = AdaptiveTimeout()
+        timeouts.Update(self.ip, 2.0)
+        assert timeouts.GetTimeout(self.ip) == timeouts.maxTimeout
+        assert timeouts.GetTimeout(self.ip, True) == timeouts.maxBulkTimeout
+
+        # a bulk transfer gets more than a command
+        timeouts = AdaptiveTimeout()
+        timeouts.Update(self.ip, 0.7)
+        assert timeouts.GetTimeout(self.ip) == timeouts.maxTimeout
+        assert timeouts.GetTimeout(self.ip, True) == 35000
+
+    def test_SaveLoad(self, tmp_path):
+        path = os.path.join(str(tmp_path), "rtt.json")
+        timeouts = AdaptiveTimeout()
+        timeouts.Update(self.ip, 0.010)
+        timeouts.Update("172.16.3.66", 0.020)
+        timeouts.Save(path)
+        with open(path) as file:
+            assert json.load(file) == {self.ip: 10.0, "172.16.3.66": 20.0}
+        assert os.listdir(str(tmp_path)) == ["rtt.json"]
+
+        loaded = AdaptiveTimeout()
+        loaded.Load(path)
+        assert loaded.GetRTT(self.ip) == 10.0
+        assert loaded.GetTimeout("172.16.3.66") == \
+            timeouts.GetTimeout("172.16.3.66")
+
+    def test_Load_ignored(self, tmp_path):
+        timeouts = AdaptiveTimeout()
+        timeouts.Load(os.path.join(str(tmp_path), "missing.json"))
+        assert timeouts.GetRTT(self.ip) is None
+
+        path = os.path.join(str(tmp_path), "rtt.json")
+        with open(path, "w") as file:
+            file.write("{not json")
+        timeouts.Load(path)
+        assert timeouts.GetRTT(self.ip) is None
+
+        # valid JSON, but not estimates per IP
+        for content in ("[]", "1", "null"):
+            with open(path, "w") as file:
+                file.write(content)
+            timeouts.Load(path)
+            assert timeouts.GetRTT(self.ip) is None
+
+        # only the positive estimates are kept
+        with open(path, "w") as file:
+            json.dump({self.ip: 12.5, "a": -1, "b": "fast"}, file)
+        timeouts.Load(path)
+        assert timeouts.GetRTT(self.ip) == 12.5
+        assert timeouts.GetRTT("a") is None
+        assert timeouts.GetRTT("b") is None
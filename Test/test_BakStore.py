@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Test the class BakStore.
+
+Description
+-----------
+Sequence of tests for BakStore : ``.bak`` files stored section by section
+in a temporary directory, rebuilt and restored.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- zlib standard library (https://docs.python.org/3/library/zlib.html)
+    - Corrupt a stored section.
+- pytest library (https://docs.pytest.org)
+    - Temporary directories.
+- BakStore library (:file:../Src/BakStore.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import zlib
+import pytest
+import BakStore
+
+
+class Test_BakStore:
+    """Class testing the store of the ``.bak`` files.
+
+    :attr configuration:
+        section shared by every ``.bak`` of the tests
+    :type configuration:
+        bytes
+    """
+    configuration = b"[Configuration]\nEO=false\nVF=VF 3\\r\n\n"
+
+    @pytest.fixture(autouse=True)
+    def folders(self, tmp_path):
+        self.bakFolder = str(tmp_path / "bak")
+        os.makedirs(self.bakFolder)
+        self.store = BakStore.BakStore(str(tmp_path / "store"))
+
+    def WriteBak(self, bakName, serial):
+        """Write a ``.bak`` in the temporary directory.
+
+        :return:
+            Return the path of the ``.bak``
+        :rtype:
+            str
+        """
+        bakFullName = os.path.join(self.bakFolder, bakName)
+        with open(bakFullName, mode="wb") as file:
+            file.write(b"[SystemInfo]\r\nFirmware=DMC4183s56g\r\n"
+                       b"Serial=" + serial + b"\r\n\n" + self.configuration
+                       + b"[Program]\nProgram=\"#AUTO\\nEN\\n\"")
+        return bakFullName
+
+    def ObjectCount(self):
+        count = 0
+        for folder, subFolders, files in os.walk(self.store.objectsFolder):
+            count = count + len(files)
+        return count
+
+    def test_Split(self):
+        content = b"head\n[A]\na=1\n[B]\nb=[2]\n"
+        sections = BakStore.BakStore.Split(content)
+        assert sections == [b"head\n", b"[A]\na=1\n", b"[B]\nb=[2]\n"]
+        assert b"".join(sections) == content
+
+    def test_Rebuild(self):
+        bakFiles = [self.WriteBak("CB1.bak", b"15953.0000"),
+                    self.WriteBak("CB2.bak", b"15954.0000")]
+        snapshot = self.store.AddSnapshot("ISAC", bakFiles)
+        assert self.store.GetSnapshots("ISAC") == [snapshot]
+
+        for bakFullName in bakFiles:
+            with open(bakFullName, mode="rb") as file:
+                content = file.read()
+            assert self.store.Rebuild("ISAC", snapshot,
+                                      os.path.basename(bakFullName)) == \
+                content
+
+    def test_SharedSections(self):
+        bakFiles = [self.WriteBak("CB1.bak", b"15953.0000"),
+                    self.WriteBak("CB2.bak", b"15954.0000")]
+        self.store.AddSnapshot("ISAC", bakFiles)
+
+        # 2 SystemInfo, 1 Configuration and 1 Program
+        assert self.ObjectCount() == 4
+        files = self.store.GetSnapshot("ISAC",
+                                       self.store.GetSnapshots("ISAC")[0])
+        assert files["CB1.bak"][1:] == files["CB2.bak"][1:]
+
+        # a second run of the same files stores nothing more
+        self.store.AddSnapshot("ISAC", bakFiles)
+        assert len(self.store.GetSnapshots("ISAC")) == 2
+        assert self.ObjectCount() == 4
+
+    def test_Restore(self):
+        bakFiles = [self.WriteBak("CB1.bak", b"15953.0000"),
+                    self.WriteBak("CB2.bak", b"15954.0000")]
+        snapshot = self.store.AddSnapshot("ISAC", bakFiles)
+
+        restoreFolder = os.path.join(self.bakFolder, "restored")
+        written = self.store.Restore("ISAC", snapshot, restoreFolder)
+        assert sorted(os.path.basename(name) for name in written) == \
+            ["CB1.bak", "CB2.bak"]
+        for bakFullName in bakFiles:
+            restored = os.path.join(restoreFolder,
+                                    os.path.basename(bakFullName))
+            with open(bakFullName, mode="rb") as original, \
+                    open(restored, mode="rb") as copy:
+                assert copy.read() == original.read()
+
+    def test_Corrupted(self):
+        bakFullName = self.WriteBak("CB1.bak", b"15953.0000")
+        snapshot = self.store.AddSnapshot("ISAC", [bakFullName])
+        digest = self.store.GetSnapshot("ISAC", snapshot)["CB1.bak"][1]
+
+        objectName = os.path.join(self.store.objectsFolder, digest[:2],
+                                  digest[2:])
+        with open(objectName, mode="wb") as file:
+            file.write(zlib.compress(self.configuration.replace(b"3", b"4")))
+
+        with pytest.raises(ValueError, match="corrupted"):
+            self.store.Rebuild("ISAC", snapshot, "CB1.bak")
+        with pytest.raises(ValueError):
+            self.store.Restore("ISAC", snapshot,
+                               os.path.join(self.bakFolder, "restored"))
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""Test the class ControlBox with a simulated controller.
+
+Description
+-----------
+Sequence of tests for ControlBox methods. The gclib libraries are replaced
+by GclibStub, answering as a GalilSimulator controller : no ControlBox nor
+gclib installation is needed.
+
+The tests needing a real ControlBox are in ``test_CB.py``.
+
+Libraries/Modules
+-----------------
+- pytest library (https://docs.pytest.org)
+    - Replace the gclib libraries during a test.
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+- GclibStub library (:file:GclibStub.html)
+    - gclib libraries answering with simulated controllers.
+- ControlBox library (:file:../CBPages/ControlBox.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import pytest
+import GalilSimulator as gs
+from GclibStub import GclibStub
+from Packages.Controlbox import gclib
+from Packages.Controlbox import ControlBox
+from Packages.Controlbox import AdaptiveTimeout
+
+
+class Test_CBSimulated:
+    """Class testing a ControlBox connected to a simulated controller.
+
+    :attr validIP:
+        IP of the simulated controller
+    :type validIP:
+        str
+    :attr wrongIP:
+        IP no controller answers on
+    :type wrongIP:
+        str
+    """
+    validIP = "127.0.0.1"
+    wrongIP = "10.0.0.1"
+
+    @pytest.fixture(autouse=True)
+    def simulated(self, monkeypatch):
+        self.sim = gs.GalilSimulator(host=self.validIP, serial="15953",
+                                     parameters={"SP": ["2000", "3000"],
+                                                 "CE": ["4"]},
+                                     variables={"McRevSpe": "1.0000"},
+                                     arrays={"Cmd": [0, 1.5, -2, 3.25,
+                                                     4, 5]},
+                                     microcode="#AUTO\r\nEN\r\n#LOOP\r\n"
+                                               "JP #LOOP\r\n")
+        self.stub = GclibStub({self.validIP: self.sim}).Install(monkeypatch,
+                                                                gclib)
+        # RTT estimates of these tests only
+        monkeypatch.setattr(ControlBox.ControlBox, "timeouts",
+                            AdaptiveTimeout.AdaptiveTimeout())
+        self.CB = ControlBox.ControlBox()
+        yield
+        self.CB.Disconnect()
+
+    def test_connection_nok(self):
+        assert self.CB.Connect(self.wrongIP) is False
+
+    def test_connection_ok(self):
+        assert self.CB.Connect(self.validIP) is True
+
+    def test_IsReachable(self, monkeypatch):
+        host, port = self.sim.Start()
+        try:
+            monkeypatch.setattr(ControlBox.ControlBox, "galilPort", port)
+            assert ControlBox.ControlBox.IsReachable(host) is True
+            assert ControlBox.ControlBox.IsReachable("127.0.0.2") is False
+            assert ControlBox.ControlBox.IsReachable("172.16.3.800") is False
+        finally:
+            self.sim.Stop()
+
+    def test_IsReachable_timeout(self, monkeypatch):
+        timeouts = []
+
+        def Connection(address, timeout):
+            timeouts.append(timeout)
+            raise OSError("refused")
+
+        monkeypatch.setattr(ControlBox.socket, "create_connection",
+                            Connection)
+        ControlBox.ControlBox.IsReachable(self.validIP)
+        assert timeouts == [ControlBox.ControlBox.reachTimeout]
+
+        # a slow ControlBox gets the timeout learned for its commands
+        self.CB.timeouts.Update(self.validIP, 0.200)
+        ControlBox.ControlBox.IsReachable(self.validIP)
+        ControlBox.ControlBox.IsReachable(self.validIP, 0.1)
+        assert timeouts[1:] == [1.6, 0.1]
+
+    def test_Instrumentation(self):
+        assert self.CB.GetInstrumentation() is None
+        self.CB.EnableInstrumentation()
+        self.CB.Connect(self.validIP)
+        self.CB.GetParameter("SPA=?")
+        self.CB.QueryBatch(["SPA=?", "SPB=?"])
+        stats = self.CB.GetInstrumentation()
+        assert stats["GOpen"]["calls"] == 1
+        assert stats["SP"]["calls"] == 1
+        assert stats["batch"]["calls"] == 1
+        assert sum(stats["SP"]["histogram"]) == 1
+        assert stats["SP"]["bytesOut"] == len("SPA=?")
+        assert stats["SP"]["bytesIn"] == len("2000")
+
+        # the measures start over at each connection
+        self.CB.Disconnect()
+        self.CB.Connect(self.validIP)
+        assert list(self.CB.GetInstrumentation()) == ["GOpen"]
+
+        self.CB.EnableInstrumentation(False)
+        assert self.CB.GetInstrumentation() is None
+
+    def test_AdaptiveTimeout(self):
+        self.CB.Connect(self.validIP)
+        assert self.CB.timeouts.GetRTT(self.validIP) is None
+        self.CB.GetParameter("SPA=?")
+        assert self.CB.timeouts.GetRTT(self.validIP) is not None
+        timeout = self.CB.timeouts.GetTimeout(self.validIP)
+        assert self.CB.timeouts.minTimeout <= timeout <= 5000
+        assert self.CB.timeouts.GetTimeout(self.validIP, True) >= timeout
+
+        # the learned timeout is given to gclib before the next command
+        assert self.CB.GetParameter("SPA=?") == "2000"
+        assert self.stub.timeouts[-1] == timeout
+
+    def test_GetDisconnectTime(self):
+        self.CB.Connect(self.validIP)
+        assert self.CB.Disconnect() is True
+        assert self.CB.GetDisconnectTime() < 1
+
+    def test_Ping(self):
+        assert self.CB.Ping() is False
+        self.CB.Connect(self.validIP)
+        assert self.CB.Ping() is True
+        self.CB.Disconnect()
+        assert self.CB.Ping() is False
+
+    def test_GetMicrocode(self):
+        self.CB.Connect(self.validIP)
+        assert self.CB.GetMicrocode() == self.sim.microcode
+
+    def test_GetLabels(self):
+        self.CB.Connect(self.validIP)
+        assert self.CB.GetLabels() == ["#AUTO=0", "#LOOP=2"]
+
+    def test_GetVariable(self):
+        self.CB.Connect(self.validIP)
+        assert self.CB.GetVariable("McRevSpe") == "1.0000"
+        assert self.CB.GetVariable("Cmd[1]") == "1.5000"
+
+    def test_GetArray(self, monkeypatch):
+        self.CB.Connect(self.validIP)
+        values = ["0.0000", "1.5000", "-2.0000", "3.2500", "4.0000",
+                  "5.0000"]
+        assert self.CB.GetArray("Cmd", 6) == values
+        assert self.CB.GetArray("Cmd", 1) == ["0.0000"]
+        assert self.CB.GetArray("Cmd", 0) == []
+
+        # uploaded by chunks of 4 : 2 uploads, the first value of each
+        # checked
+        monkeypatch.setattr(ControlBox.ControlBox, "arrayChunk", 4)
+        lines = len(self.stub.lines)
+        assert self.CB.GetArray("Cmd", 6) == values
+        assert self.stub.lines[lines:] == ["Cmd[0]=?", "Cmd[4]=?"]
+
+    def test_GetArray_chunkCount(self, monkeypatch):
+        self.CB.Connect(self.validIP)
+        monkeypatch.setattr(ControlBox.ControlBox, "arrayChunk", 2)
+        upload = self.stub.GArrayUpload
+
+        # the 2nd chunk gives one value less, the 3rd one fails
+        def WrongUpload(connection, name, first, last, *args):
+            if first == 2:
+                last = last - 1
+            if first == 4:
+                return self.stub.questionMark
+            return upload(connection, name, first, last, *args)
+
+        monkeypatch.setattr(self.stub, "GArrayUpload", WrongUpload)
+        lines = len(self.stub.lines)
+        assert self.CB.GetArray("Cmd", 6) == ["0.0000", "1.5000", "-2.0000",
+                                              "3.2500", "4.0000", "5.0000"]
+        assert self.stub.lines[lines:] == ["Cmd[0]=?", "Cmd[2]=?",
+                                           "Cmd[3]=?", "Cmd[4]=?",
+                                           "Cmd[5]=?"]
+
+    @pytest.mark.parametrize("uploaded", ["0.0000,1.00005,2.50005,3.0000",
+                                          "0.00000,1.00005,2.50005,3.00000"])
+    def test_GetArray_ties(self, monkeypatch, uploaded):
+        # the controller rounds the ties up, the upload gives more decimals
+        self.sim.arrays["Tie"] = ["0.0000", "1.0001", "2.5001", "3.0000"]
+        self.CB.Connect(self.validIP)
+        upload = self.stub.GArrayUpload
+
+        def TieUpload(connection, name, first, last, delimiter, buf, size):
+            error = upload(connection, name, first, last, delimiter, buf,
+                           size)
+            if getattr(name, "value", name) == b"Tie":
+                buf.value = uploaded.encode("ascii")
+            return error
+
+        monkeypatch.setattr(self.stub, "GArrayUpload", TieUpload)
+        assert self.CB.GetArray("Tie", 4) == ["0.0000", "1.0001", "2.5001",
+                                              "3.0000"]
+
+    def test_GetParameter(self):
+        self.CB.Connect(self.validIP)
+        assert self.CB.GetParameter("IA?") == "127, 0, 0, 1"
+        assert self.CB.GetParameter("SPB=?") == "3000"
+
+    def test_QueryBatch(self):
+        self.CB.Connect(self.validIP)
+        commands = ["IA?", "CEA=?", "MG_TPA"] * 10
+        answers = []
+        for command in commands:
+            answers.append(self.CB.GetParameter(command))
+        lines = len(self.stub.lines)
+        assert self.CB.QueryBatch(commands) == answers
+        assert len(self.stub.lines) - lines < len(commands)
+
+    def test_setParameter(self):
+        self.CB.Connect(self.validIP)
+        self.CB.SetParameter("CEA=6")
+        assert self.CB.GetParameter("CEA=?") == "6"
+
+    def test_GetSystemInfo(self):
+        self.CB.Connect(self.validIP)
+        info = self.CB.GetSystemInfo()
+        assert info["firmware"] == "DMC4183s56g"
+        assert info["serial"] == "15953.0000"
+        assert info["device"] == "DMC41x3"
+        assert info["axis"] == "8"
+        assert self.CB.GetSystemInfo() is info
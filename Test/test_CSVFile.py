@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Test the class CSV.
+
+Description
+-----------
+Sequence of tests for the extraction of the columns of a ``.csv`` file
+(``GetColumnDatas``), written in a temporary directory.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- pytest library (https://docs.pytest.org)
+    - Temporary directories.
+- CSVFile library (:file:../FilePages/CSVFile.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import pytest
+from Packages.File import CSVFile
+
+
+class Test_CSVFile:
+    """Class testing the columns of a ``.csv`` file."""
+
+    @pytest.fixture(autouse=True)
+    def folder(self, tmp_path):
+        self.folder = str(tmp_path)
+
+    def CSV(self, content, fileName="list.csv"):
+        """Write a ``.csv`` and give its object.
+
+        :return:
+            Return the object of the file
+        :rtype:
+            CSVFile.CSV
+        """
+        fullName = os.path.join(self.folder, fileName)
+        with open(fullName, mode="w", encoding="utf-8", newline="") as file:
+            file.write(content)
+        return CSVFile.CSV(fullName)
+
+    def test_GetColumnDatas(self):
+        csvFile = self.CSV("IP;Name;Network\r\n"
+                           "172.16.3.65;CB1;ISAC\r\n"
+                           "172.16.3.68;CB2;RCM\r\n")
+        assert csvFile.GetColumnDatas() == {
+            "IP": ["172.16.3.65", "172.16.3.68"],
+            "Name": ["CB1", "CB2"],
+            "Network": ["ISAC", "RCM"]}
+
+        assert csvFile.GetColumnDatas(["Network", "IP"]) == {
+            "IP": ["172.16.3.65", "172.16.3.68"],
+            "Network": ["ISAC", "RCM"]}
+
+    def test_NoTrailingLineFeed(self):
+        csvFile = self.CSV("IP;Name\n172.16.3.65;CB1\n172.16.3.68;CB2")
+        assert csvFile.GetColumnDatas() == {
+            "IP": ["172.16.3.65", "172.16.3.68"],
+            "Name": ["CB1", "CB2"]}
+
+    def test_QuotedSeparator(self):
+        csvFile = self.CSV('parameter;get\n'
+                           'SI;"SI ?,?;MG_SI"\n'
+                           'SP;SP ?\n')
+        assert csvFile.GetColumnDatas() == {
+            "parameter": ["SI", "SP"],
+            "get": ["SI ?,?;MG_SI", "SP ?"]}
+
+    def test_RaggedRows(self):
+        csvFile = self.CSV("IP;Name;Network\n"
+                           "172.16.3.65;CB1\n"
+                           "172.16.3.68\n"
+                           "172.16.3.69;CB3;ISAC\n")
+        assert csvFile.GetColumnDatas() == {
+            "IP": ["172.16.3.65", "172.16.3.68", "172.16.3.69"],
+            "Name": ["CB1", "", "CB3"],
+            "Network": ["", "", "ISAC"]}
+
+    def test_Empty(self):
+        assert self.CSV("").GetColumnDatas() == {}
+        assert self.CSV("IP;Name\n").GetColumnDatas() == {"IP": [],
+                                                            "Name": []}
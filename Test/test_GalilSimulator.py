@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Test the class GalilSimulator.
+
+Description
+-----------
+Sequence of tests for GalilSimulator. The simulated controllers are
+requested through raw TCP sockets, as gclib does.
+
+Libraries/Modules
+-----------------
+- time standard library (https://docs.python.org/2/library/time.html)
+    - Measure the latency of a controller.
+- socket standard library (https://docs.python.org/3/library/socket.html)
+    - Access to TCP connections.
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import time
+import socket
+import GalilSimulator as gs
+
+
+class Test_GalilSimulator:
+    """Class testing one simulated controller.
+
+    :attr sim:
+        simulated controller, 4 axis, started once for all the tests
+    :type sim:
+        GalilSimulator.GalilSimulator
+    """
+    sim = gs.GalilSimulator(axis=4, serial="15953",
+                            parameters={"SP": ["2000", "3000"], "VF": "10.4"},
+                            variables={"McRevSpe": "1.0000"},
+                            arrays={"tab": [1, 2.5, -3]},
+                            microcode="#AUTO\r\nEN\r\n#LOOP\r\nJP #LOOP\r\n")
+
+    def setup_class(self):
+        self.address = self.sim.Start()
+
+    def teardown_class(self):
+        self.sim.Stop()
+
+    def test_SystemInfo(self):
+        assert gs.SendCommand(self.address, "\x12\x16") == "DMC4183s56g\r\n:"
+        assert gs.SendCommand(self.address, "MG _BN") == " 15953.0000\r\n:"
+        assert gs.SendCommand(self.address, "IA ?") == "127, 0, 0, 1\r\n:"
+
+    def test_Parameter(self):
+        assert gs.SendCommand(self.address, "SPA=?") == "2000\r\n:"
+        assert gs.SendCommand(self.address, "SPC=?") == "0\r\n:"
+        assert gs.SendCommand(self.address, "VF?") == "10.4\r\n:"
+        assert gs.SendCommand(self.address, "ACS=?") == "0\r\n:"
+
+    def test_AllAxes(self):
+        answer = gs.SendCommand(self.address, "SP ?,?,?,?")
+        assert answer == "2000, 3000, 0, 0\r\n:"
+
+    def test_AbsentAxis(self):
+        assert gs.SendCommand(self.address, "SPE=?") == "?"
+        assert gs.SendCommand(self.address, "SP ?,?,?,?,?") == "?"
+        assert gs.SendCommand(self.address, "TC1") == "6 Number out of range\r\n:"
+
+    def test_Batch(self):
+        answer = gs.SendCommand(self.address, "SPA=?;SPB=?;MG_TPA")
+        assert answer == "2000\r\n3000\r\n 0.0000\r\n:"
+
+    def test_Assign(self):
+        assert gs.SendCommand(self.address, "SPD=500;SPD=?") == "500\r\n:"
+
+    def test_Variables(self):
+        assert gs.SendCommand(self.address, "LV") == "McRevSpe= 1.0000\r\n:"
+        assert gs.SendCommand(self.address, "McRevSpe=?") == "1.0000\r\n:"
+        assert gs.SendCommand(self.address, "plop=?") == "?"
+
+    def test_Arrays(self):
+        assert gs.SendCommand(self.address, "LA") == "tab[3]\r\n:"
+        assert gs.SendCommand(self.address, "tab[1]=?") == "2.5000\r\n:"
+        answer = gs.SendCommand(self.address, "QU tab[],0,2,1")
+        assert answer == "1.0000,2.5000,-3.0000\r\n:"
+
+    def test_Microcode(self):
+        assert gs.SendCommand(self.address, "LL") == "#AUTO=0\r\n#LOOP=2\r\n:"
+        answer = gs.SendCommand(self.address, "UL")
+        assert answer == "#AUTO\r\nEN\r\n#LOOP\r\nJP #LOOP\r\n\x1a\r\n:"
+
+    def test_Disconnect(self):
+        with socket.create_connection(self.address, 1) as connection:
+            connection.sendall(b"IHS =>-3\r")
+            assert connection.recv(16) == b""
+
+
+class Test_GalilFleet:
+    """Class testing many simulated controllers."""
+
+    def test_Fleet(self):
+        with gs.GalilFleet(200, axis=2) as fleet:
+            addresses = [(sim.host, sim.port) for sim in fleet.simulators]
+            assert len(set(addresses)) == 200
+
+            for address in addresses:
+                assert gs.SendCommand(address, "SPB=?") == "0\r\n:"
+            assert fleet.Stats()["commands"] == 200
+            assert fleet.Stats()["lines"] == 200
+
+    def test_Latency(self):
+        sim = gs.GalilSimulator(latency=0.05)
+        address = sim.Start()
+        start = time.perf_counter()
+        assert gs.SendCommand(address, "SPA=?") == "0\r\n:"
+        assert time.perf_counter() - start >= 0.05
+        sim.Stop()
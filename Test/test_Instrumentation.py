@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Test the class Instrumentation.
+
+Description
+-----------
+Sequence of tests for Instrumentation : families of the transactions,
+statistics, latency histograms and reset.
+
+Libraries/Modules
+-----------------
+- Instrumentation library (:file:../CBPages/Instrumentation.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+from Packages.Controlbox.Instrumentation import Instrumentation
+
+
+class Test_Instrumentation:
+    """Class testing the measures of the transactions."""
+
+    def test_Family(self):
+        assert Instrumentation.Family("GCommand", ("SPA=?",)) == "SP"
+        assert Instrumentation.Family("GCommand", ("SP ?,?,?",)) == "SP"
+        assert Instrumentation.Family("GCommand", ("IA ?",)) == "IA"
+        assert Instrumentation.Family("GCommand", ("MG_TPA",)) == "MG"
+        assert Instrumentation.Family("GCommand", ("SPA=?;SPB=?",)) == \
+            "batch"
+        assert Instrumentation.Family("GCommand", ("Cmd[0]=?",)) == "array"
+        assert Instrumentation.Family("GCommand", ("McRevSpe=?",)) == \
+            "variable"
+        assert Instrumentation.Family("GCommandRaw", ("SPA=?",)) == "SP"
+        assert Instrumentation.Family("GCommandRaw", (b"SPA=?;IA?",)) == \
+            "batch"
+        assert Instrumentation.Family("GInfo", ()) == "GInfo"
+        assert Instrumentation.Family("GArrayUploadText",
+                                      ("Cmd", 0, 9)) == "GArrayUploadText"
+
+    def test_Size(self):
+        assert Instrumentation.Size("2000") == 4
+        assert Instrumentation.Size(["1.0000", "2.5000"]) == 14
+        assert Instrumentation.Size(b"2000") == 4
+        assert Instrumentation.Size(memoryview(b"2000")) == 4
+        assert Instrumentation.Size(None) == 0
+
+    def test_Record(self):
+        instrumentation = Instrumentation()
+        instrumentation.Record("SP", 0.0015, 5, 4)
+        instrumentation.Record("SP", 0.0030, 5, 4)
+        instrumentation.Record("SP", 6.0, 5, 0, True)
+
+        stats = instrumentation.GetStats()["SP"]
+        assert stats["calls"] == 3
+        assert stats["errors"] == 1
+        assert stats["bytesOut"] == 15
+        assert stats["bytesIn"] == 8
+        assert stats["maxTime"] == 6.0
+        assert abs(stats["meanTime"] - 6.0045 / 3) < 1e-9
+
+    def test_Histogram(self):
+        instrumentation = Instrumentation()
+        for duration in (0.0005, 0.001, 0.0015, 0.003, 0.75, 6.0):
+            instrumentation.Record("SP", duration)
+
+        histogram = instrumentation.GetStats()["SP"]["histogram"]
+        assert len(histogram) == len(Instrumentation.bounds) + 1
+        assert histogram[0] == 2  # up to 1 ms
+        assert histogram[1] == 1  # up to 2 ms
+        assert histogram[2] == 1  # up to 5 ms
+        assert histogram[Instrumentation.bounds.index(1000)] == 1
+        assert histogram[-1] == 1  # longer than 5 s
+
+    def test_GetStats(self):
+        instrumentation = Instrumentation()
+        instrumentation.Record("SP", 0.001)
+        stats = instrumentation.GetStats()
+        stats["SP"]["histogram"][0] = 100
+        assert instrumentation.GetStats()["SP"]["histogram"][0] == 1
+
+    def test_Reset(self):
+        instrumentation = Instrumentation()
+        instrumentation.Record("SP", 0.001)
+        instrumentation.Reset()
+        assert instrumentation.GetStats() == {}
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Test the class OSMOS.
+
+Description
+-----------
+Sequence of tests for the sweep of ``OSMOSSeq`` : the ControlBoxes of a
+network are simulated controllers (the gclib libraries are replaced by
+GclibStub), the ``.bak`` and ``.log`` are written in a temporary directory.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- pytest library (https://docs.pytest.org)
+    - Replace the gclib libraries during a test.
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+- GclibStub library (:file:GclibStub.html)
+    - gclib libraries answering with simulated controllers.
+- OSMOS library (:file:../Src/OSMOS.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import pytest
+import GalilSimulator as gs
+import OSMOS
+import OSMOSExtract
+from GclibStub import GclibStub
+from Packages.Controlbox import gclib
+from Packages.Controlbox import ControlBox
+from Packages.Controlbox import AdaptiveTimeout
+
+
+class Test_OSMOS:
+    """Class testing the sweep of a network of simulated controllers.
+
+    :attr ips:
+        IPs of the simulated controllers, all on the network ``ISAC``
+    :type ips:
+        list
+    """
+    ips = ["127.0.0.2", "127.0.0.3", "127.0.0.4"]
+
+    @pytest.fixture(autouse=True)
+    def simulated(self, monkeypatch, tmp_path):
+        sims = {}
+        for number, ip in enumerate(self.ips):
+            sims[ip] = gs.GalilSimulator(host=ip, serial=str(15954 + number),
+                                         variables={"McRevSpe": "1.0000"},
+                                         arrays={"Cmd": [0, 1.5]},
+                                         microcode="#AUTO\r\nEN\r\n")
+        self.stub = GclibStub(sims).Install(monkeypatch, gclib)
+        monkeypatch.setattr(ControlBox.ControlBox, "timeouts",
+                            AdaptiveTimeout.AdaptiveTimeout())
+        monkeypatch.setattr(OSMOSExtract.OSMOSExtract, "retryDelay", 0)
+
+        # every simulated controller answers the preflight
+        self.reachable = list(self.ips)
+        monkeypatch.setattr(ControlBox.ControlBox, "IsReachable",
+                            lambda ip, timeout=None: ip in self.reachable)
+
+        cbFile = tmp_path / "OSM_LIST_CB.csv"
+        cbFile.write_text("network;Adresse-IP;Racine-nom-CVS\n"
+                          + "".join(f"ISAC;{ip};CB{number}\n"
+                                    for number, ip in enumerate(self.ips)))
+        cdeFile = tmp_path / "OSM_LIST_CDE.csv"
+        cdeFile.write_text("parameter;Firmware;type-getparam;type-setparam;"
+                           "type-wrtbak;get;set;write\n"
+                           "SP;DMC4183s56g;AllAxes;Standard;Standard;"
+                           "SP ?,?,?,?,?,?,?,?;SPx= v;SP='SPA=v\\r'\n")
+
+        self.folder = str(tmp_path)
+        for folder in ("bak", "log"):
+            os.makedirs(os.path.join(self.folder, folder))
+        self.osmos = OSMOS.OSMOS(str(cbFile), str(cdeFile),
+                                 os.path.join(self.folder, "bak", ""),
+                                 os.path.join(self.folder, "log", ""),
+                                 os.path.join(self.folder, "rtt.json"),
+                                 os.path.join(self.folder, "plans.json"))
+
+    def Log(self):
+        """Give the content of the ``.log`` of the last sweep."""
+        logFile = self.osmos.logFile
+        with open(os.path.join(logFile.GetFilePath(),
+                               logFile.GetFileName())) as file:
+            return file.read()
+
+    def test_OSMOSSeq(self):
+        self.osmos.OSMOSSeq("ISAC")
+        assert self.osmos.failedCB == []
+        assert sorted(self.osmos.bakFiles) == self.ips
+        for bakFullName in self.osmos.bakFiles.values():
+            assert os.path.isfile(bakFullName)
+
+    def test_OSMOSSeq_error(self, monkeypatch):
+        extract = OSMOSExtract.OSMOSExtract.Extract
+
+        # the .bak of the 2nd ControlBox can't be written
+        def Extract(extractor, ip, *args):
+            if ip == self.ips[1]:
+                raise OSError("disk full")
+            return extract(extractor, ip, *args)
+
+        monkeypatch.setattr(OSMOSExtract.OSMOSExtract, "Extract", Extract)
+        self.osmos.OSMOSSeq("ISAC")
+        assert self.osmos.failedCB == [self.ips[1]]
+        assert sorted(self.osmos.bakFiles) == [self.ips[0], self.ips[2]]
+        assert f"{self.ips[1]} extraction stopped" in self.Log()
+        assert "error : disk full" in self.Log()
+
+    def test_OSMOSSeq_workers(self, monkeypatch):
+        extract = OSMOSExtract.OSMOSExtract.Extract
+
+        def Extract(extractor, ip, *args):
+            if ip == self.ips[1]:
+                raise OSError("disk full")
+            return extract(extractor, ip, *args)
+
+        monkeypatch.setattr(OSMOSExtract.OSMOSExtract, "Extract", Extract)
+        self.osmos.UpdateWorkers(3)
+        self.osmos.OSMOSSeq("ISAC")
+        assert self.osmos.failedCB == [self.ips[1]]
+        assert sorted(self.osmos.bakFiles) == [self.ips[0], self.ips[2]]
+
+        # each ControlBox its own .bak, whatever the worker
+        for number, ip in enumerate([self.ips[0], self.ips[2]]):
+            with open(self.osmos.bakFiles[ip]) as file:
+                assert f"Serial={15954 + 2 * number}.0000" in file.read()
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_Preflight_unreachable(self, monkeypatch, workers):
+        connect = ControlBox.ControlBox.Connect
+        connected = []
+
+        def Connect(CB, ip):
+            connected.append(ip)
+            return connect(CB, ip)
+
+        monkeypatch.setattr(ControlBox.ControlBox, "Connect", Connect)
+        self.reachable.remove(self.ips[1])
+        self.osmos.UpdateWorkers(workers)
+        self.osmos.OSMOSSeq("ISAC")
+
+        # never connected, not even by the retry pass
+        assert sorted(connected) == [self.ips[0], self.ips[2]]
+        assert self.osmos.failedCB == [self.ips[1]]
+        assert f"couldn't connect to {self.ips[1]}" in self.Log()
+
+    def test_Preflight_back(self, monkeypatch):
+        # answers again when the retry pass checks it
+        probe = ControlBox.ControlBox.IsReachable
+        probes = []
+
+        def IsReachable(ip, timeout=None):
+            probes.append(ip)
+            return probes.count(ip) > 1 or probe(ip)
+
+        monkeypatch.setattr(ControlBox.ControlBox, "IsReachable",
+                            IsReachable)
+        self.reachable.remove(self.ips[1])
+        self.osmos.OSMOSSeq("ISAC")
+        assert probes.count(self.ips[1]) == 2
+        assert self.osmos.failedCB == []
+        assert sorted(self.osmos.bakFiles) == self.ips
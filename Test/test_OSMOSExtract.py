@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""Test the class OSMOSExtract.
+
+Description
+-----------
+Sequence of tests for OSMOSExtract. The ControlBox is a simulated
+controller : the gclib libraries are replaced by GclibStub.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- pytest library (https://docs.pytest.org)
+    - Replace the gclib libraries during a test.
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+- GclibStub library (:file:GclibStub.html)
+    - gclib libraries answering with simulated controllers.
+- OSMOSExtract library (:file:../Src/OSMOSExtract.html)
+    - Class tested.
+- OSMOSFiles library (:file:../Src/OSMOSFiles.html)
+    - Cde file of the extractions.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import pytest
+import GalilSimulator as gs
+import OSMOSExtract
+import OSMOSFiles
+from GclibStub import GclibStub
+from Packages.Controlbox import gclib
+from Packages.Controlbox import ControlBox
+from Packages.Controlbox import AdaptiveTimeout
+
+
+class Test_OSMOSExtract:
+    """Class testing the extraction of a simulated controller.
+
+    :attr ip:
+        IP of the simulated controller
+    :type ip:
+        str
+    :attr reference:
+        ``.bak`` of the 4 axis controller of ``Reference``
+    :type reference:
+        str
+    """
+    ip = "127.0.0.1"
+
+    reference = os.path.join(os.path.dirname(__file__), "altern_Bak_Path",
+                             "OSMOS_Extract_reference.bak")
+
+    @pytest.fixture(autouse=True)
+    def simulated(self, monkeypatch):
+        self.sim = gs.GalilSimulator(host=self.ip, serial="15953",
+                                     microcode="#AUTO\r\nEN\r\n#LOOP\r\n"
+                                               "JP #LOOP\r\n")
+        self.stub = GclibStub({self.ip: self.sim}).Install(monkeypatch,
+                                                           gclib)
+        monkeypatch.setattr(ControlBox.ControlBox, "timeouts",
+                            AdaptiveTimeout.AdaptiveTimeout())
+        monkeypatch.setattr(OSMOSExtract.OSMOSExtract, "retryDelay", 0)
+        self.extractor = OSMOSExtract.OSMOSExtract(None)
+        self.extractor.CB.Connect(self.ip)
+        self.calls = 0
+        yield
+        self.extractor.CB.Disconnect()
+
+    def RunPhase(self, phase):
+        return self.extractor._OSMOSExtract__RunPhase(self.ip, phase)
+
+    def test_RunPhase_linkError(self):
+        def Phase():
+            self.calls = self.calls + 1
+            if self.calls < 3:
+                raise gclib.GclibError("device timed out")
+            return "[Variables]"
+
+        assert self.RunPhase(Phase) == "[Variables]"
+        assert self.calls == 3
+        assert self.extractor.failures == 2
+        assert len(self.extractor.logLines) == 2
+
+    def test_RunPhase_lastAttempt(self):
+        def Phase():
+            self.calls = self.calls + 1
+            raise gclib.GclibError("read error")
+
+        with pytest.raises(gclib.GclibError):
+            self.RunPhase(Phase)
+        assert self.calls == OSMOSExtract.OSMOSExtract.phaseAttempts
+
+    @pytest.mark.parametrize("error", [
+        ValueError("unknown parameter"),
+        gclib.GclibError("question mark returned by controller")])
+    def test_RunPhase_otherError(self, error):
+        def Phase():
+            self.calls = self.calls + 1
+            raise error
+
+        with pytest.raises(type(error)):
+            self.RunPhase(Phase)
+        assert self.calls == 1
+        assert self.extractor.failures == 1
+        assert self.extractor.logLines == []
+
+    def StoredProgram(self, microcode):
+        """Give the microcode reused when the ``.bak`` holds another."""
+        program = microcode.replace("\r\n", "\\n")
+        self.extractor._OSMOSExtract__serial = "15953.0000"
+        self.extractor._OSMOSExtract__previousBak = (
+            "[SystemInfo]\nSerial=15953.0000\n\n"
+            f"[Program]\nProgram=\"{program}\"\n")
+        return self.extractor._OSMOSExtract__StoredProgram()
+
+    def test_StoredProgram(self):
+        microcode = self.sim.microcode
+        assert self.StoredProgram(microcode) == \
+            'Program="#AUTO\\nEN\\n#LOOP\\nJP #LOOP\\n"'
+
+        # another ControlBox
+        self.extractor._OSMOSExtract__serial = "15954.0000"
+        assert self.extractor._OSMOSExtract__StoredProgram() is None
+
+        # label moved
+        self.sim.microcode = "#AUTO\r\nEN\r\nEN\r\n#LOOP\r\nJP #LOOP\r\n"
+        assert self.StoredProgram(microcode) is None
+
+    def test_StoredProgram_size(self):
+        microcode = self.sim.microcode
+
+        # last line edited in place
+        self.sim.microcode = "#AUTO\r\nEN\r\n#LOOP\r\nJP #AUTO\r\n"
+        assert self.StoredProgram(microcode) is None
+
+        # line added at the end
+        self.sim.microcode = microcode + "EN\r\n"
+        assert self.StoredProgram(microcode) is None
+        assert self.stub.lines[-1] == "LS 3,4"
+
+    def Files(self, folder, cdeLine="SP;DMC4183s56g;AllAxes;Standard;"
+                                     "Standard;SP ?,?,?,?,?,?,?,?;SPx= v;"
+                                     "SP='SPA=v\\r'"):
+        """Give the OSMOSFiles of a Cde file with one parameter."""
+        cdeFile = folder / "OSM_LIST_CDE.csv"
+        cdeFile.write_text("parameter;Firmware;type-getparam;type-setparam;"
+                           "type-wrtbak;get;set;write\n" + cdeLine + "\n")
+        cbFile = folder / "OSM_LIST_CB.csv"
+        cbFile.write_text("network;Adresse-IP;Racine-nom-CVS\n")
+        return OSMOSFiles.OSMOSFiles(str(cbFile), str(cdeFile))
+
+    def test_Plan_shared(self, monkeypatch, tmp_path):
+        ips = ["127.0.0.2", "127.0.0.3"]
+        sims = {ip: gs.GalilSimulator(host=ip, serial=serial,
+                                      variables={"McRevSpe": "1.0000"},
+                                      arrays={"Cmd": [0, 1.5]},
+                                      microcode="#AUTO\r\nEN\r\n")
+                for ip, serial in zip(ips, ["15954", "15955"])}
+        self.stub = GclibStub(sims).Install(monkeypatch, gclib)
+
+        osmosf = self.Files(tmp_path)
+
+        # the Cde file is looked up for the first plan only
+        lookups = []
+        for name in ("CdeFileReadWriteType", "writeFormattedParam"):
+            lookup = getattr(osmosf, name)
+            monkeypatch.setattr(osmosf, name,
+                                lambda *args, lookup=lookup:
+                                lookups.append(args) or lookup(*args))
+
+        # one plan for both ControlBoxes, each with its own OSMOSExtract
+        plans = []
+        for ip in ips:
+            extractor = OSMOSExtract.OSMOSExtract(osmosf)
+            assert extractor.Extract(ip, str(tmp_path / f"{ip}.txt"),
+                                     ["SP"]) is True
+            plans.append(osmosf.GetPlans()["DMC4183s56g:ABCDEFGH"])
+        assert list(osmosf.GetPlans()) == ["DMC4183s56g:ABCDEFGH"]
+        assert plans[1] is plans[0]
+        assert plans[0]["commands"] == ["VF?", "PF?", "SP ?,?,?,?,?,?,?,?"]
+        assert self.stub.lines.count("VF?;PF?;SP ?,?,?,?,?,?,?,?") == 2
+        assert lookups == [("SP",), ("SP",), ("SP",)]
+
+        # a Cde file read again empties the plans
+        osmosf.UpdateCdeFile(str(tmp_path / "OSM_LIST_CDE.csv"))
+        assert osmosf.GetPlans() == {}
+
+    @pytest.mark.parametrize("cdeLine, error", [
+        ("SP;DMC4183s56g;Bogus;Standard;Standard;SPx=?;SPx= v;SP='SPA=v\\r'",
+         "SP : unknown type-getparam 'Bogus' in the Cde file"),
+        ("SP;DMC4183s56g;Standard;Standard;Bogus;SPx=?;SPx= v;SP='SPA=v\\r'",
+         "SP : unknown type-wrtbak 'Bogus' in the Cde file")])
+    def test_UnknownType(self, tmp_path, cdeLine, error):
+        extractor = OSMOSExtract.OSMOSExtract(self.Files(tmp_path, cdeLine))
+        assert extractor.Extract(self.ip, str(tmp_path / "CB.txt"),
+                                 ["SP"]) is False
+        assert "Getting configuration Failed" in extractor.logLines
+        assert f"error : {error}" in extractor.logLines
+
+    def Reference(self, monkeypatch, folder):
+        """Give an extractor of a 4 axis controller, with the Cde file of
+        OSMOS made for its firmware.
+
+        :return:
+            Return the extractor, its parameters and the path of its
+            ``.bak`` (with a ``.txt`` extension)
+        :rtype:
+            tuple
+        """
+        ip = "127.0.0.2"
+        self.sim = gs.GalilSimulator(
+            host=ip, firmware="DMC4143s56g", serial="15954", axis=4,
+            parameters={"MT": ["1", "-1", "2", "1"],
+                        "SP": ["2000", "3000", "0", "4000"],
+                        "CE": ["2", "0", "4", "0"],
+                        "SI": ["1, 2, 3, 4, 5, 6", "2, 2, 3, 4, 5, 6",
+                               "3, 2, 3, 4, 5, 6", "4, 2, 3, 4, 5, 6"],
+                        "VAS": "256", "VAT": "512"},
+            variables={"McRevSpe": "1.0000", "Gain": "2.5000"},
+            arrays={"Cmd": [0, 1.5, -2]},
+            microcode="#AUTO\r\nMG \"hi\"\r\nEN\r\n")
+        self.stub = GclibStub({ip: self.sim}).Install(monkeypatch, gclib)
+
+        cdeFile = os.path.join(os.path.dirname(__file__), "..",
+                               "Documentation", "Reference",
+                               "OSM_LIST_CDE.csv")
+        with open(cdeFile, encoding="utf-8") as file:
+            cde = file.read().replace("DMC4183s56g", "DMC4143s56g")
+        osmosf = self.Files(folder, cde.split("\n", 1)[1].rstrip("\n"))
+        extractor = OSMOSExtract.OSMOSExtract(osmosf)
+        extractor.EnableIncrementalBak()
+        return (extractor, ip, osmosf.CdeFileParamList(),
+                str(folder / "CB.txt"))
+
+    @staticmethod
+    def Read(fullName):
+        """Give the content of a ``.bak``."""
+        with open(fullName, encoding="utf-8") as file:
+            return file.read()
+
+    def test_Extract_reference(self, monkeypatch, tmp_path):
+        extractor, ip, parameters, bakFullName = self.Reference(monkeypatch,
+                                                                tmp_path)
+        assert extractor.Extract(ip, bakFullName, parameters) is True
+        assert extractor.bakStatus == "changed"
+        assert self.Read(str(tmp_path / "CB.bak")) == self.Read(
+            self.reference)
+
+        # every parameter in one batch, the AllAxes ones on the 4 axis
+        batch = [line for line in self.stub.lines
+                 if line.startswith("VF?;PF?;")]
+        assert len(batch) == 1
+        assert batch[0].startswith("VF?;PF?;MT ?,?,?,?;GA ?,?,?,?;MG_BAA;")
+        assert "SPA=?" not in self.stub.lines
+
+    def test_Extract_unchanged(self, monkeypatch, tmp_path):
+        extractor, ip, parameters, bakFullName = self.Reference(monkeypatch,
+                                                                tmp_path)
+        bakName = str(tmp_path / "CB.bak")
+        assert extractor.Extract(ip, bakFullName, parameters) is True
+        os.utime(bakName, ns=(10**18, 10**18))
+
+        assert extractor.Extract(ip, bakFullName, parameters) is True
+        assert extractor.bakStatus == "unchanged"
+        assert ".bak unchanged" in extractor.logLines
+        assert os.stat(bakName).st_mtime_ns == 10**18
+        assert self.Read(bakName) == self.Read(self.reference)
+
+    def test_Extract_changed(self, monkeypatch, tmp_path):
+        extractor, ip, parameters, bakFullName = self.Reference(monkeypatch,
+                                                                tmp_path)
+        bakName = str(tmp_path / "CB.bak")
+        assert extractor.Extract(ip, bakFullName, parameters) is True
+
+        # written aside, then put in place of the .bak at once
+        replaced = []
+        replace = OSMOSExtract.os.replace
+        monkeypatch.setattr(OSMOSExtract.os, "replace",
+                            lambda source, target: replaced.append(
+                                (source, target)) or replace(source, target))
+        self.sim.parameters["SP"] = ["2500", "3000", "0", "4000"]
+        assert extractor.Extract(ip, bakFullName, parameters) is True
+        assert extractor.bakStatus == "changed"
+        assert replaced == [(bakName + ".tmp", bakName)]
+        assert not os.path.exists(bakName + ".tmp")
+        assert self.Read(bakName) == self.Read(self.reference).replace(
+            "SPA=2000", "SPA=2500")
+
+    def test_Extract_failed(self, monkeypatch, tmp_path):
+        extractor, ip, parameters, bakFullName = self.Reference(monkeypatch,
+                                                                tmp_path)
+        bakName = str(tmp_path / "CB.bak")
+        assert extractor.Extract(ip, bakFullName, parameters) is True
+        os.utime(bakName, ns=(10**18, 10**18))
+
+        # the parameters changed, but the variables can't be read
+        def GetAllVariables(CB):
+            raise gclib.GclibError("question mark returned by controller")
+
+        monkeypatch.setattr(ControlBox.ControlBox, "GetAllVariables",
+                            GetAllVariables)
+        self.sim.parameters["SP"] = ["2500", "3000", "0", "4000"]
+        assert extractor.Extract(ip, bakFullName, parameters) is False
+        assert extractor.bakStatus is None
+        assert os.stat(bakName).st_mtime_ns == 10**18
+        assert self.Read(bakName) == self.Read(self.reference)
+        assert not os.path.exists(bakName + ".tmp")
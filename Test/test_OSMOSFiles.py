@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""Test the class OSMOSFiles.
+
+Description
+-----------
+Sequence of tests for OSMOSFiles : CB and Cde ``.csv`` files written in a
+temporary directory, and the cache of their columns.
+
+Libraries/Modules
+-----------------
+- os standard library (https://docs.python.org/3/library/os.html)
+    - Access to files function.
+- json standard library (https://docs.python.org/3/library/json.html)
+    - Read the cache files.
+- pytest library (https://docs.pytest.org)
+    - Temporary directories.
+- OSMOSFiles library (:file:../Src/OSMOSFiles.html)
+    - Class tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import os
+import json
+import pytest
+import OSMOSFiles
+
+
+class Test_OSMOSFiles:
+    """Class testing the CB and Cde files and their cache.
+
+    :attr CBContent:
+        CB file of the tests
+    :type CBContent:
+        str
+    :attr CdeContent:
+        Cde file of the tests
+    :type CdeContent:
+        str
+    """
+    CBContent = ("network;Device;Adresse-IP;Racine-nom-CVS\n"
+                 "RCM;ANS-C01/DG/CB.1;172.17.27.3;ANS-C01_MOS1\n"
+                 "RCM;ANS-C01/DG/CB.2;172.17.27.61;D01-03DX_MOS1\n"
+                 "ISAC;ANS-C02/DG/CB.1;172.16.3.65;ANS-C02_MOS1\n")
+
+    CdeContent = ("parameter;Firmware;type-getparam;type-setparam;"
+                  "type-wrtbak;get;set;write\n"
+                  "SP;DMC4183s56g, DMC2182s87j;Standard;Standard;Standard;"
+                  "SPx=?;SPx=v;SP='SPA=v\\r'\n"
+                  "CE;DMC4183s56g;AllAxes;Standard;Standard;CE ?,?;CEx= v;"
+                  "CE='CEA=v\\r'\n")
+
+    @pytest.fixture(autouse=True)
+    def folder(self, tmp_path, monkeypatch):
+        self.folder = str(tmp_path)
+        self.CBFile = self.Write("OSM_LIST_CB.csv", self.CBContent)
+        self.CdeFile = self.Write("OSM_LIST_CDE.csv", self.CdeContent)
+
+        # the .csv read, not taken from their cache
+        self.reads = []
+        getColumnDatas = OSMOSFiles.csvf.CSV.GetColumnDatas
+
+        def GetColumnDatas(csvFile, *args):
+            self.reads.append(csvFile.GetFileName())
+            return getColumnDatas(csvFile, *args)
+
+        monkeypatch.setattr(OSMOSFiles.csvf.CSV, "GetColumnDatas",
+                            GetColumnDatas)
+
+    def Write(self, fileName, content):
+        """Write a ``.csv`` in the temporary directory.
+
+        :return:
+            Return the path of the ``.csv``
+        :rtype:
+            str
+        """
+        fullName = os.path.join(self.folder, fileName)
+        with open(fullName, mode="w", encoding="utf-8", newline="") as file:
+            file.write(content)
+        return fullName
+
+    def Cache(self, csvFullName):
+        """Give the content of the cache file of a ``.csv``."""
+        cacheFullName = (os.path.splitext(csvFullName)[0]
+                         + OSMOSFiles.OSMOSFiles.cacheSuffix)
+        with open(cacheFullName, encoding="utf-8") as file:
+            return json.load(file)
+
+    def Files(self):
+        """Give the OSMOSFiles of the tests."""
+        return OSMOSFiles.OSMOSFiles(self.CBFile, self.CdeFile)
+
+    def test_Cache(self):
+        files = self.Files()
+        assert self.reads == ["OSM_LIST_CB.csv", "OSM_LIST_CDE.csv"]
+        assert self.Cache(self.CBFile)["datas"] == files.CBDatas
+        assert self.Cache(self.CdeFile)["datas"] == files.CdeDatas
+
+        # unchanged : read from the cache
+        cached = self.Files()
+        assert self.reads == ["OSM_LIST_CB.csv", "OSM_LIST_CDE.csv"]
+        assert cached.CBDatas == files.CBDatas
+        assert cached.CBFileNtwrkFilter("RCM") == ["172.17.27.3",
+                                                   "172.17.27.61"]
+        assert cached.CdeFileParamList() == ["SP", "CE"]
+
+    def test_Cache_size(self):
+        self.Files()
+        self.Write("OSM_LIST_CB.csv",
+                   self.CBContent + "TEMPO;ANS-C03/DG/CB.1;172.16.4.2;C03\n")
+
+        files = self.Files()
+        assert self.reads[2:] == ["OSM_LIST_CB.csv"]
+        assert files.CBFileNtwrkFilter("TEMPO") == ["172.16.4.2"]
+
+    def test_Cache_sha256(self, monkeypatch):
+        self.Files()
+        stat = os.stat(self.CBFile)
+
+        # same size, another modification time
+        self.Write("OSM_LIST_CB.csv", self.CBContent.replace("ISAC", "LUCI"))
+        os.utime(self.CBFile, ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 10**9))
+        assert os.stat(self.CBFile).st_size == stat.st_size
+
+        digests = []
+        sha256 = OSMOSFiles.hashlib.sha256
+        monkeypatch.setattr(OSMOSFiles.hashlib, "sha256",
+                            lambda: digests.append(1) or sha256())
+        files = self.Files()
+        assert self.reads[2:] == ["OSM_LIST_CB.csv"]
+        assert files.CBFileUniqueNtwrks() == ["RCM", "LUCI"]
+
+        # the changed .csv is hashed once, the unchanged one not at all
+        assert len(digests) == 1
+
+    def test_Cache_touched(self):
+        files = self.Files()
+        stat = os.stat(self.CBFile)
+        mtime = stat.st_mtime_ns + 10**9
+        os.utime(self.CBFile, ns=(stat.st_atime_ns, mtime))
+
+        # same content : not read, the cache takes the new time
+        cached = self.Files()
+        assert self.reads[2:] == []
+        assert cached.CBDatas == files.CBDatas
+        assert self.Cache(self.CBFile)["mtime"] == mtime
+
+    def test_Cache_corrupted(self):
+        self.Files()
+        cacheFullName = (os.path.splitext(self.CBFile)[0]
+                         + OSMOSFiles.OSMOSFiles.cacheSuffix)
+        with open(cacheFullName, mode="w", encoding="utf-8") as file:
+            file.write("{not json")
+
+        files = self.Files()
+        assert self.reads[2:] == ["OSM_LIST_CB.csv"]
+        assert self.Cache(self.CBFile)["datas"] == files.CBDatas
+
+    def test_Cache_unwritable(self):
+        # the cache file can't be written : a directory is in the way
+        cacheFullName = (os.path.splitext(self.CBFile)[0]
+                         + OSMOSFiles.OSMOSFiles.cacheSuffix)
+        os.makedirs(cacheFullName + ".tmp")
+
+        files = self.Files()
+        assert not os.path.isfile(cacheFullName)
+        assert files.CBFileNtwrkFilter("ISAC") == ["172.16.3.65"]
+
+        # read again each time
+        self.Files()
+        assert self.reads.count("OSM_LIST_CB.csv") == 2
+        assert self.reads.count("OSM_LIST_CDE.csv") == 1
+
+    def test_NoCache(self, monkeypatch):
+        monkeypatch.setattr(OSMOSFiles.OSMOSFiles, "cacheInventories", False)
+        files = self.Files()
+        self.Files()
+        assert len(self.reads) == 4
+        assert sorted(os.listdir(self.folder)) == ["OSM_LIST_CB.csv",
+                                                   "OSM_LIST_CDE.csv"]
+        assert files.CdeFileParamList() == ["SP", "CE"]
+
+    def test_CdeBlankCells(self):
+        # BA has no set, CE no firmware : the next cells stay on their line
+        self.Write("OSM_LIST_CDE.csv",
+                   "parameter;Firmware;type-getparam;type-setparam;"
+                   "type-wrtbak;get;set;write\n"
+                   ";;;;;;;REM Setup Command\n"
+                   "BA;DMC4183s56g;Message;None;Sized;MG_BAA;;"
+                   "BA\\size=1\\nBA\\1\\Cmd=BA N\\r\n"
+                   "CE;;AllAxes;Standard;Standard;CE ?,?;CEx= v;"
+                   "CE='CEA=v\\r'\n"
+                   "SP;DMC4183s56g;Standard;Standard;Standard;SPx=?;SPx=v;"
+                   "SP='SPA=v\\r'\n")
+        files = self.Files()
+        assert files.CdeFileParamList() == ["BA", "CE", "SP"]
+        assert files.CdeFileReadWriteType("BA") == ("Message", "Sized")
+        assert files.GetFormattedCmd("BA") == "MG_BAA"
+        assert files.CdeFileIsFWAvail("CE", "DMC4183s56g") is False
+        assert files.GetFormattedCmd("CE", "ABC") == "CE ?,?,?"
+        assert files.CdeFileGetFWAvail("SP") == ["DMC4183s56g"]
+        assert files.GetFormattedCmd("SP", "B") == "SPB=?"
+        assert files.writeFormattedParam("SP") == 'SP="SPA=v\\r"\n'
+        assert files.setParamFormat == ["", "CEx= v", "SPx=v"]
+
+    def test_CdeUnknownParameter(self):
+        files = self.Files()
+        with pytest.raises(ValueError, match="XX"):
+            files.CdeFileReadWriteType("XX")
+        with pytest.raises(ValueError):
+            files.CdeFileGetFWAvail("XX")
+        with pytest.raises(ValueError):
+            files.CdeFileIsFWAvail("XX", "DMC4183s56g")
+        with pytest.raises(ValueError):
+            files.GetFormattedCmd("XX")
+        with pytest.raises(ValueError):
+            files.writeFormattedParam("XX")
+
+    def test_Plans(self):
+        plan = {"firmware": "DMC4183s56g", "axis": ["A", "B"],
+                "requested": ["SP"], "commands": ["VF?", "PF?", "SPA=?",
+                                                  "SPB=?"],
+                "parameters": [{"param": "SP", "count": 2, "split": False,
+                                "fill": 6, "write": "Standard",
+                                "template": 'SP="SPA=v\\r"\n'}]}
+        files = self.Files()
+        files.plans["DMC4183s56g:AB"] = plan
+        planFile = os.path.join(self.folder, "plans.json")
+        files.SavePlans(planFile)
+
+        loaded = self.Files()
+        assert loaded.GetPlans() == {}
+        loaded.LoadPlans(planFile)
+        assert loaded.GetPlans() == {"DMC4183s56g:AB": plan}
+
+        # a Cde file read again empties the plans
+        loaded.UpdateCdeFile(self.CdeFile)
+        assert loaded.GetPlans() == {}
+
+    def test_LoadPlans_ignored(self):
+        files = self.Files()
+        files.plans["DMC4183s56g:AB"] = {"firmware": "DMC4183s56g",
+                                         "axis": ["A", "B"],
+                                         "requested": [], "commands": [],
+                                         "parameters": []}
+        planFile = os.path.join(self.folder, "plans.json")
+        files.SavePlans(planFile)
+
+        # made from another Cde file
+        self.Write("OSM_LIST_CDE.csv", self.CdeContent.replace("CE ?,?",
+                                                               "CE ?"))
+        changed = self.Files()
+        changed.LoadPlans(planFile)
+        assert changed.GetPlans() == {}
+
+        changed.LoadPlans(os.path.join(self.folder, "missing.json"))
+
+        # saved with the parameters of the former plans
+        self.Write("OSM_LIST_CDE.csv", self.CdeContent)
+        files.plans["DMC4183s56g:AB"]["parameters"] = [["SP", 2]]
+        files.SavePlans(planFile)
+        changed = self.Files()
+        changed.LoadPlans(planFile)
+        assert changed.GetPlans() == {}
+
+        with open(planFile, mode="w", encoding="utf-8") as file:
+            file.write("{not json")
+        changed.LoadPlans(planFile)
+        assert changed.GetPlans() == {}
+
+    def test_CBBlankCells(self):
+        # no network on the 2nd line, no name on the 3rd one
+        self.Write("OSM_LIST_CB.csv",
+                   "network;Device;Adresse-IP;Racine-nom-CVS\n"
+                   "RCM;ANS-C01/DG/CB.1;172.17.27.3;ANS-C01_MOS1\n"
+                   ";ANS-C01/DG/CB.2;172.17.27.61;D01-03DX_MOS1\n"
+                   "RCM;ANS-C01/DG/CB.3;172.17.27.62;\n"
+                   "ISAC;ANS-C02/DG/CB.1;172.16.3.65;ANS-C02_MOS1\n")
+        files = self.Files()
+        assert files.CBFileNtwrkFilter("RCM") == ["172.17.27.3"]
+        assert files.CBFileNtwrkFilter("ISAC") == ["172.16.3.65"]
+        assert files.CBFileGetName("172.16.3.65") == "ANS-C02_MOS1"
+        assert files.CBFileGetName("172.17.27.62") is None
+        assert files.CBFileUniqueNtwrks() == ["RCM", "ISAC"]
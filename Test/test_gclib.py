@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Test the python wrapper of gclib.
+
+Description
+-----------
+Sequence of tests for the ``py`` class of ``gclib.py``. The native gclib
+libraries are replaced by GclibStub, answering as a GalilSimulator
+controller : no gclib installation is needed.
+
+Libraries/Modules
+-----------------
+- array standard library (https://docs.python.org/3/library/array.html)
+    - Preallocated values of an uploaded array.
+- threading standard library (https://docs.python.org/3/library/threading.html)
+    - Errors of several threads at the same time.
+- pytest library (https://docs.pytest.org)
+    - Replace the gclib libraries during a test.
+- GalilSimulator library (:file:GalilSimulator.html)
+    - Simulated GALIL controllers.
+- GclibStub library (:file:GclibStub.html)
+    - gclib libraries answering with simulated controllers.
+- gclib library (:file:../CBPages/gclib.html)
+    - Module tested.
+
+Version
+-------
+- 1.0.0.0
+
+Notes
+-----
+- No ControlBox is needed
+
+TODO
+----
+- None
+
+Author(s)
+---------
+- Created by agent on 18/10/2026.
+- Modified by xxx on xx/xx/xxxx.
+
+Copyright (c) 2022 Cerato Workshop.  All rights reserved.
+
+Members
+-------
+"""
+import array
+import threading
+import pytest
+import GalilSimulator as gs
+from GclibStub import GclibStub
+from Packages.Controlbox import gclib
+
+
+class Test_gclib:
+    """Class testing a gclib connection to a simulated controller.
+
+    :attr ip:
+        IP of the simulated controller
+    :type ip:
+        str
+    """
+    ip = "127.0.0.1"
+
+    @pytest.fixture(autouse=True)
+    def simulated(self, monkeypatch):
+        self.sim = gs.GalilSimulator(host=self.ip,
+                                     parameters={"SP": ["2000", "3000"]},
+                                     variables={"McRevSpe": "1.0000"},
+                                     arrays={"Cmd": [0, 1.5, -2, 3.25],
+                                             "Big": list(range(100))})
+        self.stub = GclibStub({self.ip: self.sim}).Install(monkeypatch,
+                                                           gclib)
+        self.g = gclib.py()
+        self.g.GOpen(self.ip + " --direct")
+        yield
+        self.g.GClose()
+
+    def test_IsShort(self):
+        assert gclib._is_short(b"SPA=?") is True
+        assert gclib._is_short(b"IA?;SP ?,?;McRevSpe=?") is True
+        assert gclib._is_short(b"MG_TPA") is True
+        assert gclib._is_short(b"SPA=?;MG_TPA;MG_TPB") is True
+        assert gclib._is_short(b"MG McRevSpe") is False
+        assert gclib._is_short(b"MG_TPA, _TPB") is False
+        assert gclib._is_short(b"MG_TPA;" * 200) is False
+        assert gclib._is_short(b'MG "ready?"') is False
+        assert gclib._is_short(b"LV") is False
+        assert gclib._is_short(b"SPA=?;" * 200) is False
+
+    def test_GCommand(self):
+        assert self.g.GCommand("SPB=?") == "3000"
+        assert self.g.GCommand("MG McRevSpe") == "1.0000"
+        assert self.stub.lines == ["SPB=?", "MG McRevSpe"]
+
+    def test_GCommand_once(self):
+        # replies longer than the small buffer : each line is sent once
+        self.sim.variables.update({f"Var{index}": "1.0000"
+                                   for index in range(1000)})
+        for line in ("LV", ";".join(["MG_TPA"] * 500)):
+            lines = len(self.stub.lines)
+            assert len(self.g.GCommand(line)) > gclib._small_buf_size
+            assert self.stub.lines[lines:] == [line]
+
+        # too many queries to be known short
+        line = ";".join(["SPA=?"] * 200)
+        assert self.g.GCommand(line).split() == ["2000"] * 200
+        assert self.stub.lines[-1:] == [line]
+
+    def test_GCommand_error(self):
+        with pytest.raises(gclib.GclibError, match="question mark"):
+            self.g.GCommand("Nope=?")
+        assert self.stub.lines == ["Nope=?"]
+
+    def test_GCommandRaw(self):
+        view = self.g.GCommandRaw("SPA=?")
+        assert isinstance(view, memoryview)
+        assert bytes(view) == b"2000"
+        assert bytes(self.g.GCommandRaw(b"MG McRevSpe")) == b"1.0000"
+
+        # the view is the read buffer : the next transaction overwrites it
+        self.g.GCommandRaw("SPB=?")
+        assert bytes(view) == b"3000"
+
+        assert b"McRevSpe" in bytes(self.g.GCommandRaw("LV"))
+        assert self.stub.lines == ["SPA=?", "MG McRevSpe", "SPB=?", "LV"]
+
+    def test_GArrayUploadInto(self):
+        out = array.array("d", [0.0]) * 6
+        assert self.g.GArrayUploadInto("Cmd", 0, 3, out, 1) == 4
+        assert list(out) == [0.0, 0.0, 1.5, -2.0, 3.25, 0.0]
+
+        # a shorter response after a longer one in the same large buffer
+        big = array.array("d", [0.0]) * 100
+        assert self.g.GArrayUploadInto("Big", 0, 99, big) == 100
+        assert list(big) == [float(value) for value in range(100)]
+        assert self.g.GArrayUploadInto("Cmd", 1, 2, out) == 2
+        assert list(out[:2]) == [1.5, -2.0]
+
+        with pytest.raises(gclib.GclibError, match="question mark"):
+            self.g.GArrayUploadInto("Nope", 0, 3, out)
+
+    def test_BufferPool(self, monkeypatch):
+        pool = gclib._BufferPool(gclib._buf_size, gclib._pool_size)
+        monkeypatch.setattr(gclib, "_pool", pool)
+
+        # more connections than _pool_size, each holding a large buffer
+        connections = [gclib.py() for index in range(gclib._pool_size + 2)]
+        for connection in connections:
+            connection.GOpen(self.ip + " --direct")
+            connection.GCommandRaw("LV")
+        buffers = [connection._large_buf for connection in connections]
+        for connection in connections:
+            connection._release()
+
+        # every buffer is kept : the next bulk transactions allocate none
+        assert len(pool._free) == len(connections)
+        for connection in connections:
+            connection.GCommandRaw("LV")
+        assert sorted(map(id, buffers)) == \
+            sorted(id(connection._large_buf) for connection in connections)
+
+        # once closed, only _pool_size buffers are kept
+        for connection in connections:
+            connection.GClose()
+        assert len(pool._free) == gclib._pool_size
+
+    def test_Error_threads(self):
+        # each thread reads the message of its own error
+        codes = [self.stub.timeoutError, self.stub.questionMark]
+        wrong = []
+
+        def Errors(code):
+            for attempt in range(1000):
+                try:
+                    gclib._rc(code)
+                except gclib.GclibError as ex:
+                    if str(ex) != self.stub.messages[code]:
+                        wrong.append(str(ex))
+
+        threads = [threading.Thread(target=Errors, args=(code,))
+                   for code in codes * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert wrong == []